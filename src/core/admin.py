@@ -1,6 +1,7 @@
 # core/admin.py
 
 from django.contrib import admin
+from . import repositories as repo
 from .models import (
     Departamento,
     Curso,
@@ -65,6 +66,15 @@ class ProjetoAdmin(admin.ModelAdmin):
     list_editable = ('pendencia',) # Now valid
     inlines = [OrientadorInline, AlunoProjInline, AssessorInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        # Busca pelo índice textual em vez de icontains nas três colunas
+        termo = search_term.strip()
+        if not termo:
+            return queryset, False
+        if termo.isdigit():
+            return queryset.filter(id_proj=int(termo)), False
+        return repo.search_projects(queryset, termo), False
+
 @admin.register(ProfessorLattes)
 class ProfessorLattesAdmin(admin.ModelAdmin):
     list_display = ('professor', 'cod_lattes', 'subarea', 'link')
@@ -0,0 +1,17 @@
+# core/apps.py
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'src.core'
+    label = 'core'
+
+    def ready(self):
+        # Modo de conexão (CORE_DB_POOLING) antes de qualquer conexão ser aberta
+        from .pool import configure_from_settings
+        configure_from_settings()
+        from .signals import connect_signals
+        connect_signals()
+        # Fecha conexões e pools no encerramento do worker
+        from .pool import register_drain
+        register_drain()
@@ -0,0 +1,99 @@
+# core/async_views.py
+"""
+Leituras assíncronas (ASGI) das rotas mais usadas, sob ``/api/async/``.
+
+São views Django simples (``async def``) em vez de views DRF: enquanto uma
+requisição espera o banco, o worker atende outras, em vez de prender uma
+thread. O JSON é o mesmo das views síncronas equivalentes (mesmos
+serializers e as mesmas opções do JSONRenderer).
+
+* ``projetos/`` - lista completa em streaming (array JSON ou NDJSON), como
+  ``?stream=1``, lida com ``aiterator()`` (prefetch por lote); aceita os
+  filtros do ProjetoFilterBackend
+* ``projetos/<id>/``, ``alunos/<id>/historico/``, ``professores/<id>/lattes/``,
+  ``departamentos/<id>/professores-keywords/`` e ``lattes-keywords/``
+"""
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.request import Request
+
+from . import repositories as core_repo
+from .conditional import aconditional_get
+from .filters import ProjetoFilterBackend
+from .models import Aluno, HistAluno, Professor, ProfessorLattes, Projeto
+from .serializers import (
+    HistAlunoSerializer, ProfessorLattesKeywordsSerializer, ProfessorLattesSerializer, ProjetoSerializer
+)
+from .streaming import DEFAULT_CHUNK_SIZE, NDJSONRenderer, _dumps, aiter_json_array, aiter_ndjson
+from .views import PROJETO_TABLES
+
+
+def _json(data, status=200):
+    return HttpResponse(_dumps(data), status=status, content_type='application/json')
+
+
+def _quer_ndjson(request):
+    return (
+        request.GET.get('format') == NDJSONRenderer.format
+        or NDJSONRenderer.media_type in request.headers.get('Accept', '')
+    )
+
+
+def _filtrar_projetos(request):
+    queryset = core_repo.get_all_projects_prefetched().order_by('id_proj')
+    return ProjetoFilterBackend().filter_queryset(Request(request), queryset, None)
+
+
+@require_GET
+async def projeto_list(request):
+    """ Lista de projetos em streaming (JSON ou NDJSON). """
+    # Os filtros (inclusive a busca textual) só montam a consulta: nada é lido aqui
+    queryset = _filtrar_projetos(request)
+    rows = queryset.aiterator(chunk_size=DEFAULT_CHUNK_SIZE)
+    serializer = ProjetoSerializer()
+    if _quer_ndjson(request):
+        return StreamingHttpResponse(aiter_ndjson(rows, serializer), content_type=NDJSONRenderer.media_type)
+    return StreamingHttpResponse(aiter_json_array(rows, serializer), content_type='application/json')
+
+
+@require_GET
+@aconditional_get(*PROJETO_TABLES)
+async def projeto_detail(request, id_proj):
+    try:
+        projeto = await core_repo.aget_project_prefetched(id_proj)
+    except Projeto.DoesNotExist:
+        return _json({'error': 'Projeto não encontrado.'}, status=404)
+    return _json(ProjetoSerializer(projeto).data)
+
+
+@require_GET
+@aconditional_get(HistAluno, Aluno)
+async def aluno_historico(request, id_aluno):
+    historico = await core_repo.aget_historico_by_aluno_id_cached(id_aluno)
+    return _json(HistAlunoSerializer(historico, many=True).data)
+
+
+@require_GET
+@aconditional_get(ProfessorLattes, Professor)
+async def professor_lattes(request, id_professor):
+    try:
+        lattes = await core_repo.aget_lattes_by_professor_id(id_professor)
+    except Professor.DoesNotExist:
+        return _json({'error': 'Professor não encontrado.'}, status=404)
+    except ProfessorLattes.DoesNotExist:
+        return _json({'error': 'Informações Lattes não encontradas.'}, status=404)
+    return _json(ProfessorLattesSerializer(lattes).data)
+
+
+@require_GET
+@aconditional_get(ProfessorLattes, Professor)
+async def departamento_professores_keywords(request, id_departamento):
+    lattes = await core_repo.aget_lattes_keywords_by_dept_id_cached(id_departamento)
+    return _json(ProfessorLattesKeywordsSerializer(lattes, many=True).data)
+
+
+@require_GET
+@aconditional_get(ProfessorLattes, Professor)
+async def all_lattes_keywords(request):
+    lattes = await core_repo.aget_all_lattes_keywords_cached()
+    return _json(ProfessorLattesKeywordsSerializer(lattes, many=True).data)
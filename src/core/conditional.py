@@ -0,0 +1,95 @@
+# core/conditional.py
+import functools
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from . import repositories as core_repo
+
+
+def compute_etag(request, versions):
+    """
+    ETag forte a partir da URL, do formato negociado e das versões das
+    tabelas envolvidas. Não depende do conteúdo da resposta, então pode ser
+    calculado sem executar o serializer.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    partes = [request.get_full_path(), getattr(renderer, 'media_type', '')]
+    partes += [f'{tabela}:{versao}' for tabela, (versao, _) in sorted(versions.items())]
+    return '"%s"' % hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+
+def _last_modified(versions):
+    datas = [atualizado_em for _, atualizado_em in versions.values() if atualizado_em]
+    # Precisão de segundos, como nos cabeçalhos HTTP
+    return int(max(datas).timestamp()) if datas else None
+
+
+def _apply_headers(response, etag, last_modified, cache_control):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Accept',))
+    patch_cache_control(response, **cache_control)
+
+
+def conditional_get(*models, **cache_control):
+    """
+    Decorator para handlers GET de views DRF com suporte a requisições
+    condicionais (If-None-Match / If-Modified-Since).
+
+    Os ``models`` informados definem as tabelas cuja versão compõe o ETag.
+    Se o cliente já tem a versão atual, responde 304 sem consultar os dados
+    nem serializar. ``cache_control`` é repassado ao ``patch_cache_control``
+    (padrão: ``no-cache``, ou seja, o cliente sempre revalida).
+    """
+    cache_control = cache_control or {'no_cache': True}
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            versions = core_repo.get_table_versions(models)
+            etag, last_modified, conditional = _check(request, versions, cache_control)
+            if conditional is not None:
+                return conditional
+
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                _apply_headers(response, etag, last_modified, cache_control)
+            return response
+        return wrapper
+    return decorator
+
+
+def aconditional_get(*models, **cache_control):
+    """ Versão de ``conditional_get`` para views assíncronas (funções). """
+    cache_control = cache_control or {'no_cache': True}
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request, *args, **kwargs):
+            versions = await core_repo.aget_table_versions(models)
+            etag, last_modified, conditional = _check(request, versions, cache_control)
+            if conditional is not None:
+                return conditional
+
+            response = await handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                _apply_headers(response, etag, last_modified, cache_control)
+            return response
+        return wrapper
+    return decorator
+
+
+def _check(request, versions, cache_control):
+    """ ETag, Last-Modified e, se o cliente já tem a versão atual, a resposta 304/412. """
+    etag = compute_etag(request, versions)
+    last_modified = _last_modified(versions)
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    # 304 (ou 412 para If-Match/If-Unmodified-Since que falharam)
+    if isinstance(conditional, HttpResponseNotModified):
+        _apply_headers(conditional, etag, last_modified, cache_control)
+    return etag, last_modified, conditional
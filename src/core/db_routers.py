@@ -0,0 +1,190 @@
+# core/db_routers.py
+"""
+Leituras em réplicas (ou follower reads) para o tráfego GET.
+
+Configuração no settings::
+
+    DATABASES = {'default': {...}, 'replica': {...}}
+    DATABASE_ROUTERS = ['src.core.db_routers.ReplicaRouter']
+    CORE_DB_REPLICAS = ['replica']          # um ou mais aliases
+    CORE_DB_PIN_SECONDS = 5                 # read-your-writes entre requisições
+    CORE_DB_REPLICA_VIEWS = {'ProjetoViewSet': False, 'AlunoViewSet.historico': True}
+
+O roteador só manda leituras para uma réplica dentro de um bloco
+``leitura_em_replica()``; fora dele (serviços, comandos, escritas) tudo vai
+para o ``default``, como antes. As views usam o bloco através do
+``ReplicaReadMixin``: GETs das views/ações com ``replica_reads`` (ou
+habilitadas em ``CORE_DB_REPLICA_VIEWS``) leem de uma réplica, escolhida
+uma vez por requisição.
+
+Read-your-writes: qualquer escrita fixa o restante da requisição no
+primário e a resposta leva o cookie ``core_primario``; enquanto ele valer
+(``CORE_DB_PIN_SECONDS``), as próximas requisições do mesmo cliente também
+leem do primário, cobrindo o atraso de replicação. ``select_for_update``
+conta como escrita (o Django usa ``db_for_write``).
+
+Respostas em streaming são consumidas depois da view, fora do bloco; o
+StreamingListMixin as envolve com ``iterar_no_bloco()`` para que leiam da
+mesma réplica que a requisição escolheu.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = 'core_primario'
+DEFAULT_PIN_SECONDS = 5
+
+_estado = ContextVar('core_leitura_replica', default=None)
+
+_lock = threading.Lock()
+_contadores = dict.fromkeys(('leituras_replica', 'leituras_primario', 'fixacoes'), 0)
+
+
+def replicas():
+    return list(getattr(settings, 'CORE_DB_REPLICAS', ()))
+
+
+def pin_seconds():
+    return getattr(settings, 'CORE_DB_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+def _contar(contador):
+    with _lock:
+        _contadores[contador] += 1
+
+
+def replica_stats():
+    with _lock:
+        estatisticas = dict(_contadores)
+    estatisticas['replicas'] = replicas()
+    return estatisticas
+
+
+@contextmanager
+def leitura_em_replica(habilitada=True, fixado=False):
+    """
+    Bloco em que as leituras podem ir para uma réplica. Devolve o estado da
+    requisição (``replica``, ``fixado``, ``escreveu``) para quem precisar
+    ajustá-lo ou inspecioná-lo.
+    """
+    disponiveis = replicas()
+    estado = {
+        'replica': random.choice(disponiveis) if disponiveis else None,
+        'habilitada': habilitada,
+        'fixado': fixado,
+        'escreveu': False,
+    }
+    token = _estado.set(estado)
+    try:
+        yield estado
+    finally:
+        _estado.reset(token)
+
+
+def iterar_no_bloco(iteravel):
+    """
+    Itera ``iteravel`` sob o bloco de leitura ativo agora (o estado é lido
+    nesta chamada, não no primeiro item). O estado é ligado a cada passo, e
+    não uma vez só, porque o servidor consome a resposta depois da view e no
+    ASGI cada pedaço pode vir de outro contexto.
+    """
+    estado = _estado.get()
+
+    def itens():
+        iterador = iter(iteravel)
+        while True:
+            token = _estado.set(estado)
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                _estado.reset(token)
+            yield item
+
+    return itens()
+
+
+def fixar_primario():
+    """ Leituras seguintes deste bloco vão para o primário. """
+    estado = _estado.get()
+    if estado is not None and not estado['fixado']:
+        estado['fixado'] = True
+        _contar('fixacoes')
+
+
+class ReplicaRouter:
+    """ Leituras para a réplica do bloco atual; escritas e migrações no primário. """
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None:
+            return None
+        if not estado['habilitada'] or estado['fixado'] or estado['replica'] is None:
+            _contar('leituras_primario')
+            return DEFAULT_DB_ALIAS
+        _contar('leituras_replica')
+        return estado['replica']
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado['escreveu'] = True
+            fixar_primario()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Mixin de view DRF: GETs leem de uma réplica quando a view (ou a ação) está
+    habilitada; escritas fixam o cliente no primário por alguns segundos.
+
+    * ``replica_reads`` - habilita a view inteira
+    * ``replica_actions`` - restringe a algumas ações (ex.: ``('lattes',)``)
+    * ``CORE_DB_REPLICA_VIEWS`` - sobrescreve por ``'View'`` ou ``'View.acao'``
+    """
+    replica_reads = False
+    replica_actions = None
+
+    def uses_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        nome, acao = type(self).__name__, getattr(self, 'action', None)
+        configuracao = getattr(settings, 'CORE_DB_REPLICA_VIEWS', {})
+        if acao and f'{nome}.{acao}' in configuracao:
+            return configuracao[f'{nome}.{acao}']
+        if nome in configuracao:
+            return configuracao[nome]
+        if self.replica_actions is not None:
+            return self.replica_reads and acao in self.replica_actions
+        return self.replica_reads
+
+    def dispatch(self, request, *args, **kwargs):
+        with leitura_em_replica(habilitada=False, fixado=PIN_COOKIE in request.COOKIES) as estado:
+            self._leitura_replica = estado
+            response = super().dispatch(request, *args, **kwargs)
+        if estado['escreveu']:
+            response.set_cookie(PIN_COOKIE, '1', max_age=pin_seconds(), httponly=True, samesite='Lax')
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        # A ação (self.action) só é conhecida depois de initialize_request
+        self._leitura_replica['habilitada'] = self.uses_replica(request)
+        super().initial(request, *args, **kwargs)
@@ -0,0 +1,154 @@
+# core/desempenho.py
+"""
+Desempenho acadêmico agregado (taxas de aprovação) sobre todo o HistAluno.
+
+O histórico é lido uma vez, em blocos de ``values_list``, para arrays
+compactos do NumPy: disciplina, departamento e curso viram códigos
+inteiros (``int32``) e a aprovação um vetor ``bool``. Os agrupamentos são
+``np.bincount`` sobre esses códigos - tentativas e aprovações por grupo -
+sem laço Python por linha nem uma consulta por aluno.
+
+* ``por_disciplina``, ``por_departamento``, ``por_curso`` - tentativas,
+  aprovações e taxa de aprovação
+* ``pontos_criticos`` - pares (disciplina, curso) com mais reprovações,
+  entre os com pelo menos ``min_tentativas``
+
+As contagens são guardadas em memória e só recalculadas quando a versão
+de HistAluno (ou de Aluno, Curso e Departamento, que definem o curso e os
+nomes) muda (ver ``repositories.get_table_versions``).
+"""
+import threading
+
+import numpy as np
+
+DEFAULT_TOP = 10
+MAX_TOP = 100
+DEFAULT_MIN_TENTATIVAS = 5
+CHUNK_SIZE = 10000
+
+
+def _codificar(valores, codigos):
+    """ Código inteiro de cada valor, acrescentando os novos ao dicionário. """
+    return np.fromiter(
+        (codigos.setdefault(valor, len(codigos)) for valor in valores), dtype=np.int32, count=len(valores)
+    )
+
+
+def _taxa(aprovados, tentativas):
+    return np.round(np.divide(
+        aprovados, tentativas, out=np.zeros(len(tentativas)), where=tentativas > 0
+    ), 4)
+
+
+class HistoricoAgregado:
+    """ Contagens por disciplina, departamento, curso e (disciplina, curso). """
+
+    def __init__(self, linhas, departamentos, cursos):
+        # linhas: iterável de (cod_disciplina, id_departamento, id_curso, aprovado)
+        self.codigos = {'disciplina': {}, 'departamento': {}, 'curso': {}}
+        colunas = {'disciplina': [], 'departamento': [], 'curso': []}
+        aprovacoes = []
+        linhas = iter(linhas)
+        while True:
+            bloco = [linha for _, linha in zip(range(CHUNK_SIZE), linhas)]
+            if not bloco:
+                break
+            disciplinas, depto_ids, curso_ids, aprovados = zip(*bloco)
+            for nome, valores in (('disciplina', disciplinas), ('departamento', depto_ids), ('curso', curso_ids)):
+                colunas[nome].append(_codificar(valores, self.codigos[nome]))
+            aprovacoes.append(np.fromiter(aprovados, dtype=bool, count=len(aprovados)))
+
+        vazio = np.empty(0, dtype=np.int32)
+        codigos = {nome: np.concatenate(partes) if partes else vazio for nome, partes in colunas.items()}
+        aprovado = np.concatenate(aprovacoes) if aprovacoes else np.empty(0, dtype=bool)
+
+        self.total = len(aprovado)
+        self.aprovados = int(aprovado.sum())
+        self.rotulos = {nome: list(mapa) for nome, mapa in self.codigos.items()}
+        self.contagens = {}
+        for nome, codigo in codigos.items():
+            n = len(self.codigos[nome])
+            self.contagens[nome] = (
+                np.bincount(codigo, minlength=n),
+                np.bincount(codigo, weights=aprovado, minlength=n).astype(np.int64),
+            )
+
+        # Pares (disciplina, curso) em um único código
+        n_cursos = max(len(self.codigos['curso']), 1)
+        par = codigos['disciplina'].astype(np.int64) * n_cursos + codigos['curso']
+        pares, inverso = np.unique(par, return_inverse=True)
+        self.pares = (pares // n_cursos, pares % n_cursos)
+        self.contagens['par'] = (
+            np.bincount(inverso, minlength=len(pares)),
+            np.bincount(inverso, weights=aprovado, minlength=len(pares)).astype(np.int64),
+        )
+        self.nomes = {'departamento': departamentos, 'curso': cursos}
+
+    def _grupo(self, nome, chave, campo_nome=None):
+        tentativas, aprovados = self.contagens[nome]
+        taxas = _taxa(aprovados, tentativas)
+        rotulos = self.rotulos[nome]
+        ordem = sorted(range(len(rotulos)), key=lambda i: rotulos[i])
+        return [
+            {
+                chave: str(rotulos[i]),
+                **({campo_nome: self.nomes[nome].get(rotulos[i])} if campo_nome else {}),
+                'tentativas': int(tentativas[i]),
+                'aprovados': int(aprovados[i]),
+                'taxa_aprovacao': float(taxas[i]),
+            }
+            for i in ordem
+        ]
+
+    def pontos_criticos(self, top=DEFAULT_TOP, min_tentativas=DEFAULT_MIN_TENTATIVAS):
+        """ Pares (disciplina, curso) com mais reprovações (desempate: maior taxa). """
+        tentativas, aprovados = self.contagens['par']
+        reprovacoes = tentativas - aprovados
+        taxas = _taxa(reprovacoes, tentativas)
+        candidatos = np.flatnonzero((tentativas >= min_tentativas) & (reprovacoes > 0))
+        candidatos = candidatos[np.lexsort((-taxas[candidatos], -reprovacoes[candidatos]))][:top]
+        disciplinas, cursos = self.pares
+        return [
+            {
+                'cod_disciplina': self.rotulos['disciplina'][disciplinas[i]],
+                'id_curso': str(self.rotulos['curso'][cursos[i]]),
+                'nome_curso': self.nomes['curso'].get(self.rotulos['curso'][cursos[i]]),
+                'tentativas': int(tentativas[i]),
+                'reprovacoes': int(reprovacoes[i]),
+                'taxa_reprovacao': float(taxas[i]),
+            }
+            for i in candidatos
+        ]
+
+    def relatorio(self, top=DEFAULT_TOP, min_tentativas=DEFAULT_MIN_TENTATIVAS):
+        return {
+            'total': self.total,
+            'aprovados': self.aprovados,
+            'taxa_aprovacao': round(self.aprovados / self.total, 4) if self.total else 0.0,
+            'por_disciplina': self._grupo('disciplina', 'cod_disciplina'),
+            'por_departamento': self._grupo('departamento', 'id_departamento', 'nome_departamento'),
+            'por_curso': self._grupo('curso', 'id_curso', 'nome'),
+            'pontos_criticos': self.pontos_criticos(top, min_tentativas),
+        }
+
+
+_lock = threading.Lock()
+_cache = {'versao': None, 'agregado': None}
+
+
+def get_agregado():
+    """ Contagens do histórico, recalculadas só quando as tabelas mudam. """
+    from . import repositories as repo
+    from .models import Aluno, Curso, Departamento, HistAluno
+
+    versao = tuple(sorted(
+        (tabela, numero)
+        for tabela, (numero, _) in repo.get_table_versions((HistAluno, Aluno, Curso, Departamento)).items()
+    ))
+    with _lock:
+        if _cache['versao'] != versao or _cache['agregado'] is None:
+            _cache['agregado'] = HistoricoAgregado(
+                repo.iter_historico_rows(CHUNK_SIZE), repo.get_departamento_nomes(), repo.get_curso_nomes()
+            )
+            _cache['versao'] = versao
+        return _cache['agregado']
@@ -0,0 +1,121 @@
+# core/export.py
+"""
+Exportação desnormalizada de projetos (CSV ou JSONL), em streaming.
+
+Uma linha por projeto, com os rótulos de tipo e pendência e os
+participantes (orientadores, assessores e alunos, com o estado ativo). Os
+projetos são lidos com ``iterator()`` (cursor do lado do servidor no
+PostgreSQL/CockroachDB) em blocos de ``chunk_size``; para cada bloco os
+participantes vêm em uma consulta por papel, só com as colunas usadas
+(``values_list``, sem instanciar modelos). A memória fica limitada a um
+bloco, qualquer que seja o tamanho da base.
+
+Os filtros são os do ProjetoFilterBackend (``tipo``, ``pendencia``,
+``bolsa``, ``datainicio_de``/``datainicio_ate`` etc.). ``gzip_stream``
+comprime a saída enquanto ela é gerada.
+"""
+import csv
+import json
+import zlib
+
+from . import repositories as core_repo
+from .filters import ProjetoFilterBackend, STATUS_LABELS, TIPO_LABELS
+from .roster import lotes
+from .streaming import DEFAULT_CHUNK_SIZE
+
+FORMATOS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+PROJETO_CAMPOS = ('id_proj', 'tema', 'tipo', 'bolsa', 'pendencia', 'duracao', 'palavra_chave')
+# Coluna da exportação -> (role, campos da pessoa)
+PARTICIPANTES = {
+    'orientadores': ('orientador', ('professor_id', 'professor__nome', 'ativo')),
+    'assessores': ('assessor', ('professor_id', 'professor__nome', 'ativo')),
+    'alunos': ('aluno', ('aluno_id', 'aluno__nome', 'ativo')),
+}
+COLUNAS = (
+    'id_proj', 'tema', 'tipo', 'tipo_display', 'bolsa', 'pendencia', 'pendencia_display',
+    'duracao', 'palavra_chave', *PARTICIPANTES,
+)
+# Bytes acumulados antes de cada envio (evita um pedaço por linha)
+BUFFER_BYTES = 64 * 1024
+
+
+def filtered_projects(params):
+    """ Projetos filtrados pelos parâmetros (mesmos filtros da listagem). """
+    return ProjetoFilterBackend().filter_params(core_repo.get_all_projects(), params)
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Gera um dict desnormalizado por projeto, em ordem de id_proj. """
+    linhas = queryset.order_by('id_proj').values_list(*PROJETO_CAMPOS).iterator(chunk_size=chunk_size)
+    for bloco in lotes(linhas, chunk_size):
+        ids = [valores[0] for valores in bloco]
+        pessoas = {coluna: {} for coluna in PARTICIPANTES}
+        for coluna, (role, campos) in PARTICIPANTES.items():
+            for projeto_id, pessoa_id, nome, ativo in core_repo.get_participant_values(role, ids, campos):
+                pessoas[coluna].setdefault(projeto_id, []).append(
+                    {'id': str(pessoa_id), 'nome': nome, 'ativo': ativo}
+                )
+        for valores in bloco:
+            linha = dict(zip(PROJETO_CAMPOS, valores))
+            linha['id_proj'] = str(linha['id_proj'])
+            linha['tipo_display'] = TIPO_LABELS.get(linha['tipo'])
+            linha['pendencia_display'] = STATUS_LABELS.get(linha['pendencia'])
+            for coluna in PARTICIPANTES:
+                linha[coluna] = pessoas[coluna].get(valores[0], [])
+            yield {coluna: linha[coluna] for coluna in COLUNAS}
+
+
+def _pessoas_csv(pessoas):
+    """ 'Nome (id)' separados por '; ', com participantes inativos marcados. """
+    return '; '.join(
+        f"{p['nome']} ({p['id']})" + ('' if p['ativo'] else ' [inativo]') for p in pessoas
+    )
+
+
+class _Linha:
+    """ Destino do csv.writer que só devolve a linha formatada. """
+
+    def write(self, valor):
+        return valor
+
+
+def iter_csv(rows):
+    escritor = csv.writer(_Linha())
+    yield escritor.writerow(COLUNAS)
+    for linha in rows:
+        yield escritor.writerow([
+            _pessoas_csv(linha[coluna]) if coluna in PARTICIPANTES else linha[coluna] for coluna in COLUNAS
+        ])
+
+
+def iter_jsonl(rows):
+    for linha in rows:
+        yield json.dumps(linha, ensure_ascii=False) + '\n'
+
+
+def iter_export(params, formato='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Pedaços de bytes (UTF-8) da exportação, agrupados em ~64 KB. """
+    rows = iter_rows(filtered_projects(params), chunk_size)
+    partes = iter_csv(rows) if formato == 'csv' else iter_jsonl(rows)
+    buffer, tamanho = [], 0
+    for parte in partes:
+        dados = parte.encode('utf-8')
+        buffer.append(dados)
+        tamanho += len(dados)
+        if tamanho >= BUFFER_BYTES:
+            yield b''.join(buffer)
+            buffer, tamanho = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_stream(chunks, nivel=6):
+    """ Comprime os pedaços (formato gzip) à medida que são gerados. """
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        comprimido = compressor.compress(chunk)
+        if comprimido:
+            yield comprimido
+    yield compressor.flush()
@@ -0,0 +1,243 @@
+# core/fast_read.py
+"""
+Caminho de leitura rápido para listagens.
+
+Em vez de instanciar modelos e passar cada linha pelos campos do DRF, as
+listagens opcionais (``?fast=1``) buscam tuplas com ``values_list()`` e as
+convertem em dicts com funções montadas uma única vez por conjunto de
+campos. O JSON produzido é idêntico ao dos serializers correspondentes
+(mesmas chaves, mesma ordem, IDs grandes como string, campos omitidos
+quando o serializer os omite).
+"""
+from functools import lru_cache
+from operator import itemgetter
+
+from rest_framework.response import Response
+
+from . import repositories as core_repo
+from .models import Projeto
+from .serializers import AlunoSerializer, ProfessorSerializer, ProjetoSerializer
+
+
+# Tipos de conversão, espelhando o to_representation dos campos DRF:
+#   'str'       -> CharField: str(valor), None continua None
+#   'raw'       -> Integer/Boolean/ChoiceField: o valor do banco
+#   'omit_none' -> CharField com source pontilhado: a chave é omitida se o
+#                  objeto intermediário for nulo (SkipField no DRF)
+#   dict        -> rótulo de choices (get_FOO_display)
+_OMITIR = object()
+
+
+def _coluna(indice, conversao):
+    """ Função que lê e converte uma coluna da tupla (``_OMITIR``: chave omitida). """
+    if conversao == 'raw':
+        return itemgetter(indice)
+    if conversao == 'str':
+        def valor(row):
+            v = row[indice]
+            return None if v is None else str(v)
+    elif conversao == 'omit_none':
+        def valor(row):
+            v = row[indice]
+            return _OMITIR if v is None else str(v)
+    else:
+        rotulos = conversao
+
+        def valor(row):
+            v = row[indice]
+            return None if v is None else str(rotulos.get(v, v))
+    return valor
+
+
+def _row_function(columns):
+    """
+    Monta ``row_to_dict(row)`` para a lista de (chave, índice, conversão),
+    com uma função de coluna já escolhida por campo: a conversão de cada
+    linha é só indexação de tupla e montagem de dict.
+    """
+    colunas = [(chave, _coluna(indice, conversao)) for chave, indice, conversao in columns]
+    if not any(conversao == 'omit_none' for _, _, conversao in columns):
+        def row_to_dict(row):
+            return {chave: valor(row) for chave, valor in colunas}
+        return row_to_dict
+
+    def row_to_dict(row):
+        d = {}
+        for chave, valor in colunas:
+            v = valor(row)
+            if v is not _OMITIR:
+                d[chave] = v
+        return d
+    return row_to_dict
+
+
+class RelationSpec:
+    """ Lista aninhada (ex.: alunos_status) lida de uma tabela de associação. """
+
+    def __init__(self, role, columns):
+        self.role = role
+        # columns: [(chave, caminho, conversão)]
+        self.paths = [caminho for _, caminho, _ in columns]
+        self.row_to_dict = _row_function(
+            [(chave, i + 1, conversao) for i, (chave, _, conversao) in enumerate(columns)]
+        )
+
+    def fetch_grouped(self, project_ids):
+        """ Uma consulta para todos os projetos da página; retorna {id_proj: [dict, ...]}. """
+        agrupado = {project_id: [] for project_id in project_ids}
+        for row in core_repo.get_participant_values(self.role, project_ids, self.paths):
+            agrupado[row[0]].append(self.row_to_dict(row))
+        return agrupado
+
+
+class FastReadSpec:
+    """
+    Descreve como montar a representação de um serializer a partir de
+    ``values_list()``: colunas simples e, opcionalmente, listas aninhadas.
+    """
+
+    def __init__(self, serializer_class, pk_name, columns, relations=None):
+        self.serializer_class = serializer_class
+        self.pk_name = pk_name
+        self.columns = columns            # [(chave, caminho, conversão)]
+        self.relations = relations or {}  # {chave: RelationSpec}
+        self.field_order = [
+            nome for nome, campo in serializer_class().fields.items() if not campo.write_only
+        ]
+
+    def selected_fields(self, campos=None):
+        return [nome for nome in self.field_order if campos is None or nome in campos]
+
+    @lru_cache(maxsize=64)
+    def _plan(self, campos, extra_paths):
+        """
+        Para um conjunto de campos, retorna os caminhos do values_list(), as
+        chaves na ordem do serializer e a função de linha já montada.
+        """
+        columns = {chave: (caminho, conversao) for chave, caminho, conversao in self.columns}
+        paths = [self.pk_name]
+        chaves = self.selected_fields(campos)
+        simples = []
+        for chave in chaves:
+            if chave in self.relations:
+                continue
+            caminho, conversao = columns[chave]
+            if caminho not in paths:
+                paths.append(caminho)
+            simples.append((chave, paths.index(caminho), conversao))
+        for caminho in extra_paths:
+            if caminho not in paths:
+                paths.append(caminho)
+        return paths, chaves, _row_function(simples)
+
+    def values_queryset(self, queryset, campos=None, extra_paths=()):
+        campos = frozenset(campos) if campos is not None else None
+        paths, _, _ = self._plan(campos, tuple(extra_paths))
+        return queryset.prefetch_related(None).values_list(*paths, named=True)
+
+    def serialize(self, rows, campos=None, extra_paths=()):
+        campos = frozenset(campos) if campos is not None else None
+        _, chaves, row_to_dict = self._plan(campos, tuple(extra_paths))
+        rows = list(rows)
+        relacoes = {
+            chave: self.relations[chave].fetch_grouped([row[0] for row in rows])
+            for chave in chaves if chave in self.relations
+        }
+        if not relacoes:
+            return [row_to_dict(row) for row in rows]
+
+        data = []
+        for row in rows:
+            item = row_to_dict(row)
+            for chave, agrupado in relacoes.items():
+                item[chave] = agrupado[row[0]]
+            # Mantém a ordem de chaves do serializer
+            data.append({chave: item[chave] for chave in chaves if chave in item})
+        return data
+
+
+PROFESSOR_FAST_READ = FastReadSpec(
+    ProfessorSerializer, 'id_professor',
+    columns=[
+        ('id_professor', 'id_professor', 'str'),
+        ('nome', 'nome', 'str'),
+        ('departamento', 'departamento__nome_departamento', 'omit_none'),
+        ('email', 'email', 'str'),
+        ('link_citations', 'link_citations', 'str'),
+        ('lattes_link', 'professorlattes__link', 'raw'),
+    ],
+)
+
+ALUNO_FAST_READ = FastReadSpec(
+    AlunoSerializer, 'id_aluno',
+    columns=[
+        ('id_aluno', 'id_aluno', 'str'),
+        ('nome', 'nome', 'str'),
+        ('email', 'email', 'str'),
+        ('curso', 'curso__nome', 'str'),
+        ('telefone', 'telefone', 'str'),
+    ],
+)
+
+PROJETO_FAST_READ = FastReadSpec(
+    ProjetoSerializer, 'id_proj',
+    columns=[
+        ('id_proj', 'id_proj', 'str'),
+        ('tema', 'tema', 'str'),
+        ('tipo', 'tipo', 'raw'),
+        ('resumo', 'resumo', 'str'),
+        ('palavra_chave', 'palavra_chave', 'str'),
+        ('duracao', 'duracao', 'raw'),
+        ('bolsa', 'bolsa', 'raw'),
+        ('pendencia', 'pendencia', 'raw'),
+        ('pendencia_display', 'pendencia', dict(Projeto.StatusProjeto.choices)),
+        ('mongo_id', 'mongo_id', 'str'),
+        ('melhor_corretor', 'melhor_corretor', 'str'),
+    ],
+    relations={
+        'orientadores_status': RelationSpec('orientador', [
+            ('id_professor', 'professor__id_professor', 'str'),
+            ('nome_professor', 'professor__nome', 'str'),
+            ('ativo', 'ativo', 'raw'),
+        ]),
+        'assessores_status': RelationSpec('assessor', [
+            ('id_professor', 'professor__id_professor', 'str'),
+            ('nome_professor', 'professor__nome', 'str'),
+            ('ativo', 'ativo', 'raw'),
+        ]),
+        'alunos_status': RelationSpec('aluno', [
+            ('id_aluno', 'aluno__id_aluno', 'str'),
+            ('nome_aluno', 'aluno__nome', 'str'),
+            ('ativo', 'ativo', 'raw'),
+        ]),
+    },
+)
+
+
+class FastReadListMixin:
+    """
+    Listagem opcional pelo caminho rápido (``?fast=1``). Respeita os filtros,
+    a ordenação e a paginação da view e, se ela tiver ``get_requested_fields``,
+    também os sparse fieldsets.
+    """
+    fast_read_spec = None
+    fast_query_param = 'fast'
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.fast_query_param, '').lower() not in ('1', 'true', 'sim'):
+            return super().list(request, *args, **kwargs)
+
+        spec = self.fast_read_spec
+        get_fields = getattr(self, 'get_requested_fields', None)
+        campos = get_fields() if get_fields else None
+        queryset = self.filter_queryset(self.get_queryset())
+        # Colunas de ordenação (e anotações como a relevância da busca) precisam
+        # estar nas tuplas para o cursor da paginação
+        extra_paths = tuple(getattr(self, 'ordering_fields', None) or ()) + tuple(queryset.query.annotations)
+
+        queryset = spec.values_queryset(queryset, campos, extra_paths)
+        page = self.paginate_queryset(queryset)
+        data = spec.serialize(page if page is not None else queryset, campos, extra_paths)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,162 @@
+# core/filters.py
+from datetime import date
+
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.filters import BaseFilterBackend
+
+from . import repositories as core_repo
+from . import search
+from .models import Projeto, AlunoProj, Orientador, Assessor, ProjetoPalavraChave
+
+
+# Rótulos de pendência pré-calculados (antes era um loop em choices a cada requisição)
+PENDENCIA_LABELS = [(valor, rotulo.lower()) for valor, rotulo in Projeto.StatusProjeto.choices]
+TIPO_LABELS = dict(Projeto.TipoPesquisa.choices)
+BOLSA_LABELS = dict(Projeto.BOLSA_CHOICES)
+STATUS_LABELS = dict(Projeto.StatusProjeto.choices)
+
+# Dimensões disponíveis em ?facetas=
+FACET_DIMENSIONS = {
+    'tipo': TIPO_LABELS,
+    'bolsa': BOLSA_LABELS,
+    'pendencia': STATUS_LABELS,
+}
+
+
+def _split(valor):
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+def _ints(valor):
+    """ Lista de inteiros separados por vírgula; valores inválidos são ignorados. """
+    inteiros = []
+    for parte in _split(valor):
+        try:
+            inteiros.append(int(parte))
+        except ValueError:
+            pass
+    return inteiros
+
+
+def _date(valor):
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_pendencia(valor):
+    """
+    Aceita o código numérico do status ou um trecho do rótulo
+    (ex.: 'assessor'), devolvendo o primeiro status que casar.
+    """
+    if valor.isdigit():
+        return int(valor)
+    texto = valor.lower()
+    for status_valor, rotulo in PENDENCIA_LABELS:
+        if texto in rotulo:
+            return status_valor
+    return None
+
+
+class ProjetoFilterBackend(BaseFilterBackend):
+    """
+    Filtros de projeto por query param:
+
+    * ``tipo``, ``bolsa`` - um ou mais valores separados por vírgula
+    * ``pendencia`` - código ou trecho do rótulo do status
+    * ``aluno_id``, ``orientador_id``, ``assessor_id`` - participante
+    * ``departamento_id`` - departamento de algum orientador do projeto
+    * ``datainicio_de`` / ``datainicio_ate`` - início de alguma orientação
+      (datas ISO, limites inclusivos)
+    * ``palavra_chave`` - palavra-chave exata (sem diferenciar acentos)
+    * ``q`` - busca textual em tema, palavras-chave e resumo; sem
+      ``?ordering=`` o resultado vem do mais para o menos relevante
+
+    Filtros sobre as associações viram subconsultas ``EXISTS``, então cada
+    projeto aparece uma única vez sem precisar de ``DISTINCT``. Valores
+    inválidos são ignorados, como antes.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return self.filter_params(queryset, request.query_params)
+
+    def filter_params(self, queryset, params):
+        """ Aplica os filtros a partir de um mapeamento de parâmetros (fora de uma requisição). """
+        tipos = _ints(params.get('tipo', ''))
+        if tipos:
+            queryset = queryset.filter(tipo__in=tipos)
+
+        bolsas = [b.upper() for b in _split(params.get('bolsa', ''))]
+        if bolsas:
+            queryset = queryset.filter(bolsa__in=bolsas)
+
+        pendencia = params.get('pendencia')
+        if pendencia:
+            status_valor = resolve_pendencia(pendencia)
+            if status_valor is not None:
+                queryset = queryset.filter(pendencia=status_valor)
+
+        participantes = (
+            ('aluno_id', AlunoProj, 'aluno_id'),
+            ('orientador_id', Orientador, 'professor_id'),
+            ('assessor_id', Assessor, 'professor_id'),
+        )
+        for param, model, campo in participantes:
+            ids = _ints(params.get(param, ''))
+            if ids:
+                queryset = queryset.filter(Exists(
+                    model.objects.filter(projeto_id=OuterRef('pk'), **{f'{campo}__in': ids})
+                ))
+
+        orientacoes = {}
+        departamentos = _ints(params.get('departamento_id', ''))
+        if departamentos:
+            orientacoes['professor__departamento_id__in'] = departamentos
+        inicio_de = _date(params.get('datainicio_de'))
+        if inicio_de:
+            orientacoes['datainicio__gte'] = inicio_de
+        inicio_ate = _date(params.get('datainicio_ate'))
+        if inicio_ate:
+            orientacoes['datainicio__lte'] = inicio_ate
+        if orientacoes:
+            queryset = queryset.filter(Exists(
+                Orientador.objects.filter(projeto_id=OuterRef('pk'), **orientacoes)
+            ))
+
+        palavra = search.fold(' '.join(params.get('palavra_chave', '').split()))
+        if palavra:
+            queryset = queryset.filter(Exists(
+                ProjetoPalavraChave.objects.filter(projeto_id=OuterRef('pk'), palavra__termo=palavra)
+            ))
+
+        texto = params.get('q', '').strip()
+        if texto:
+            queryset = core_repo.search_projects(queryset, texto)
+
+        return queryset
+
+
+def facet_counts(queryset, dimensoes=None):
+    """
+    Contagens por valor de cada dimensão (tipo, bolsa, pendencia) para o
+    queryset já filtrado, calculadas com uma única consulta agrupada.
+    """
+    dimensoes = [d for d in (dimensoes or FACET_DIMENSIONS) if d in FACET_DIMENSIONS]
+    if not dimensoes:
+        return {}
+
+    totais = {dimensao: {} for dimensao in dimensoes}
+    linhas = queryset.order_by().values(*dimensoes).annotate(total=Count('pk'))
+    for linha in linhas:
+        for dimensao in dimensoes:
+            valor = linha[dimensao]
+            totais[dimensao][valor] = totais[dimensao].get(valor, 0) + linha['total']
+
+    return {
+        dimensao: [
+            {'valor': valor, 'rotulo': FACET_DIMENSIONS[dimensao].get(valor), 'total': total}
+            for valor, total in sorted(contagens.items(), key=lambda item: -item[1])
+        ]
+        for dimensao, contagens in totais.items()
+    }
@@ -0,0 +1,48 @@
+# core/management/commands/export_projects.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.core.export import FORMATOS, gzip_stream, iter_export
+from src.core.streaming import DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Exporta os projetos com participantes e rótulos (CSV ou JSONL), em streaming.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=FORMATOS, default='csv')
+        parser.add_argument(
+            '--saida', help='Arquivo de saída; terminado em .gz é comprimido. Padrão: saída padrão.'
+        )
+        parser.add_argument('--gzip', action='store_true', help='Comprime a saída (gzip).')
+        parser.add_argument('--tipo', help='Um ou mais tipos, separados por vírgula.')
+        parser.add_argument('--pendencia', help='Código ou trecho do rótulo do status.')
+        parser.add_argument('--bolsa', help='Uma ou mais bolsas, separadas por vírgula.')
+        parser.add_argument('--de', dest='datainicio_de', help='Início de orientação a partir de (AAAA-MM-DD).')
+        parser.add_argument('--ate', dest='datainicio_ate', help='Início de orientação até (AAAA-MM-DD).')
+        parser.add_argument('--lote', type=int, default=DEFAULT_CHUNK_SIZE, help='Projetos por bloco de leitura.')
+
+    def handle(self, *args, **options):
+        params = {
+            nome: options[nome]
+            for nome in ('tipo', 'pendencia', 'bolsa', 'datainicio_de', 'datainicio_ate')
+            if options[nome]
+        }
+        chunks = iter_export(params, options['formato'], chunk_size=options['lote'])
+        saida = options['saida']
+        if options['gzip'] or (saida and saida.endswith('.gz')):
+            chunks = gzip_stream(chunks)
+
+        try:
+            destino = open(saida, 'wb') if saida else sys.stdout.buffer
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            for chunk in chunks:
+                destino.write(chunk)
+        finally:
+            if saida:
+                destino.close()
+        if saida:
+            self.stdout.write(self.style.SUCCESS(f'Projetos exportados em {saida}'))
@@ -0,0 +1,40 @@
+# core/management/commands/import_roster.py
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from src.core import services
+from src.core.roster import Rejeitos, formato_do_arquivo
+
+
+class Command(BaseCommand):
+    help = 'Importa (insere ou atualiza) alunos ou professores em massa a partir de um arquivo CSV ou JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=['alunos', 'professores'])
+        parser.add_argument('arquivo', help='Caminho do roster (.csv, .jsonl ou .ndjson).')
+        parser.add_argument('--formato', choices=['csv', 'jsonl'], help='Padrão: deduzido da extensão.')
+        parser.add_argument(
+            '--rejeitos', help='Arquivo JSONL das linhas rejeitadas. Padrão: <arquivo>.rejeitos.jsonl'
+        )
+        parser.add_argument('--lote', type=int, help='Linhas por transação (padrão: CORE_ROSTER_BATCH_SIZE).')
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        caminho_rejeitos = options['rejeitos'] or f'{caminho}.rejeitos.jsonl'
+        try:
+            formato = formato_do_arquivo(caminho, options['formato'])
+            with open(caminho, 'rb') as arquivo, open(caminho_rejeitos, 'w', encoding='utf-8') as saida:
+                resumo = services.import_roster(
+                    options['tipo'], arquivo, formato, Rejeitos(saida), lote=options['lote']
+                )
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumo['lidas']} linhas lidas: {resumo['criados']} criados, "
+            f"{resumo['atualizados']} atualizados, {resumo['rejeitadas']} rejeitadas."
+        ))
+        if resumo['rejeitadas']:
+            self.stdout.write(self.style.WARNING(f'Linhas rejeitadas em {caminho_rejeitos}'))
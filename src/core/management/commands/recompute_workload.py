@@ -0,0 +1,21 @@
+# core/management/commands/recompute_workload.py
+from django.core.management.base import BaseCommand
+
+from src.core import repositories as repo
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de orientações/assessorias ativas (CargaProfessor) a partir das associações.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--professor', type=int, action='append', dest='professores',
+            help='ID do professor a recalcular (pode repetir). Padrão: todos.'
+        )
+        parser.add_argument('--lote', type=int, default=1000, help='Professores por transação.')
+
+    def handle(self, *args, **options):
+        verificados, corrigidos = repo.recompute_workload(options['professores'], lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{verificados} professores verificados, {corrigidos} contadores corrigidos.'
+        ))
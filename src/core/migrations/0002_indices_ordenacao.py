@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['nome'], name='alunos_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['nome'], name='professores_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projeto',
+            index=models.Index(fields=['tema'], name='projetos_tema_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_indices_ordenacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoTabela',
+            fields=[
+                ('tabela', models.CharField(max_length=63, primary_key=True, serialize=False)),
+                ('versao', models.BigIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'versoes_tabelas',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_versoes_tabelas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orientador',
+            index=models.Index(fields=['projeto', 'datainicio'], name='orientador_proj_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projeto',
+            index=models.Index(fields=['tipo', 'pendencia', 'bolsa'], name='projetos_facetas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projeto',
+            index=models.Index(fields=['pendencia'], name='projetos_pendencia_idx'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+# Cópia congelada da normalização e do DDL de core/search.py na data desta
+# migração: mudanças futuras em search.py não alteram o que ela cria.
+SEARCH_TABLE = 'projetos_busca'
+BATCH = 1000
+
+FIELD_WEIGHTS = (('tema', 3), ('palavra_chave', 2), ('resumo', 1))
+
+STOPWORDS = frozenset((
+    'a', 'ao', 'aos', 'as', 'com', 'como', 'da', 'das', 'de', 'do', 'dos', 'e',
+    'em', 'entre', 'na', 'nas', 'no', 'nos', 'o', 'os', 'ou', 'para', 'pela',
+    'pelas', 'pelo', 'pelos', 'por', 'que', 'se', 'sem', 'sobre', 'um', 'uma',
+    'umas', 'uns',
+))
+
+PLURAL_SUFFIXES = (
+    ('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'),
+    ('les', 'l'), ('res', 'r'), ('zes', 'z'), ('ns', 'm'), ('s', ''),
+)
+
+NOMINAL_SUFFIXES = (
+    'amentos', 'imentos', 'amento', 'imento', 'adoras', 'adores', 'acoes',
+    'adora', 'ancia', 'encia', 'idade', 'mente', 'ismos', 'istas', 'ador',
+    'acao', 'icao', 'ucao', 'avel', 'ivel', 'ismo', 'ista', 'ante', 'ente',
+    'osa', 'oso', 'ica', 'ico', 'iva', 'ivo', 'cao',
+)
+
+MIN_STEM = 3
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def fold(texto):
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def stem(palavra):
+    if len(palavra) <= MIN_STEM or palavra.isdigit():
+        return palavra
+    for sufixo, troca in PLURAL_SUFFIXES:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= MIN_STEM:
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+    for sufixo in NOMINAL_SUFFIXES:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= MIN_STEM:
+            palavra = palavra[:-len(sufixo)]
+            break
+    if palavra[-1] in 'aeo' and len(palavra) > MIN_STEM:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def build_document(projeto):
+    partes = []
+    for campo, peso in FIELD_WEIGHTS:
+        termos = ' '.join(
+            stem(token) for token in _TOKEN_RE.findall(fold(getattr(projeto, campo))) if token not in STOPWORDS
+        )
+        if termos:
+            partes.extend([termos] * peso)
+    return ' '.join(partes)
+
+
+DDL = {
+    'postgresql': [
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        ' id_proj integer PRIMARY KEY REFERENCES projetos (id_proj) ON DELETE CASCADE,'
+        " documento text NOT NULL DEFAULT '')",
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_gin ON {SEARCH_TABLE}'
+        " USING GIN (to_tsvector('simple', documento))",
+    ],
+    'sqlite': [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}'
+        " USING fts5(documento, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+}
+INSERT = {
+    'postgresql': f'INSERT INTO {SEARCH_TABLE} (id_proj, documento) VALUES (%s, %s)',
+    'sqlite': f'INSERT INTO {SEARCH_TABLE} (rowid, documento) VALUES (%s, %s)',
+}
+
+
+def criar_indice(apps, schema_editor):
+    """ Cria o índice textual do banco em uso e indexa os projetos existentes. """
+    conn = schema_editor.connection
+    if conn.vendor not in DDL:
+        return
+    for sql in DDL[conn.vendor]:
+        schema_editor.execute(sql)
+    Projeto = apps.get_model('core', 'Projeto')
+    projetos = Projeto.objects.using(conn.alias).only('id_proj', 'tema', 'palavra_chave', 'resumo')
+    lote = []
+    with conn.cursor() as cursor:
+        for projeto in projetos.iterator(chunk_size=BATCH):
+            lote.append((projeto.pk, build_document(projeto)))
+            if len(lote) >= BATCH:
+                cursor.executemany(INSERT[conn.vendor], lote)
+                lote = []
+        if lote:
+            cursor.executemany(INSERT[conn.vendor], lote)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor in DDL:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
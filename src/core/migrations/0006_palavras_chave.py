@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:18
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH = 1000
+
+
+def fold(texto):
+    """ Cópia de core/search.py na data desta migração. """
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def split_keywords(texto):
+    """ {termo normalizado: grafia original} (cópia de core/search.py). """
+    termos = {}
+    for parte in re.split(r'[,;]', texto or ''):
+        rotulo = ' '.join(parte.split())
+        termo = fold(rotulo)
+        if termo and termo not in termos:
+            termos[termo] = rotulo[:255]
+    return {termo[:255]: rotulo for termo, rotulo in termos.items()}
+
+
+def ligar_palavras(textos, PalavraChave, link_model, owner_field):
+    """ Cria o vocabulário e as ligações de donos recém-carregados ({id: texto}). """
+    por_dono = {dono: split_keywords(texto) for dono, texto in textos.items()}
+    todos = {}
+    for termos in por_dono.values():
+        for termo, rotulo in termos.items():
+            todos.setdefault(termo, rotulo)
+    if not todos:
+        return
+    ids = dict(PalavraChave.objects.filter(termo__in=todos).values_list('termo', 'id'))
+    PalavraChave.objects.bulk_create(
+        [PalavraChave(termo=termo, rotulo=rotulo) for termo, rotulo in todos.items() if termo not in ids],
+        ignore_conflicts=True,
+    )
+    ids.update(PalavraChave.objects.filter(termo__in=[t for t in todos if t not in ids]).values_list('termo', 'id'))
+    link_model.objects.bulk_create(
+        [
+            link_model(**{f'{owner_field}_id': dono, 'palavra_id': ids[termo]})
+            for dono, termos in por_dono.items() for termo in termos
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def carregar_palavras_chave(apps, schema_editor):
+    """ Preenche o vocabulário e as ligações a partir dos textos existentes. """
+    PalavraChave = apps.get_model('core', 'PalavraChave')
+    fontes = (
+        (apps.get_model('core', 'ProfessorLattes'), 'palavras_chave',
+         apps.get_model('core', 'ProfessorPalavraChave'), 'lattes'),
+        (apps.get_model('core', 'Projeto'), 'palavra_chave',
+         apps.get_model('core', 'ProjetoPalavraChave'), 'projeto'),
+    )
+    for model, campo, link_model, owner_field in fontes:
+        linhas = model.objects.exclude(**{f'{campo}__isnull': True}).exclude(**{campo: ''}).values_list('pk', campo)
+        lote = {}
+        for pk, texto in linhas:
+            lote[pk] = texto
+            if len(lote) >= BATCH:
+                ligar_palavras(lote, PalavraChave, link_model, owner_field)
+                lote = {}
+        ligar_palavras(lote, PalavraChave, link_model, owner_field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_busca_projetos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalavraChave',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('termo', models.CharField(max_length=255, unique=True)),
+                ('rotulo', models.CharField(help_text='Grafia original da primeira ocorrência', max_length=255)),
+            ],
+            options={
+                'db_table': 'palavras_chave',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfessorPalavraChave',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('lattes', models.ForeignKey(db_column='id_professor', on_delete=django.db.models.deletion.CASCADE, related_name='palavras_normalizadas', to='core.professorlattes')),
+                ('palavra', models.ForeignKey(db_column='id_palavra', on_delete=django.db.models.deletion.CASCADE, to='core.palavrachave')),
+            ],
+            options={
+                'db_table': 'professores_palavras_chave',
+                'unique_together': {('palavra', 'lattes')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjetoPalavraChave',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('palavra', models.ForeignKey(db_column='id_palavra', on_delete=django.db.models.deletion.CASCADE, to='core.palavrachave')),
+                ('projeto', models.ForeignKey(db_column='id_proj', on_delete=django.db.models.deletion.CASCADE, related_name='palavras_normalizadas', to='core.projeto')),
+            ],
+            options={
+                'db_table': 'projetos_palavras_chave',
+                'unique_together': {('palavra', 'projeto')},
+            },
+        ),
+        migrations.RunPython(carregar_palavras_chave, migrations.RunPython.noop),
+    ]
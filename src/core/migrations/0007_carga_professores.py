@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH = 1000
+
+
+def calcular_cargas(apps, schema_editor):
+    """ Preenche os contadores a partir das associações ativas existentes. """
+    Professor = apps.get_model('core', 'Professor')
+    CargaProfessor = apps.get_model('core', 'CargaProfessor')
+    contagens = {}
+    for indice, nome in enumerate(('Orientador', 'Assessor')):
+        model = apps.get_model('core', nome)
+        ativos = model.objects.filter(ativo=True).order_by().values('professor_id').annotate(total=models.Count('id'))
+        for linha in ativos:
+            contagens.setdefault(linha['professor_id'], [0, 0])[indice] = linha['total']
+    cargas = []
+    for pk in Professor.objects.values_list('pk', flat=True):
+        orientacoes, assessorias = contagens.get(pk, (0, 0))
+        cargas.append(CargaProfessor(professor_id=pk, orientacoes_ativas=orientacoes, assessorias_ativas=assessorias))
+    CargaProfessor.objects.bulk_create(cargas, batch_size=BATCH)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_palavras_chave'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaProfessor',
+            fields=[
+                ('professor', models.OneToOneField(db_column='id_professor', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='carga', serialize=False, to='core.professor')),
+                ('orientacoes_ativas', models.IntegerField(default=0)),
+                ('assessorias_ativas', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'cargas_professores',
+            },
+        ),
+        migrations.RunPython(calcular_cargas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+from collections import Counter
+
+from django.db import migrations, models
+
+IC = 1
+# Associação -> (campo da pessoa, contador de CargaProfessor)
+PAPEIS = (
+    ('AlunoProj', 'aluno_id', None),
+    ('Orientador', 'professor_id', 'orientacoes_ativas'),
+    ('Assessor', 'professor_id', 'assessorias_ativas'),
+)
+
+
+def copiar_tipo_projeto(apps, schema_editor):
+    """ Copia Projeto.tipo para as associações antes de criar os índices parciais. """
+    Projeto = apps.get_model('core', 'Projeto')
+    for nome in ('AlunoProj', 'Orientador', 'Assessor'):
+        model = apps.get_model('core', nome)
+        model.objects.update(tipo_projeto=models.Subquery(
+            Projeto.objects.filter(pk=models.OuterRef('projeto_id')).values('tipo')[:1]
+        ))
+
+
+def desativar_excedentes_ic(apps, schema_editor):
+    """
+    Dados anteriores à regra podem ter projetos de IC com mais de um
+    participante ativo no mesmo papel, o que impediria criar os índices
+    parciais. Mantém ativo o mais antigo (datainicio, id), desativa os
+    demais, ajusta CargaProfessor e informa os projetos corrigidos.
+    """
+    CargaProfessor = apps.get_model('core', 'CargaProfessor')
+    for nome, pessoa, contador in PAPEIS:
+        model = apps.get_model('core', nome)
+        ativos_ic = model.objects.filter(ativo=True, tipo_projeto=IC)
+        repetidos = list(
+            ativos_ic.order_by().values('projeto_id').annotate(total=models.Count('id'))
+            .filter(total__gt=1).values_list('projeto_id', flat=True)
+        )
+        excedentes = []
+        for projeto_id in repetidos:
+            excedentes += list(ativos_ic.filter(projeto_id=projeto_id).order_by('datainicio', 'id').values_list('id', pessoa)[1:])
+        if not excedentes:
+            continue
+        model.objects.filter(id__in=[pk for pk, _ in excedentes]).update(ativo=False)
+        if contador:
+            for professor_id, total in Counter(p for _, p in excedentes).items():
+                CargaProfessor.objects.filter(professor_id=professor_id).update(**{contador: models.F(contador) - total})
+        print(
+            f"\n  Regra de IC: {len(excedentes)} {nome} desativado(s) nos projetos "
+            f"{', '.join(map(str, sorted(repetidos)))} (mais de um ativo; mantido o mais antigo)."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_carga_professores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alunoproj',
+            name='tipo_projeto',
+            field=models.IntegerField(blank=True, editable=False, help_text='Cópia de Projeto.tipo', null=True),
+        ),
+        migrations.AddField(
+            model_name='assessor',
+            name='tipo_projeto',
+            field=models.IntegerField(blank=True, editable=False, help_text='Cópia de Projeto.tipo', null=True),
+        ),
+        migrations.AddField(
+            model_name='orientador',
+            name='tipo_projeto',
+            field=models.IntegerField(blank=True, editable=False, help_text='Cópia de Projeto.tipo', null=True),
+        ),
+        migrations.RunPython(copiar_tipo_projeto, migrations.RunPython.noop),
+        migrations.RunPython(desativar_excedentes_ic, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alunoproj',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True), ('tipo_projeto', 1)), fields=('projeto',), name='aluno_proj_ic_um_ativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='assessor',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True), ('tipo_projeto', 1)), fields=('projeto',), name='assessores_ic_um_ativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='orientador',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True), ('tipo_projeto', 1)), fields=('projeto',), name='orientador_ic_um_ativo'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+from django.db import migrations
+
+ASSOCIACOES = ('aluno_proj', 'orientador', 'assessores')
+
+# PostgreSQL / CockroachDB (PL/pgSQL): tipo_projeto é sempre o tipo do
+# projeto, na inserção da associação e quando o tipo do projeto muda
+POSTGRES = [
+    """
+    CREATE OR REPLACE FUNCTION projetos_propaga_tipo() RETURNS trigger AS $$
+    BEGIN
+        UPDATE aluno_proj SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+        UPDATE orientador SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+        UPDATE assessores SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER projetos_propaga_tipo AFTER UPDATE ON projetos
+    FOR EACH ROW WHEN (OLD.tipo IS DISTINCT FROM NEW.tipo)
+    EXECUTE FUNCTION projetos_propaga_tipo()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION associacao_copia_tipo() RETURNS trigger AS $$
+    BEGIN
+        NEW.tipo_projeto := (SELECT tipo FROM projetos WHERE id_proj = NEW.id_proj);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        f"""
+        CREATE TRIGGER {tabela}_copia_tipo BEFORE INSERT OR UPDATE OF id_proj, tipo_projeto ON {tabela}
+        FOR EACH ROW EXECUTE FUNCTION associacao_copia_tipo()
+        """
+        for tabela in ASSOCIACOES
+    ),
+]
+POSTGRES_REVERSO = [
+    'DROP TRIGGER IF EXISTS projetos_propaga_tipo ON projetos',
+    *(f'DROP TRIGGER IF EXISTS {tabela}_copia_tipo ON {tabela}' for tabela in ASSOCIACOES),
+    'DROP FUNCTION IF EXISTS projetos_propaga_tipo()',
+    'DROP FUNCTION IF EXISTS associacao_copia_tipo()',
+]
+
+# SQLite: o gatilho não altera NEW; corrige a linha logo após gravá-la
+# (uma violação do índice de IC no UPDATE aborta o comando original)
+SQLITE = [
+    """
+    CREATE TRIGGER projetos_propaga_tipo AFTER UPDATE OF tipo ON projetos
+    WHEN OLD.tipo IS NOT NEW.tipo
+    BEGIN
+        UPDATE aluno_proj SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+        UPDATE orientador SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+        UPDATE assessores SET tipo_projeto = NEW.tipo WHERE id_proj = NEW.id_proj;
+    END
+    """,
+    *(
+        f"""
+        CREATE TRIGGER {tabela}_copia_tipo_{evento} AFTER {comando} ON {tabela}
+        WHEN NEW.tipo_projeto IS NOT (SELECT tipo FROM projetos WHERE id_proj = NEW.id_proj)
+        BEGIN
+            UPDATE {tabela} SET tipo_projeto = (SELECT tipo FROM projetos WHERE id_proj = NEW.id_proj)
+            WHERE id = NEW.id;
+        END
+        """
+        for tabela in ASSOCIACOES
+        for evento, comando in (('insert', 'INSERT'), ('update', 'UPDATE OF id_proj, tipo_projeto'))
+    ),
+]
+SQLITE_REVERSO = [
+    'DROP TRIGGER IF EXISTS projetos_propaga_tipo',
+    *(
+        f'DROP TRIGGER IF EXISTS {tabela}_copia_tipo_{evento}'
+        for tabela in ASSOCIACOES for evento in ('insert', 'update')
+    ),
+]
+
+GATILHOS = {
+    'postgresql': (POSTGRES, POSTGRES_REVERSO),
+    'cockroachdb': (POSTGRES, POSTGRES_REVERSO),
+    'sqlite': (SQLITE, SQLITE_REVERSO),
+}
+
+
+def _executar(schema_editor, indice):
+    comandos = GATILHOS.get(schema_editor.connection.vendor)
+    if comandos is None:
+        raise RuntimeError(
+            f'Banco {schema_editor.connection.vendor!r} sem gatilhos para tipo_projeto: '
+            'a regra de IC dependeria de todo UPDATE de projetos passar por Projeto.save().'
+        )
+    for sql in comandos[indice]:
+        schema_editor.execute(sql)
+
+
+def criar_gatilhos(apps, schema_editor):
+    """
+    Mantém a cópia tipo_projeto no próprio banco: UPDATE de projetos
+    (inclusive QuerySet.update e bulk_update, que não passam por save()) e
+    inserções por qualquer caminho (add() de M2M, bulk_create, SQL).
+    """
+    _executar(schema_editor, 0)
+
+
+def remover_gatilhos(apps, schema_editor):
+    _executar(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_regra_ic_no_banco'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_gatilhos, remover_gatilhos),
+    ]
@@ -1,6 +1,6 @@
 # core/models.py
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -25,7 +25,9 @@ class Professor(models.Model):
     link_citations = models.CharField(max_length=500, blank=True, null=True) # CharField
     departamento = models.ForeignKey(Departamento, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_departamento', related_name='professores')
     usuario = models.OneToOneField(User, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_prof')
-    class Meta: db_table = 'professores'
+    class Meta:
+        db_table = 'professores'
+        indexes = [models.Index(fields=['nome'], name='professores_nome_idx')]
     def __str__(self): return self.nome
 
 class Aluno(models.Model):
@@ -34,7 +36,9 @@ class Aluno(models.Model):
     email = models.EmailField(unique=True)
     telefone = models.CharField(max_length=20) # Obrigatório
     curso = models.ForeignKey(Curso, on_delete=models.PROTECT, db_column='id_curso', related_name='alunos') # Obrigatório
-    class Meta: db_table = 'alunos'
+    class Meta:
+        db_table = 'alunos'
+        indexes = [models.Index(fields=['nome'], name='alunos_nome_idx')]
     def __str__(self): return self.nome
 
 class Projeto(models.Model):
@@ -90,9 +94,88 @@ class Projeto(models.Model):
     orientadores = models.ManyToManyField(Professor, through='Orientador', related_name='projetos_orientados')
     assessores = models.ManyToManyField(Professor, through='Assessor', related_name='projetos_assessorados')
     
-    class Meta: db_table = 'projetos'
+    class Meta:
+        db_table = 'projetos'
+        indexes = [
+            models.Index(fields=['tema'], name='projetos_tema_idx'),
+            # Filtros e facetas (tipo, pendencia, bolsa) - ver core/filters.py
+            models.Index(fields=['tipo', 'pendencia', 'bolsa'], name='projetos_facetas_idx'),
+            models.Index(fields=['pendencia'], name='projetos_pendencia_idx'),
+        ]
     def __str__(self): return self.tema if self.tema else f"Projeto {self.id_proj}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tipo_original = instance.__dict__.get('tipo')
+        return instance
+
+    def save(self, *args, **kwargs):
+        tipo_anterior = getattr(self, '_tipo_original', None)
+        if self._state.adding or tipo_anterior is None or tipo_anterior == self.tipo:
+            super().save(*args, **kwargs)
+        else:
+            # O banco copia o tipo para as associações (tipo_projeto, ver a
+            # migração 0009): a regra de IC falha no próprio UPDATE de projetos
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except IntegrityError as e:
+                violada = next((m for m in (AlunoProj, Orientador, Assessor) if _viola_regra_ic(e, m)), None)
+                if violada is not None:
+                    raise ValidationError(violada.IC_MENSAGEM)
+                raise
+        self._tipo_original = self.tipo
+
+# --- Regra de Iniciação Científica (um participante ativo por papel) ---
+# Cada associação guarda uma cópia do tipo do projeto (tipo_projeto) e um
+# índice único parcial em (projeto) WHERE ativo AND tipo_projeto = IC garante
+# a regra no banco, inclusive entre requisições concorrentes. A cópia é
+# mantida por gatilhos do banco (migração 0009), então vale também para
+# QuerySet.update(), bulk_update() e add() de M2M, que não chamam save().
+
+def _ic_constraint(db_table):
+    return models.UniqueConstraint(
+        fields=['projeto'],
+        condition=models.Q(ativo=True, tipo_projeto=Projeto.TipoPesquisa.INICIACAO_CIENTIFICA),
+        name=f'{db_table}_ic_um_ativo',
+    )
+
+def _preparar_tipo_projeto(instance):
+    """ Preenche tipo_projeto, sem consulta quando o projeto já está carregado. """
+    if type(instance).projeto.is_cached(instance):
+        instance.tipo_projeto = instance.projeto.tipo
+    elif instance.tipo_projeto is None and instance.projeto_id:
+        instance.tipo_projeto = Projeto.objects.filter(pk=instance.projeto_id).values_list('tipo', flat=True).first()
+
+def _viola_regra_ic(erro, model):
+    """ Se o IntegrityError veio do índice parcial de IC (e não de outra restrição). """
+    nome = f'{model._meta.db_table}_ic_um_ativo'
+    constraint = getattr(getattr(erro.__cause__, 'diag', None), 'constraint_name', None)
+    if constraint:
+        return constraint == nome
+    # SQLite não informa o nome do índice, só as colunas. O índice de IC é o
+    # único com a coluna id_proj sozinha; o unique_together (pessoa, projeto)
+    # aparece como "<tabela>.id_aluno, <tabela>.id_proj" e não é a regra de IC
+    texto = str(erro)
+    return nome in texto or texto == f'UNIQUE constraint failed: {model._meta.db_table}.id_proj'
+
+def _salvar_participacao(instance, salvar, *args, **kwargs):
+    """
+    Salva a associação, traduzindo a violação do índice de IC para
+    ValidationError. O bloco atômico (savepoint, se já houver transação)
+    mantém a transação externa utilizável após a violação e inclui os
+    ajustes feitos no post_save (ex.: CargaProfessor).
+    """
+    _preparar_tipo_projeto(instance)
+    try:
+        with transaction.atomic():
+            salvar(*args, **kwargs)
+    except IntegrityError as e:
+        if _viola_regra_ic(e, type(instance)):
+            raise ValidationError(instance.IC_MENSAGEM)
+        raise
+
 class AlunoProj(models.Model):
     id = models.AutoField(primary_key=True)
     aluno = models.ForeignKey(Aluno, on_delete=models.CASCADE, db_column='id_aluno')
@@ -100,21 +183,26 @@ class AlunoProj(models.Model):
     ativo = models.BooleanField(default=True)
     datainicio = models.DateField(default=timezone.now)
 
+    tipo_projeto = models.IntegerField(null=True, blank=True, editable=False, help_text="Cópia de Projeto.tipo")
+
+    IC_MENSAGEM = "Projetos de Iniciação Científica só podem ter um aluno ativo por vez."
+
     def save(self, *args, **kwargs):
-        if self.ativo and hasattr(self, 'projeto') and self.projeto_id: # Checa se o projeto existe
-             # Acessa o tipo do projeto de forma segura
-             try:
-                 tipo_projeto = Projeto.objects.get(pk=self.projeto_id).tipo
-                 if tipo_projeto == Projeto.TipoPesquisa.INICIACAO_CIENTIFICA:
-                     if AlunoProj.objects.filter(projeto_id=self.projeto_id, ativo=True).exclude(pk=self.pk).exists():
-                         raise ValidationError("Projetos de Iniciação Científica só podem ter um aluno ativo por vez.")
-             except Projeto.DoesNotExist:
-                 pass # Ou levante um erro se o projeto não existir
-        super().save(*args, **kwargs)
+        _salvar_participacao(self, super().save, *args, **kwargs)
 
     class Meta:
         db_table = 'aluno_proj'
         unique_together = (('aluno', 'projeto'),)
+        constraints = [_ic_constraint('aluno_proj')]
+
+def _estado_carga(instance):
+    """
+    (professor_id, ativo) como carregado do banco, usado para ajustar os
+    contadores de CargaProfessor; None se algum dos campos veio adiado.
+    """
+    if 'professor_id' in instance.__dict__ and 'ativo' in instance.__dict__:
+        return (instance.professor_id, instance.ativo)
+    return None
 
 class Orientador(models.Model):
     id = models.AutoField(primary_key=True)
@@ -122,21 +210,25 @@ class Orientador(models.Model):
     projeto = models.ForeignKey(Projeto, on_delete=models.CASCADE, db_column='id_proj')
     ativo = models.BooleanField(default=True)
     datainicio = models.DateField(default=timezone.now)
+    tipo_projeto = models.IntegerField(null=True, blank=True, editable=False, help_text="Cópia de Projeto.tipo")
+
+    IC_MENSAGEM = "Projetos de Iniciação Científica só podem ter um orientador ativo por vez."
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._carga_original = _estado_carga(instance)
+        return instance
 
     def save(self, *args, **kwargs):
-         if self.ativo and hasattr(self, 'projeto') and self.projeto_id:
-             try:
-                 tipo_projeto = Projeto.objects.get(pk=self.projeto_id).tipo
-                 if tipo_projeto == Projeto.TipoPesquisa.INICIACAO_CIENTIFICA:
-                     if Orientador.objects.filter(projeto_id=self.projeto_id, ativo=True).exclude(pk=self.pk).exists():
-                         raise ValidationError("Projetos de Iniciação Científica só podem ter um orientador ativo por vez.")
-             except Projeto.DoesNotExist:
-                 pass
-         super().save(*args, **kwargs)
+        _salvar_participacao(self, super().save, *args, **kwargs)
 
     class Meta:
         db_table = 'orientador'
         unique_together = (('professor', 'projeto'),)
+        constraints = [_ic_constraint('orientador')]
+        # Filtro por data de início (EXISTS correlacionado por projeto)
+        indexes = [models.Index(fields=['projeto', 'datainicio'], name='orientador_proj_inicio_idx')]
 
 class Assessor(models.Model):
     id = models.AutoField(primary_key=True)
@@ -144,21 +236,23 @@ class Assessor(models.Model):
     projeto = models.ForeignKey(Projeto, on_delete=models.CASCADE, db_column='id_proj')
     ativo = models.BooleanField(default=True)
     datainicio = models.DateField(default=timezone.now)
+    tipo_projeto = models.IntegerField(null=True, blank=True, editable=False, help_text="Cópia de Projeto.tipo")
+
+    IC_MENSAGEM = "Projetos de Iniciação Científica só podem ter um assessor ativo por vez."
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._carga_original = _estado_carga(instance)
+        return instance
 
     def save(self, *args, **kwargs):
-         if self.ativo and hasattr(self, 'projeto') and self.projeto_id:
-             try:
-                 tipo_projeto = Projeto.objects.get(pk=self.projeto_id).tipo
-                 if tipo_projeto == Projeto.TipoPesquisa.INICIACAO_CIENTIFICA:
-                     if Assessor.objects.filter(projeto_id=self.projeto_id, ativo=True).exclude(pk=self.pk).exists():
-                         raise ValidationError("Projetos de Iniciação Científica só podem ter um assessor ativo por vez.")
-             except Projeto.DoesNotExist:
-                 pass
-         super().save(*args, **kwargs)
+        _salvar_participacao(self, super().save, *args, **kwargs)
 
     class Meta:
         db_table = 'assessores'
         unique_together = (('professor', 'projeto'),)
+        constraints = [_ic_constraint('assessores')]
 
 class ProfessorLattes(models.Model):
     professor = models.OneToOneField(Professor, on_delete=models.CASCADE, primary_key=True, db_column='id_professor')
@@ -182,4 +276,55 @@ class HistAluno(models.Model):
         status = "Aprovado" if self.aprovado else "Reprovado"
         # Adiciona verificação se aluno existe antes de acessar o nome
         aluno_nome = self.aluno.nome if self.aluno else "Aluno Desconhecido"
-        return f"Histórico de {aluno_nome} - {self.cod_disciplina} ({status})"
\ No newline at end of file
+        return f"Histórico de {aluno_nome} - {self.cod_disciplina} ({status})"
+
+class CargaProfessor(models.Model):
+    """
+    Contadores de orientações e assessorias ativas por professor, ajustados
+    a cada escrita em Orientador/Assessor (ver signals.py). Divergências são
+    corrigidas com ``manage.py recompute_workload``.
+    """
+    professor = models.OneToOneField(
+        Professor, on_delete=models.CASCADE, primary_key=True, db_column='id_professor', related_name='carga'
+    )
+    orientacoes_ativas = models.IntegerField(default=0)
+    assessorias_ativas = models.IntegerField(default=0)
+    class Meta: db_table = 'cargas_professores'
+    def __str__(self): return f"Carga de {self.professor_id}"
+
+class PalavraChave(models.Model):
+    """ Vocabulário de palavras-chave, normalizado (minúsculas e sem acentos). """
+    id = models.AutoField(primary_key=True)
+    termo = models.CharField(max_length=255, unique=True)
+    rotulo = models.CharField(max_length=255, help_text="Grafia original da primeira ocorrência")
+    class Meta: db_table = 'palavras_chave'
+    def __str__(self): return self.rotulo
+
+class ProfessorPalavraChave(models.Model):
+    id = models.AutoField(primary_key=True)
+    lattes = models.ForeignKey(
+        ProfessorLattes, on_delete=models.CASCADE, db_column='id_professor', related_name='palavras_normalizadas'
+    )
+    palavra = models.ForeignKey(PalavraChave, on_delete=models.CASCADE, db_column='id_palavra')
+    class Meta:
+        db_table = 'professores_palavras_chave'
+        # Índice (palavra, professor): "quem trabalha com X" é uma busca no índice
+        unique_together = (('palavra', 'lattes'),)
+
+class ProjetoPalavraChave(models.Model):
+    id = models.AutoField(primary_key=True)
+    projeto = models.ForeignKey(
+        Projeto, on_delete=models.CASCADE, db_column='id_proj', related_name='palavras_normalizadas'
+    )
+    palavra = models.ForeignKey(PalavraChave, on_delete=models.CASCADE, db_column='id_palavra')
+    class Meta:
+        db_table = 'projetos_palavras_chave'
+        unique_together = (('palavra', 'projeto'),)
+
+class VersaoTabela(models.Model):
+    """ Versão por tabela, incrementada a cada escrita (usada nos ETags da API). """
+    tabela = models.CharField(max_length=63, primary_key=True)
+    versao = models.BigIntegerField(default=0)
+    atualizado_em = models.DateTimeField(default=timezone.now)
+    class Meta: db_table = 'versoes_tabelas'
+    def __str__(self): return f"{self.tabela} (v{self.versao})"
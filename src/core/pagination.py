@@ -0,0 +1,76 @@
+# core/pagination.py
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from . import repositories as core_repo
+
+
+def with_pk_tiebreak(ordering, queryset):
+    """
+    Acrescenta a chave primária como último critério de ordenação. Com
+    colunas não únicas (nome, tema, relevância) a ordem entre empates fica
+    definida e o cursor não repete nem pula registros entre páginas.
+    """
+    ordering = tuple(ordering)
+    pk = queryset.model._meta.pk.name
+    if any(campo.lstrip('-') in (pk, 'pk') for campo in ordering):
+        return ordering
+    return ordering + (pk,)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) sobre uma chave estável.
+
+    Em vez de OFFSET/LIMIT, cada página continua a partir da última chave
+    vista, então o custo de uma página não cresce com o tamanho da tabela.
+    O total exato (COUNT(*)) nunca é calculado; com ``?total=estimado`` a
+    resposta inclui uma estimativa barata do tamanho da tabela.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    total_query_param = 'total'
+
+    def get_ordering(self, request, queryset, view):
+        return with_pk_tiebreak(super().get_ordering(request, queryset, view), queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.request.query_params.get(self.total_query_param) == 'estimado':
+            payload['total_estimado'] = core_repo.estimate_table_rows(self.queryset.model)
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['total_estimado'] = {
+            'type': 'integer',
+            'nullable': True,
+        }
+        return response_schema
+
+
+class ProjetoPagination(KeysetPagination):
+    ordering = 'id_proj'
+
+    def get_ordering(self, request, queryset, view):
+        # Resultados da busca textual (?q=) seguem a relevância, salvo ?ordering= explícito
+        if 'relevancia' in queryset.query.annotations and not request.query_params.get('ordering'):
+            return with_pk_tiebreak(('relevancia',), queryset)
+        return super().get_ordering(request, queryset, view)
+
+
+class AlunoPagination(KeysetPagination):
+    ordering = 'id_aluno'
+
+
+class ProfessorPagination(KeysetPagination):
+    ordering = 'id_professor'
@@ -0,0 +1,234 @@
+# core/pool.py
+"""
+Reaproveitamento de conexões com o banco entre requisições, com métricas.
+
+O modo vem de ``CORE_DB_POOLING`` (padrão ``'persistente'``) e é aplicado ao
+DATABASES pelo ``CoreConfig.ready()`` (``configure_from_settings``), antes
+da primeira conexão; ``CORE_DB_POOL_OPTIONS`` repassa ``max_age``,
+``min_size``, ``max_size`` e ``timeout`` a ``configure_pooling``:
+
+* ``'pool'`` - pool do psycopg 3 (``OPTIONS['pool']`` do backend PostgreSQL
+  do Django, herdado pelo django-cockroachdb). Exige psycopg 3 e
+  psycopg_pool; sem eles, ou em outros bancos, cai para o modo persistente;
+* ``'persistente'`` - cada thread mantém sua conexão por ``CONN_MAX_AGE``
+  segundos, validada com ``CONN_HEALTH_CHECKS`` (psycopg2, SQLite);
+* ``'desligado'`` - uma conexão por requisição.
+
+Em qualquer modo, ``tracker`` conta, por alias e por processo, checkouts,
+conexões novas (handshake TCP/TLS/autenticação), conexões em uso e ociosas
+e as falhas ao obter a conexão. Nada é aberto no início da requisição: o
+checkout é registrado pelo sinal ``connection_created`` ou pela primeira
+consulta (um execute wrapper retirado logo após o uso), então requisições
+que não usam o banco não pagam uma conexão. A falha é uma exceção de banco
+que encerra a requisição antes de qualquer consulta (``got_request_exception``).
+``pool_stats()`` junta esses números às estatísticas do pool do psycopg,
+quando houver, de onde vem também a espera por uma conexão livre.
+``drain()`` fecha conexões e pools; é registrado com ``atexit`` e pode ser
+chamado também do hook ``worker_exit`` do gunicorn.
+"""
+import atexit
+import importlib.util
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+POOL_ENGINES = ('django.db.backends.postgresql', 'django_cockroachdb')
+DEFAULT_MAX_AGE = 60
+DEFAULT_MODO = 'persistente'
+
+
+def _suporta_pool(engine):
+    return engine in POOL_ENGINES and all(
+        importlib.util.find_spec(modulo) is not None for modulo in ('psycopg', 'psycopg_pool')
+    )
+
+
+def configure_pooling(databases, modo='persistente', max_age=DEFAULT_MAX_AGE, min_size=2, max_size=10, timeout=10.0):
+    """
+    Ajusta o dict DATABASES do settings para o modo pedido (``'pool'``,
+    ``'persistente'`` ou ``'desligado'``) e o devolve.
+    """
+    for config in databases.values():
+        config['CONN_HEALTH_CHECKS'] = modo != 'desligado'
+        if modo == 'pool' and _suporta_pool(config.get('ENGINE', '')):
+            # O pool do Django não aceita conexões persistentes ao mesmo tempo
+            config['CONN_MAX_AGE'] = 0
+            config.setdefault('OPTIONS', {})['pool'] = {
+                'min_size': min_size, 'max_size': max_size, 'timeout': timeout,
+            }
+        elif modo == 'desligado':
+            config['CONN_MAX_AGE'] = 0
+        else:
+            config['CONN_MAX_AGE'] = max_age
+    return databases
+
+
+def configure_from_settings():
+    """ Aplica ``CORE_DB_POOLING`` / ``CORE_DB_POOL_OPTIONS`` ao DATABASES do settings. """
+    modo = getattr(settings, 'CORE_DB_POOLING', DEFAULT_MODO)
+    if modo:
+        configure_pooling(settings.DATABASES, modo, **getattr(settings, 'CORE_DB_POOL_OPTIONS', {}))
+
+
+def _modo(conn):
+    if conn.settings_dict.get('OPTIONS', {}).get('pool'):
+        return 'pool'
+    return 'persistente' if conn.settings_dict.get('CONN_MAX_AGE') else 'sem_reuso'
+
+
+def _pool_aberto(conn):
+    """ Pool do psycopg já criado para o alias (sem criar um novo). """
+    return getattr(conn, '_connection_pools', {}).get(conn.alias)
+
+
+class ConnectionTracker:
+    """ Contadores de uso das conexões deste processo, por alias. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estado = {}  # alias -> {id(conexão da thread): 'uso' | 'ociosa'}
+        self._contadores = {}
+
+    def aliases(self):
+        return getattr(settings, 'CORE_DB_POOL_ALIASES', ('default',))
+
+    def _contador(self, alias):
+        return self._contadores.setdefault(alias, dict.fromkeys(('checkouts', 'conexoes_novas', 'falhas'), 0))
+
+    def begin_request(self):
+        """
+        Início da requisição: só marca os aliases como ainda não usados, sem
+        abrir conexão. O checkout é contado no primeiro uso real (``_usar``),
+        então requisições que não tocam o banco não conectam.
+        """
+        for alias in self.aliases():
+            conn = connections[alias]
+            conn._core_checkout_pendente = True
+            if _PrimeiraConsulta.de(conn) is None:
+                # No início da lista: execute_wrapper() (context manager) remove sempre o último
+                conn.execute_wrappers.insert(0, _PrimeiraConsulta(self, conn))
+
+    def _usar(self, conn):
+        """ Primeiro uso do alias na requisição: conta o checkout e retira o wrapper. """
+        _PrimeiraConsulta.remover(conn)
+        if not getattr(conn, '_core_checkout_pendente', False):
+            return
+        conn._core_checkout_pendente = False
+        with self._lock:
+            self._contador(conn.alias)['checkouts'] += 1
+            self._estado.setdefault(conn.alias, {})[id(conn)] = 'uso'
+
+    def connection_created(self, conn):
+        """ Conexão nova (sinal ``connection_created``): também é o checkout da requisição. """
+        with self._lock:
+            self._contador(conn.alias)['conexoes_novas'] += 1
+        self._usar(conn)
+
+    def request_failed(self, exception):
+        """
+        Exceção não tratada na requisição: se é de banco e o alias ainda não
+        foi usado (nem conexão nem consulta), foi a obtenção da conexão que falhou.
+        """
+        if not isinstance(exception, DatabaseError):
+            return
+        for alias in self.aliases():
+            conn = connections[alias]
+            if getattr(conn, '_core_checkout_pendente', False):
+                conn._core_checkout_pendente = False
+                with self._lock:
+                    self._contador(alias)['falhas'] += 1
+
+    def release(self):
+        """ Fim da requisição: a conexão fica ociosa (persistente) ou some (fechada/devolvida ao pool). """
+        for alias in self.aliases():
+            conn = connections[alias]
+            conn._core_checkout_pendente = False
+            _PrimeiraConsulta.remover(conn)
+            with self._lock:
+                estado = self._estado.setdefault(alias, {})
+                if conn.connection is None:
+                    estado.pop(id(conn), None)
+                elif id(conn) in estado:
+                    estado[id(conn)] = 'ociosa'
+
+    def stats(self):
+        estatisticas = {}
+        for alias in self.aliases():
+            conn = connections[alias]
+            with self._lock:
+                contador = dict(self._contador(alias))
+                estados = list(self._estado.get(alias, {}).values())
+            # Sem pool a conexão é da thread: não há espera, só o handshake das conexões novas
+            contador['espera_total_ms'] = contador['espera_media_ms'] = 0.0
+            contador['em_uso'] = estados.count('uso')
+            contador['ociosas'] = estados.count('ociosa')
+            contador['modo'] = _modo(conn)
+
+            pool = _pool_aberto(conn)
+            if pool is not None:
+                # No modo pool os números do próprio pool valem para o processo todo
+                pool_stats = pool.get_stats()
+                contador['em_uso'] = pool_stats.get('pool_size', 0) - pool_stats.get('pool_available', 0)
+                contador['ociosas'] = pool_stats.get('pool_available', 0)
+                contador['falhas'] += pool_stats.get('requests_errors', 0) + pool_stats.get('connections_errors', 0)
+                pedidos = pool_stats.get('requests_num', 0)
+                contador['espera_total_ms'] = float(pool_stats.get('requests_wait_ms', 0))
+                contador['espera_media_ms'] = round(contador['espera_total_ms'] / pedidos, 3) if pedidos else 0.0
+                contador['pool'] = pool_stats
+            estatisticas[alias] = contador
+        return estatisticas
+
+    def reset(self):
+        with self._lock:
+            self._estado.clear()
+            self._contadores.clear()
+
+
+class _PrimeiraConsulta:
+    """ Execute wrapper que registra o checkout na primeira consulta de uma conexão reaproveitada. """
+
+    def __init__(self, tracker, conn):
+        self.tracker = tracker
+        self.conn = conn
+
+    def __call__(self, execute, sql, params, many, context):
+        self.tracker._usar(self.conn)
+        return execute(sql, params, many, context)
+
+    @staticmethod
+    def de(conn):
+        return next((w for w in conn.execute_wrappers if isinstance(w, _PrimeiraConsulta)), None)
+
+    @classmethod
+    def remover(cls, conn):
+        wrapper = cls.de(conn)
+        if wrapper is not None:
+            conn.execute_wrappers.remove(wrapper)
+
+
+tracker = ConnectionTracker()
+
+
+def pool_stats():
+    """ Estatísticas de conexão por alias (em uso, ociosas, espera, falhas). """
+    return tracker.stats()
+
+
+def drain():
+    """ Fecha as conexões desta thread e os pools do processo (encerramento do worker). """
+    connections.close_all()
+    for conn in connections.all(initialized_only=True):
+        if _pool_aberto(conn) is not None:
+            conn.close_pool()
+    tracker.reset()
+
+
+_drain_registrado = threading.Event()
+
+
+def register_drain():
+    """ Registra ``drain`` para o encerramento do processo (uma única vez). """
+    if not _drain_registrado.is_set():
+        _drain_registrado.set()
+        atexit.register(drain)
@@ -0,0 +1,214 @@
+# core/query_cache.py
+"""
+Cache de resultados de consultas de leitura, compartilhado entre requisições.
+
+Leituras que mudam poucas vezes por dia (departamentos, keywords do Lattes,
+histórico de aluno) guardam a lista de resultados no cache do Django
+(``CORE_QUERY_CACHE_ALIAS``, padrão ``'default'``). A chave é o SQL da
+consulta com os parâmetros mais a versão de cada tabela envolvida.
+
+As versões ficam no próprio cache e são incrementadas junto com as de
+``VersaoTabela`` quando a transação que escreveu é confirmada (post_save,
+post_delete e caminhos em lote, ver ``repositories.bump_table_versions``).
+Depois de uma escrita as entradas antigas deixam de ser encontradas e
+expiram sozinhas (``CORE_QUERY_CACHE_TIMEOUT``).
+
+Na frente do cache do Django há um LRU em memória, limitado a
+``CORE_QUERY_CACHE_MAX_ENTRIES`` entradas, para não desserializar a mesma
+lista a cada requisição no mesmo processo. ``stats()`` informa acertos,
+faltas e remoções do LRU.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+KEY_PREFIX = 'core:consulta:'
+VERSION_PREFIX = 'core:versao:'
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TIMEOUT = 3600
+
+
+def _tabela(model_or_table):
+    return model_or_table if isinstance(model_or_table, str) else model_or_table._meta.db_table
+
+
+class QueryCache:
+    """ LRU em processo na frente do cache do Django, com versões por tabela. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._tabelas = set()
+        self._contadores = dict.fromkeys(('acertos_locais', 'acertos', 'faltas', 'ignoradas', 'remocoes'), 0)
+
+    # --- Configuração ---
+
+    def enabled(self):
+        return getattr(settings, 'CORE_QUERY_CACHE_ENABLED', True)
+
+    def max_entries(self):
+        return getattr(settings, 'CORE_QUERY_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+
+    def timeout(self):
+        return getattr(settings, 'CORE_QUERY_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+    def backend(self):
+        return caches[getattr(settings, 'CORE_QUERY_CACHE_ALIAS', 'default')]
+
+    # --- Versões ---
+
+    def versions(self, tabelas):
+        """ Versão atual de cada tabela, lida do cache em uma única chamada. """
+        cache = self.backend()
+        chaves = [VERSION_PREFIX + tabela for tabela in tabelas]
+        versoes = cache.get_many(chaves)
+        for chave in chaves:
+            if chave not in versoes:
+                # Começa de um valor imprevisível: uma versão perdida (cache
+                # reiniciado ou chave removida) não volta a um número já usado
+                cache.add(chave, time.time_ns(), timeout=None)
+                versoes[chave] = cache.get(chave)
+        return tuple(versoes[chave] for chave in chaves)
+
+    async def aversions(self, tabelas):
+        """ Versão assíncrona de ``versions``. """
+        cache = self.backend()
+        chaves = [VERSION_PREFIX + tabela for tabela in tabelas]
+        versoes = await cache.aget_many(chaves)
+        for chave in chaves:
+            if chave not in versoes:
+                await cache.aadd(chave, time.time_ns(), timeout=None)
+                versoes[chave] = await cache.aget(chave)
+        return tuple(versoes[chave] for chave in chaves)
+
+    def invalidate(self, models_or_tables):
+        """ Incrementa a versão das tabelas; as entradas que dependem delas deixam de valer. """
+        cache = self.backend()
+        for tabela in {_tabela(t) for t in models_or_tables}:
+            try:
+                cache.incr(VERSION_PREFIX + tabela)
+            except ValueError:
+                # Nunca lida: a próxima leitura cria uma versão nova
+                pass
+
+    # --- Leitura ---
+
+    def get_or_load(self, nome, queryset, *models_or_tables):
+        """
+        Lista de resultados do queryset, do cache quando possível. ``nome``
+        só deixa a chave legível; o que a identifica é o SQL com os parâmetros.
+        """
+        conn = connections[queryset.db]
+        # Dentro de uma transação que já escreveu a versão só muda no commit:
+        # o cache ainda não enxerga as escritas e a leitura vai direto ao banco
+        if not self.enabled() or (conn.in_atomic_block and conn.run_on_commit):
+            self._contar('ignoradas')
+            return list(queryset)
+
+        tabelas = sorted({_tabela(t) for t in models_or_tables})
+        chave = self._chave(nome, queryset, tabelas, self.versions(tabelas))
+        if chave is None:
+            self._contar('ignoradas')
+            return list(queryset)
+
+        encontrado, resultado = self._local(chave, tabelas)
+        if encontrado:
+            return resultado
+
+        cache = self.backend()
+        resultado = cache.get(chave)
+        if resultado is not None:
+            self._contar('acertos')
+        else:
+            self._contar('faltas')
+            resultado = list(queryset)
+            cache.set(chave, resultado, self.timeout())
+        self._guardar(chave, resultado)
+        return resultado
+
+    async def aget_or_load(self, nome, queryset, *models_or_tables):
+        """ Versão assíncrona de ``get_or_load`` (ORM e cache assíncronos). """
+        if not self.enabled():
+            self._contar('ignoradas')
+            return [obj async for obj in queryset]
+
+        tabelas = sorted({_tabela(t) for t in models_or_tables})
+        chave = self._chave(nome, queryset, tabelas, await self.aversions(tabelas))
+        if chave is None:
+            self._contar('ignoradas')
+            return [obj async for obj in queryset]
+
+        encontrado, resultado = self._local(chave, tabelas)
+        if encontrado:
+            return resultado
+
+        cache = self.backend()
+        resultado = await cache.aget(chave)
+        if resultado is not None:
+            self._contar('acertos')
+        else:
+            self._contar('faltas')
+            resultado = [obj async for obj in queryset]
+            await cache.aset(chave, resultado, self.timeout())
+        self._guardar(chave, resultado)
+        return resultado
+
+    def _chave(self, nome, queryset, tabelas, versoes):
+        if None in versoes:
+            # Backend que não guarda nada (DummyCache)
+            return None
+        sql, params = queryset.query.sql_with_params()
+        assinatura = repr((queryset.db, sql, params, tabelas, versoes)).encode()
+        return f'{KEY_PREFIX}{nome}:{hashlib.sha1(assinatura).hexdigest()}'
+
+    def _local(self, chave, tabelas):
+        with self._lock:
+            self._tabelas.update(tabelas)
+            if chave not in self._entradas:
+                return False, None
+            self._entradas.move_to_end(chave)
+            self._contadores['acertos_locais'] += 1
+            return True, self._entradas[chave]
+
+    def _guardar(self, chave, resultado):
+        with self._lock:
+            self._entradas[chave] = resultado
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entries():
+                self._entradas.popitem(last=False)
+                self._contadores['remocoes'] += 1
+
+    def _contar(self, contador):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    # --- Estatísticas ---
+
+    def stats(self):
+        with self._lock:
+            estatisticas = dict(self._contadores)
+            estatisticas['entradas'] = len(self._entradas)
+        estatisticas['max_entradas'] = self.max_entries()
+        leituras = estatisticas['acertos_locais'] + estatisticas['acertos'] + estatisticas['faltas']
+        estatisticas['taxa_acerto'] = round(
+            (estatisticas['acertos_locais'] + estatisticas['acertos']) / leituras, 4
+        ) if leituras else 0.0
+        return estatisticas
+
+    def clear(self):
+        """ Esvazia o LRU, zera as estatísticas e descarta as versões conhecidas. """
+        with self._lock:
+            tabelas = list(self._tabelas)
+            self._entradas.clear()
+            self._tabelas.clear()
+            for contador in self._contadores:
+                self._contadores[contador] = 0
+        self.backend().delete_many([VERSION_PREFIX + tabela for tabela in tabelas])
+
+
+query_cache = QueryCache()
@@ -0,0 +1,131 @@
+# core/recomendacao.py
+"""
+Recomendação de assessores por similaridade de texto (TF-IDF + cosseno).
+
+Cada professor é um documento formado pelas palavras-chave e pela subárea
+do Lattes; cada projeto, pelo tema, palavras-chave e resumo. Os termos
+passam pela mesma normalização da busca textual (sem acentos, radicalizados).
+
+A matriz professor x termo é montada uma vez com NumPy e guardada em
+memória no formato de colunas comprimidas (CSC): para cada termo, os
+professores que o usam e o peso já normalizado. Ranquear um projeto é
+então só somar, para os poucos termos do projeto, as fatias de coluna
+correspondentes (``np.bincount``), sem nenhuma consulta por professor.
+
+O modelo é reconstruído quando a versão das tabelas de Lattes ou de
+professores muda (ver ``repositories.get_table_versions``).
+"""
+import threading
+
+import numpy as np
+
+from . import search
+
+DEFAULT_K = 5
+MAX_K = 50
+
+
+class ModeloTfIdf:
+    """ Matriz TF-IDF esparsa (CSC) dos professores, com linhas de norma 1. """
+
+    def __init__(self, professores):
+        # professores: [(id_professor, nome, texto)]
+        self.ids = np.array([p[0] for p in professores], dtype=np.int64)
+        self.nomes = [p[1] for p in professores]
+        self.vocabulario = {}
+
+        linhas, colunas = [], []
+        for linha, (_, _, texto) in enumerate(professores):
+            for termo in search.normalize(texto):
+                linhas.append(linha)
+                colunas.append(self.vocabulario.setdefault(termo, len(self.vocabulario)))
+
+        n_docs, n_termos = len(professores), len(self.vocabulario)
+        # Soma as ocorrências repetidas (linha, termo) -> frequência
+        chaves, tf = np.unique(
+            np.array(linhas, dtype=np.int64) * max(n_termos, 1) + np.array(colunas, dtype=np.int64),
+            return_counts=True,
+        )
+        linhas, colunas = chaves // max(n_termos, 1), chaves % max(n_termos, 1)
+
+        df = np.bincount(colunas, minlength=n_termos)
+        self.idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        pesos = (1.0 + np.log(tf)) * self.idf[colunas]
+        normas = np.sqrt(np.bincount(linhas, weights=pesos ** 2, minlength=n_docs))
+        pesos = pesos / np.where(normas > 0, normas, 1.0)[linhas]
+
+        # CSC: ordena por termo e guarda onde começa cada coluna
+        ordem = np.argsort(colunas, kind='stable')
+        self.col_linhas = linhas[ordem]
+        self.col_pesos = pesos[ordem]
+        self.col_inicio = np.concatenate(([0], np.cumsum(np.bincount(colunas, minlength=n_termos))))
+
+    def vetor_consulta(self, texto):
+        """ Índices e pesos (norma 1) dos termos conhecidos de um texto. """
+        termos = [self.vocabulario[t] for t in search.normalize(texto) if t in self.vocabulario]
+        if not termos:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        indices, tf = np.unique(np.array(termos, dtype=np.int64), return_counts=True)
+        pesos = (1.0 + np.log(tf)) * self.idf[indices]
+        return indices, pesos / np.linalg.norm(pesos)
+
+    def similaridades(self, texto):
+        """ Cosseno do texto com cada professor (vetor na ordem de ``ids``). """
+        indices, pesos = self.vetor_consulta(texto)
+        if not len(indices):
+            return np.zeros(len(self.ids))
+        inicios, fins = self.col_inicio[indices], self.col_inicio[indices + 1]
+        tamanhos = fins - inicios
+        # Posições de todas as fatias de coluna, concatenadas sem laço Python
+        deslocamentos = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        posicoes = np.repeat(inicios, tamanhos) + deslocamentos
+        return np.bincount(
+            self.col_linhas[posicoes],
+            weights=self.col_pesos[posicoes] * np.repeat(pesos, tamanhos),
+            minlength=len(self.ids),
+        )
+
+    def ranquear(self, texto, k, excluir=()):
+        """ Os ``k`` professores mais similares com score > 0, fora os excluídos. """
+        scores = self.similaridades(texto)
+        if len(excluir):
+            scores[np.isin(self.ids, np.fromiter(excluir, dtype=np.int64))] = 0.0
+        candidatos = np.flatnonzero(scores > 0)
+        if len(candidatos) > k:
+            candidatos = candidatos[np.argpartition(-scores[candidatos], k - 1)[:k]]
+        # Maior score primeiro; empate pelo id para uma ordem estável
+        candidatos = candidatos[np.lexsort((self.ids[candidatos], -scores[candidatos]))]
+        return [
+            {
+                'id_professor': str(self.ids[i]),
+                'nome': self.nomes[i],
+                'score': round(float(scores[i]), 4),
+            }
+            for i in candidatos
+        ]
+
+
+_lock = threading.Lock()
+_cache = {'versao': None, 'modelo': None}
+
+
+def get_modelo():
+    """ Modelo dos professores, reconstruído só quando as tabelas mudam. """
+    from . import repositories as repo
+    from .models import Professor, ProfessorLattes
+
+    versao = tuple(sorted(
+        (tabela, numero) for tabela, (numero, _) in repo.get_table_versions((ProfessorLattes, Professor)).items()
+    ))
+    with _lock:
+        if _cache['versao'] != versao or _cache['modelo'] is None:
+            _cache['modelo'] = ModeloTfIdf(repo.get_lattes_corpus())
+            _cache['versao'] = versao
+        return _cache['modelo']
+
+
+def texto_projeto(projeto):
+    """ Texto do projeto com o tema e as palavras-chave pesando mais que o resumo. """
+    return ' '.join(
+        ' '.join([getattr(projeto, campo) or ''] * peso) for campo, peso in search.FIELD_WEIGHTS
+    )
@@ -1,19 +1,103 @@
 # core/repositories.py
-from django.core.exceptions import ObjectDoesNotExist
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import connection, transaction, IntegrityError
+from django.db.models import CharField, Count, F, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from .models import (
-    Professor, Aluno, Projeto, Departamento, ProfessorLattes, HistAluno,
-    AlunoProj, Orientador, Assessor
+    Professor, Aluno, Projeto, Departamento, Curso, ProfessorLattes, HistAluno,
+    AlunoProj, Orientador, Assessor, VersaoTabela, PalavraChave,
+    ProfessorPalavraChave, ProjetoPalavraChave, CargaProfessor
 )
+from . import search
+from .query_cache import query_cache
+
+# --- Identity map (por requisição / unidade de trabalho) ---
+# Dentro de uma requisição (ou de um bloco ``unit_of_work()``), buscas por
+# chave primária de Projeto, Professor e Aluno devolvem a mesma instância,
+# evitando SELECTs repetidos. Fora desse escopo nada é guardado.
+
+_identity_map = ContextVar('core_identity_map', default=None)
+
+def begin_identity_map():
+    """ Ativa um identity map vazio no contexto atual (início da requisição). """
+    _identity_map.set({})
+
+def clear_identity_map():
+    """ Descarta o identity map do contexto atual (fim da requisição). """
+    _identity_map.set(None)
+
+def reset_identity_map():
+    """ Esvazia o identity map ativo, se houver (ex.: após um rollback). """
+    mapa = _identity_map.get()
+    if mapa is not None:
+        mapa.clear()
+
+@contextmanager
+def unit_of_work():
+    """ Identity map válido apenas dentro do bloco (tarefas, comandos, testes). """
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+def _identity_key(model, pk):
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError:
+        pass  # a própria consulta vai acusar o valor inválido
+    return (model, pk)
+
+def _get_by_pk(model, pk):
+    mapa = _identity_map.get()
+    if mapa is None:
+        return model.objects.get(pk=pk)
+    chave = _identity_key(model, pk)
+    if chave not in mapa:
+        # DoesNotExist não é guardado: propaga como antes
+        mapa[chave] = model.objects.get(pk=pk)
+    return mapa[chave]
+
+def evict_identity(instance):
+    """ Remove a instância do identity map (após escrita). """
+    mapa = _identity_map.get()
+    if mapa:
+        mapa.pop(_identity_key(type(instance), instance.pk), None)
 
 # --- Repositório de Professor ---
 
 def get_all_professors_with_dept():
-    """ Retorna todos os professores, otimizando a busca pelo departamento. """
-    return Professor.objects.all().select_related('departamento')
+    """ Retorna todos os professores, otimizando a busca pelo departamento e pelo Lattes. """
+    return Professor.objects.all().select_related('departamento', 'professorlattes')
+
+def _workload_annotations():
+    """ Contadores persistidos em CargaProfessor (LEFT JOIN; 0 se ainda não há linha). """
+    return {
+        'orientacoes_ativas': Coalesce(F('carga__orientacoes_ativas'), Value(0)),
+        'assessorias_ativas': Coalesce(F('carga__assessorias_ativas'), Value(0)),
+    }
+
+def get_professor_profile(professor_id):
+    """
+    Busca o professor com departamento, Lattes e contagens de orientações e
+    assessorias ativas em uma única consulta. Lança Professor.DoesNotExist.
+    """
+    return Professor.objects.select_related('departamento', 'professorlattes').annotate(
+        **_workload_annotations()
+    ).get(id_professor=professor_id)
+
+def get_professor_with_workload(professor_id):
+    """ Professor anotado com os contadores de carga (uma linha). Lança Professor.DoesNotExist. """
+    return Professor.objects.annotate(**_workload_annotations()).get(id_professor=professor_id)
 
 def get_professor_by_id(professor_id):
     """ Busca um professor pelo ID. Lança Professor.DoesNotExist se não encontrar. """
-    return Professor.objects.get(id_professor=professor_id)
+    return _get_by_pk(Professor, professor_id)
 
 def create_professor(data):
     """ Cria um novo professor. """
@@ -23,6 +107,10 @@ def get_lattes_by_professor(professor_obj):
     """ Busca o Lattes de um professor. Lança ProfessorLattes.DoesNotExist. """
     return professor_obj.professorlattes
 
+def get_professors_by_ids(professor_ids):
+    """ Busca vários professores em uma única consulta (IN). Retorna {id: professor}. """
+    return Professor.objects.in_bulk(list(professor_ids))
+
 def get_active_orientador_count(professor_obj):
     """ Conta orientações ativas para um professor. """
     return professor_obj.orientador_set.filter(ativo=True).count()
@@ -31,6 +119,94 @@ def get_active_assessor_count(professor_obj):
     """ Conta assessorias ativas para um professor. """
     return professor_obj.assessor_set.filter(ativo=True).count()
 
+def get_professors_workload(departamento_id=None):
+    """ Professores anotados com orientacoes_ativas e assessorias_ativas (contadores persistidos). """
+    professores = Professor.objects.all()
+    if departamento_id is not None:
+        professores = professores.filter(departamento_id=departamento_id)
+    return professores.annotate(**_workload_annotations())
+
+def count_professors_workload(professor_ids):
+    """
+    Contagem real das associações ativas, em uma única consulta agrupada
+    (``distinct=True`` evita que os dois JOINs multipliquem as contagens).
+    Usada para recalcular os contadores.
+    """
+    return Professor.objects.filter(pk__in=professor_ids).annotate(
+        orientacoes_ativas=Count('orientador', filter=Q(orientador__ativo=True), distinct=True),
+        assessorias_ativas=Count('assessor', filter=Q(assessor__ativo=True), distinct=True),
+    )
+
+# Contador de CargaProfessor correspondente a cada modelo de associação
+WORKLOAD_FIELDS = {Orientador: 'orientacoes_ativas', Assessor: 'assessorias_ativas'}
+
+def adjust_workload(campo, deltas):
+    """
+    Soma ``deltas`` ({id_professor: +n/-n}) ao contador ``campo``, com um
+    UPDATE por valor de delta. Professores ainda sem linha têm os
+    contadores calculados do zero.
+    """
+    por_delta = {}
+    for professor_id, delta in deltas.items():
+        if delta:
+            por_delta.setdefault(delta, []).append(professor_id)
+    faltando = set()
+    for delta, professor_ids in por_delta.items():
+        atualizados = CargaProfessor.objects.filter(pk__in=professor_ids).update(**{campo: F(campo) + delta})
+        if atualizados < len(professor_ids):
+            faltando |= set(professor_ids) - set(
+                CargaProfessor.objects.filter(pk__in=professor_ids).values_list('pk', flat=True)
+            )
+    if faltando:
+        recompute_workload(faltando)
+
+def create_workload_rows(professor_ids):
+    """ Cria os contadores zerados de professores novos. """
+    CargaProfessor.objects.bulk_create(
+        [CargaProfessor(professor_id=professor_id) for professor_id in professor_ids], ignore_conflicts=True
+    )
+
+def _count_by_professor(professor_ids):
+    contagem = {}
+    for professor_id in professor_ids:
+        contagem[professor_id] = contagem.get(professor_id, 0) + 1
+    return contagem
+
+def recompute_workload(professor_ids=None, lote=1000):
+    """
+    Recalcula os contadores a partir das associações, em lotes, gravando só
+    as linhas divergentes. Retorna (professores verificados, corrigidos).
+    """
+    if professor_ids is None:
+        professor_ids = Professor.objects.order_by('pk').values_list('pk', flat=True)
+    professor_ids = list(professor_ids)
+    verificados = corrigidos = 0
+    campos = ('orientacoes_ativas', 'assessorias_ativas')
+    for inicio in range(0, len(professor_ids), lote):
+        parte = professor_ids[inicio:inicio + lote]
+        with transaction.atomic():
+            # Bloqueia as linhas do lote para não competir com ajustes concorrentes
+            atuais = {
+                pk: valores for pk, *valores in
+                CargaProfessor.objects.select_for_update().filter(pk__in=parte).values_list('pk', *campos)
+            }
+            reais = {
+                pk: valores for pk, *valores in
+                count_professors_workload(parte).values_list('pk', *campos)
+            }
+            divergentes = [
+                CargaProfessor(professor_id=pk, orientacoes_ativas=orientacoes, assessorias_ativas=assessorias)
+                for pk, (orientacoes, assessorias) in reais.items()
+                if atuais.get(pk) != [orientacoes, assessorias]
+            ]
+            if divergentes:
+                CargaProfessor.objects.bulk_create(
+                    divergentes, update_conflicts=True, unique_fields=['professor'], update_fields=list(campos)
+                )
+        verificados += len(reais)
+        corrigidos += len(divergentes)
+    return verificados, corrigidos
+
 # --- Repositório de Aluno ---
 
 def get_all_alunos_with_curso():
@@ -39,23 +215,112 @@ def get_all_alunos_with_curso():
 
 def get_aluno_by_id(aluno_id):
     """ Busca um aluno pelo ID. Lança Aluno.DoesNotExist. """
-    return Aluno.objects.get(id_aluno=aluno_id)
+    return _get_by_pk(Aluno, aluno_id)
+
+def get_professor_and_aluno(professor_id, aluno_id):
+    """
+    Busca o professor e o aluno em uma única consulta (UNION), só com o ID e
+    o nome (demais campos adiados). Retorna (professor, aluno); lança
+    Professor.DoesNotExist / Aluno.DoesNotExist.
+    """
+    def linhas(model, pk):
+        papel = Value(model.__name__, output_field=CharField())
+        return model.objects.filter(pk=pk).values_list(papel, 'pk', 'nome')
+
+    consulta = linhas(Professor, professor_id).union(linhas(Aluno, aluno_id), all=True)
+    encontrados = {papel: (pk, nome) for papel, pk, nome in consulta}
+    objetos = []
+    for model in (Professor, Aluno):
+        if model.__name__ not in encontrados:
+            raise model.DoesNotExist(f'{model.__name__} matching query does not exist.')
+        objetos.append(model.from_db(consulta.db, [model._meta.pk.attname, 'nome'], encontrados[model.__name__]))
+    return tuple(objetos)
+
+def get_alunos_by_ids(aluno_ids):
+    """ Busca vários alunos em uma única consulta (IN). Retorna {id: aluno}. """
+    return Aluno.objects.in_bulk(list(aluno_ids))
 
 def get_historico_by_aluno_id(aluno_id):
     """ Busca o histórico de um aluno pelo ID do aluno. """
     return HistAluno.objects.filter(aluno__id_aluno=aluno_id)
 
+def get_historico_by_aluno_id_cached(aluno_id):
+    """ Histórico de um aluno (lista), pelo cache de consultas. """
+    return query_cache.get_or_load('historico', get_historico_by_aluno_id(aluno_id), HistAluno)
+
+def iter_historico_rows(chunk_size=10000):
+    """
+    Tuplas (cod_disciplina, id_departamento, id_curso, aprovado) de todo o
+    histórico, lidas em blocos (sem instanciar modelos).
+    """
+    return HistAluno.objects.order_by().values_list(
+        'cod_disciplina', 'departamento_id', 'aluno__curso_id', 'aprovado'
+    ).iterator(chunk_size=chunk_size)
+
+def get_departamento_nomes():
+    """ {id_departamento: nome_departamento} em uma única consulta. """
+    return dict(Departamento.objects.values_list('pk', 'nome_departamento'))
+
+def get_curso_nomes():
+    """ {id_curso: nome} em uma única consulta. """
+    return dict(Curso.objects.values_list('pk', 'nome'))
+
 # --- Repositório de Projeto ---
 
+def get_all_projects():
+    """ Retorna todos os projetos, sem pré-carregar participantes (exportação em blocos). """
+    return Projeto.objects.all()
+
 def get_all_projects_prefetched():
     """ Retorna todos os projetos, otimizando buscas de participantes. """
     return Projeto.objects.all().prefetch_related(
         'alunoproj_set__aluno', 'orientador_set__professor', 'assessor_set__professor'
     )
 
+# Campos de texto potencialmente grandes do Projeto
+PROJETO_HEAVY_FIELDS = ('resumo', 'melhor_corretor')
+# Campo do ProjetoSerializer -> lookup de prefetch correspondente
+PROJETO_RELATION_PREFETCHES = {
+    'alunos_status': 'alunoproj_set__aluno',
+    'orientadores_status': 'orientador_set__professor',
+    'assessores_status': 'assessor_set__professor',
+}
+
+def get_projects_projection(campos):
+    """
+    Retorna os projetos carregando apenas o necessário para os campos pedidos:
+    textos grandes não solicitados ficam em defer() e só as relações
+    solicitadas são pré-carregadas.
+    """
+    deferidos = [campo for campo in PROJETO_HEAVY_FIELDS if campo not in campos]
+    prefetches = [lookup for campo, lookup in PROJETO_RELATION_PREFETCHES.items() if campo in campos]
+    return Projeto.objects.defer(*deferidos).prefetch_related(*prefetches)
+
+def search_projects(queryset, texto):
+    """
+    Restringe o queryset aos projetos que casam com a busca textual,
+    anotados com ``relevancia`` (menor = mais relevante) e ordenados por
+    ela. Filtro e ranking são subconsultas no índice: todos os resultados
+    ficam disponíveis para paginação e facetas, sem limite de quantidade.
+    Uma busca sem termos indexáveis (só stopwords) não filtra nada.
+    """
+    sql = search.match_sql(texto)
+    if sql is None:
+        return queryset.filter(search.fallback_filter(texto))
+    if not sql:
+        return queryset
+    filtro, filtro_params, relevancia = sql
+    return queryset.filter(pk__in=RawSQL(filtro, filtro_params)).annotate(
+        relevancia=relevancia
+    ).order_by('relevancia', 'pk')
+
+def get_projects_by_ids(project_ids):
+    """ Busca vários projetos (apenas id e tipo) em uma única consulta. Retorna {id: projeto}. """
+    return Projeto.objects.only('id_proj', 'tipo').in_bulk(list(project_ids))
+
 def get_project_by_id(project_id):
     """ Busca um projeto pelo ID. Lança Projeto.DoesNotExist. """
-    return Projeto.objects.get(id_proj=project_id)
+    return _get_by_pk(Projeto, project_id)
 
 def create_project(data):
     """ Cria um novo projeto com os dados fornecidos. """
@@ -68,6 +333,39 @@ def create_project(data):
         bolsa=data.get('bolsa'),
     )
 
+def bulk_create_projects(projetos_data):
+    """
+    Cria vários projetos com um único INSERT, a partir dos ``validated_data``
+    do ProjetoSerializer (campos omitidos ficam com o default do modelo). Os
+    objetos retornados já têm o id_proj preenchido (RETURNING).
+    """
+    projetos = Projeto.objects.bulk_create([Projeto(**data) for data in projetos_data])
+    # bulk_create não dispara post_save: indexa a busca textual aqui
+    search.index_projects(projetos, novos=True)
+    sync_project_keywords(projetos, novos=True)
+    bump_table_versions(Projeto)
+    return projetos
+
+def bulk_create_orientador_assocs(pares):
+    """ Cria associações de Orientador a partir de pares (professor, projeto). """
+    assocs = Orientador.objects.bulk_create([
+        Orientador(professor=professor_obj, projeto=projeto_obj, tipo_projeto=projeto_obj.tipo)
+        for professor_obj, projeto_obj in pares
+    ])
+    # bulk_create não dispara post_save: ajusta a carga aqui
+    adjust_workload('orientacoes_ativas', _count_by_professor(assoc.professor_id for assoc in assocs))
+    bump_table_versions(Orientador)
+    return assocs
+
+def bulk_create_alunoproj_assocs(pares):
+    """ Cria associações de AlunoProj a partir de pares (aluno, projeto). """
+    assocs = AlunoProj.objects.bulk_create([
+        AlunoProj(aluno=aluno_obj, projeto=projeto_obj, tipo_projeto=projeto_obj.tipo)
+        for aluno_obj, projeto_obj in pares
+    ])
+    bump_table_versions(AlunoProj)
+    return assocs
+
 def create_orientador_assoc(professor_obj, projeto_obj):
     """ Cria a associação de Orientador. """
     return Orientador.objects.create(professor=professor_obj, projeto=projeto_obj)
@@ -84,6 +382,10 @@ def check_if_orientador_is_assessor(projeto_obj, assessor_id):
     """ Verifica se um professor já é orientador do projeto. """
     return projeto_obj.orientadores.filter(id_professor=assessor_id).exists()
 
+def get_orientador_ids(projeto_obj):
+    """ IDs de todos os orientadores (ativos ou não) do projeto. """
+    return set(projeto_obj.orientador_set.values_list('professor_id', flat=True))
+
 def get_first_orientador_departamento(projeto_obj):
     """ Busca o departamento do primeiro orientador (ativo ou não) do projeto. """
     orientador_rel = projeto_obj.orientador_set.order_by('-ativo').first()
@@ -105,9 +407,83 @@ def get_active_participant_relation(projeto_obj, role):
         
     return related_queryset.filter(ativo=True)
 
+# Modelo de associação e coluna da pessoa para cada role
+PARTICIPANT_MODELS = {
+    'aluno': (AlunoProj, 'aluno_id'),
+    'orientador': (Orientador, 'professor_id'),
+    'assessor': (Assessor, 'professor_id'),
+}
+
+def get_existing_participant_pairs(role, project_ids, person_ids):
+    """ Retorna o conjunto de pares (id_proj, id_pessoa) já associados no role. """
+    model, person_field = PARTICIPANT_MODELS[role]
+    return set(model.objects.filter(
+        projeto_id__in=list(project_ids), **{f'{person_field}__in': list(person_ids)}
+    ).values_list('projeto_id', person_field))
+
+def get_projects_with_active_participant(role, project_ids):
+    """ Retorna os IDs dos projetos que já têm participante ativo no role. """
+    model, _ = PARTICIPANT_MODELS[role]
+    return set(model.objects.filter(
+        projeto_id__in=list(project_ids), ativo=True
+    ).values_list('projeto_id', flat=True).distinct())
+
+def get_participant_values(role, project_ids, paths):
+    """
+    Tuplas (id_proj, *paths) das associações do role para vários projetos,
+    em uma única consulta e em ordem estável.
+    """
+    model, _ = PARTICIPANT_MODELS[role]
+    return model.objects.filter(projeto_id__in=list(project_ids)).order_by(
+        'projeto_id', 'id'
+    ).values_list('projeto_id', *paths)
+
+def bulk_create_participant_assocs(role, pares, tipos):
+    """
+    Cria associações (id_proj, id_pessoa) do role com um único INSERT,
+    ignorando pares que já existam (ON CONFLICT DO NOTHING). ``tipos`` é
+    {id_proj: tipo} e alimenta a cópia tipo_projeto.
+
+    O conflito também silencia o índice parcial de IC; por isso os pares de
+    projetos de IC são conferidos depois do INSERT. Retorna o conjunto de
+    pares recusados pelo banco (outro participante ativo foi gravado antes,
+    por uma requisição concorrente).
+    """
+    model, person_field = PARTICIPANT_MODELS[role]
+    # INSERT, conferência de IC e contadores juntos: uma falha no meio não
+    # deixa associações gravadas com a CargaProfessor desatualizada
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [
+                model(projeto_id=projeto_id, tipo_projeto=tipos[projeto_id], **{person_field: person_id})
+                for projeto_id, person_id in pares
+            ],
+            ignore_conflicts=True
+        )
+        pares_ic = {
+            par for par in pares if tipos[par[0]] == Projeto.TipoPesquisa.INICIACAO_CIENTIFICA
+        }
+        recusados = set()
+        if pares_ic:
+            recusados = pares_ic - get_existing_participant_pairs(
+                role, {p for p, _ in pares_ic}, {a for _, a in pares_ic}
+            )
+        if model in WORKLOAD_FIELDS:
+            # Os pares já existentes foram filtrados pelo serviço; eventuais
+            # conflitos concorrentes são corrigidos pelo recompute_workload
+            adjust_workload(WORKLOAD_FIELDS[model], _count_by_professor(
+                person_id for projeto_id, person_id in pares if (projeto_id, person_id) not in recusados
+            ))
+        bump_table_versions(model)
+    return recusados
+
 def save_instance(instance):
-    """ Salva qualquer instância de modelo. """
-    instance.save()
+    """ Salva qualquer instância de modelo (e a tira do identity map). """
+    try:
+        instance.save()
+    finally:
+        # Mesmo se o save falhar: a instância em memória pode ter sido alterada
+        evict_identity(instance)
     return instance
 
 # --- Repositório de Departamento ---
@@ -116,16 +492,269 @@ def get_all_departments():
     """ Retorna todos os departamentos. """
     return Departamento.objects.all()
 
+def get_all_departments_cached():
+    """ Todos os departamentos (lista), pelo cache de consultas. """
+    return query_cache.get_or_load('departamentos', get_all_departments(), Departamento)
+
 def get_lattes_keywords_by_dept_id(departamento_id):
     """ Busca keywords lattes de professores de um departamento. """
     return ProfessorLattes.objects.select_related('professor').filter(professor__departamento_id=departamento_id)
 
+def get_lattes_keywords_by_dept_id_cached(departamento_id):
+    """ Keywords lattes de um departamento (lista), pelo cache de consultas. """
+    return query_cache.get_or_load(
+        'keywords_departamento', get_lattes_keywords_by_dept_id(departamento_id), ProfessorLattes, Professor
+    )
+
 # --- Outros Repositórios ---
 
 def get_all_lattes_keywords():
     """ Retorna keywords de todos os professores. """
     return ProfessorLattes.objects.select_related('professor').all()
 
+def get_all_lattes_keywords_cached():
+    """ Keywords de todos os professores (lista), pelo cache de consultas. """
+    return query_cache.get_or_load('keywords', get_all_lattes_keywords(), ProfessorLattes, Professor)
+
 def get_all_lattes():
     """ Retorna todas as entradas Lattes. """
-    return ProfessorLattes.objects.all()
\ No newline at end of file
+    return ProfessorLattes.objects.all()
+
+def get_lattes_corpus():
+    """
+    Lista (id_professor, nome, texto) com as palavras-chave e a subárea de
+    cada professor com Lattes, lida em uma única consulta.
+    """
+    linhas = ProfessorLattes.objects.order_by('professor_id').values_list(
+        'professor_id', 'professor__nome', 'palavras_chave', 'subarea'
+    )
+    return [
+        (professor_id, nome, f"{palavras_chave or ''} {subarea or ''}")
+        for professor_id, nome, palavras_chave, subarea in linhas
+    ]
+
+# --- Repositório de Palavras-chave ---
+
+def get_or_create_keywords(termos):
+    """ Recebe {termo: rótulo} e retorna {termo: id}, criando os termos novos. """
+    ids = dict(PalavraChave.objects.filter(termo__in=termos).values_list('termo', 'id'))
+    novos = [PalavraChave(termo=termo, rotulo=rotulo) for termo, rotulo in termos.items() if termo not in ids]
+    if novos:
+        # ignore_conflicts: outro processo pode ter criado o mesmo termo
+        PalavraChave.objects.bulk_create(novos, ignore_conflicts=True)
+        ids.update(PalavraChave.objects.filter(
+            termo__in=[p.termo for p in novos]
+        ).values_list('termo', 'id'))
+    return ids
+
+def sync_keyword_links(textos, link_model, owner_field, novos=False):
+    """
+    Sincroniza a tabela de ligação (professor ou projeto -> palavra) com os
+    textos separados por vírgula. ``textos`` é {id do dono: texto}. Só as
+    ligações que mudaram são removidas/criadas (com ``novos=True`` os donos
+    acabaram de ser criados e não há o que remover).
+    """
+    if not textos:
+        return
+    owner_column = f'{owner_field}_id'
+    por_dono = {dono: search.split_keywords(texto) for dono, texto in textos.items()}
+    todos = {}
+    for termos in por_dono.values():
+        for termo, rotulo in termos.items():
+            todos.setdefault(termo, rotulo)
+    ids = get_or_create_keywords(todos) if todos else {}
+
+    desejados = {(dono, ids[termo]) for dono, termos in por_dono.items() for termo in termos}
+    atuais = set() if novos else set(link_model.objects.filter(
+        **{f'{owner_column}__in': list(textos)}
+    ).values_list(owner_column, 'palavra_id'))
+
+    remover = atuais - desejados
+    for dono in {dono for dono, _ in remover}:
+        link_model.objects.filter(**{owner_column: dono}).filter(
+            palavra_id__in=[palavra for d, palavra in remover if d == dono]
+        ).delete()
+    criar = desejados - atuais
+    if criar:
+        link_model.objects.bulk_create(
+            [link_model(**{owner_column: dono, 'palavra_id': palavra}) for dono, palavra in criar],
+            ignore_conflicts=True,
+        )
+
+def sync_professor_keywords(lattes_list, novos=False):
+    """ Atualiza as palavras-chave normalizadas dos Lattes informados. """
+    sync_keyword_links(
+        {lattes.pk: lattes.palavras_chave for lattes in lattes_list}, ProfessorPalavraChave, 'lattes', novos=novos
+    )
+
+def sync_project_keywords(projetos, novos=False):
+    """ Atualiza as palavras-chave normalizadas dos projetos informados. """
+    sync_keyword_links(
+        {projeto.pk: projeto.palavra_chave for projeto in projetos}, ProjetoPalavraChave, 'projeto', novos=novos
+    )
+
+def get_professors_by_keyword(termo):
+    """
+    Professores cujo Lattes tem a palavra-chave (comparação sem acentos e
+    sem diferenciar maiúsculas). A busca usa o índice único de ``termo`` e
+    o índice (palavra, professor) da tabela de ligação.
+    """
+    termo = ' '.join(search.fold(termo).split())
+    return get_all_professors_with_dept().filter(professorlattes__palavras_normalizadas__palavra__termo=termo)
+
+# --- Importação em massa (roster) ---
+
+def get_roster_lookup(model, campo_nome=None):
+    """
+    Mapa {ID em texto: pk} dos registros do modelo, para resolver relações
+    sem uma consulta por linha. Com ``campo_nome``, aceita também o nome
+    (sem diferenciar maiúsculas).
+    """
+    mapa = {}
+    campos = ('pk', campo_nome) if campo_nome else ('pk',)
+    for valores in model.objects.values_list(*campos):
+        mapa[str(valores[0])] = valores[0]
+        if campo_nome:
+            mapa.setdefault(valores[1].casefold(), valores[0])
+    return mapa
+
+def get_roster_conflicts(model, pks, emails):
+    """
+    Em uma consulta: IDs do lote que já existem e {email: pk} dos e-mails
+    do lote já cadastrados.
+    """
+    existentes, donos = set(), {}
+    for pk, email in model.objects.filter(Q(pk__in=pks) | Q(email__in=emails)).values_list('pk', 'email'):
+        if pk in pks:
+            existentes.add(pk)
+        donos[email] = pk
+    return existentes, donos
+
+def upsert_roster(model, linhas, update_fields, novos):
+    """
+    Insere ou atualiza (pela chave primária) um lote de cadastros com um
+    único bulk_create. O bulk_create não dispara sinais: aqui são repetidos
+    os efeitos do post_save (versão da tabela, CargaProfessor dos
+    professores novos e identity map).
+    """
+    model.objects.bulk_create(
+        [model(**valores) for valores in linhas],
+        update_conflicts=True,
+        unique_fields=[model._meta.pk.name],
+        update_fields=update_fields,
+    )
+    if model is Professor and novos:
+        create_workload_rows(novos)
+    mapa = _identity_map.get()
+    if mapa:
+        for valores in linhas:
+            mapa.pop(_identity_key(model, valores[model._meta.pk.name]), None)
+    bump_table_versions(model)
+
+# --- Estatísticas ---
+
+def estimate_table_rows(model):
+    """
+    Estima o número de linhas da tabela de um modelo sem COUNT(*).
+    No PostgreSQL/CockroachDB usa as estatísticas do catálogo (pg_class);
+    nos demais bancos, ou sem estatísticas coletadas, faz a contagem exata.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None and row[0] >= 0:
+            return int(row[0])
+    return model._default_manager.count()
+
+
+# --- Versões de Tabela ---
+
+def _table_names(models_or_tables):
+    return sorted({
+        t if isinstance(t, str) else t._meta.db_table for t in models_or_tables
+    })
+
+def get_table_versions(models_or_tables):
+    """
+    Retorna {tabela: (versao, atualizado_em)} em uma única consulta.
+    Tabelas que nunca foram alteradas aparecem como (0, None).
+    """
+    tabelas = _table_names(models_or_tables)
+    versoes = {tabela: (0, None) for tabela in tabelas}
+    for tabela, versao, atualizado_em in VersaoTabela.objects.filter(
+        tabela__in=tabelas
+    ).values_list('tabela', 'versao', 'atualizado_em'):
+        versoes[tabela] = (versao, atualizado_em)
+    return versoes
+
+def bump_table_versions(*models_or_tables):
+    """
+    Incrementa a versão das tabelas quando a transação atual for confirmada.
+    O incremento roda fora da transação de negócio para não transformar a
+    linha de versão em ponto de contenção; em rollback nada é alterado.
+    """
+    tabelas = _table_names(models_or_tables)
+    if tabelas:
+        transaction.on_commit(lambda: _increment_table_versions(tabelas))
+
+def _increment_table_versions(tabelas):
+    agora = timezone.now()
+    existentes = set(VersaoTabela.objects.filter(tabela__in=tabelas).values_list('tabela', flat=True))
+    VersaoTabela.objects.filter(tabela__in=existentes).update(versao=F('versao') + 1, atualizado_em=agora)
+    for tabela in set(tabelas) - existentes:
+        try:
+            with transaction.atomic():
+                VersaoTabela.objects.create(tabela=tabela, versao=1, atualizado_em=agora)
+        except IntegrityError:
+            # Criada por outra requisição em paralelo
+            VersaoTabela.objects.filter(tabela=tabela).update(versao=F('versao') + 1, atualizado_em=agora)
+    query_cache.invalidate(tabelas)
+
+async def aget_table_versions(models_or_tables):
+    """ Versão assíncrona de ``get_table_versions``. """
+    tabelas = _table_names(models_or_tables)
+    versoes = {tabela: (0, None) for tabela in tabelas}
+    async for tabela, versao, atualizado_em in VersaoTabela.objects.filter(
+        tabela__in=tabelas
+    ).values_list('tabela', 'versao', 'atualizado_em'):
+        versoes[tabela] = (versao, atualizado_em)
+    return versoes
+
+# --- Leituras assíncronas (views ASGI) ---
+# Contrapartes das leituras usadas pelas views de async_views.py, com o ORM
+# assíncrono. Não passam pelo identity map, que é por requisição síncrona.
+
+async def aget_project_prefetched(project_id):
+    """ Busca um projeto com os participantes. Lança Projeto.DoesNotExist. """
+    return await get_all_projects_prefetched().aget(pk=project_id)
+
+async def aget_lattes_by_professor_id(professor_id):
+    """
+    Busca o Lattes de um professor. Lança Professor.DoesNotExist se o
+    professor não existe e ProfessorLattes.DoesNotExist se ele não tem Lattes.
+    """
+    try:
+        # select_related: o serializer lê o professor e não há lazy load no modo assíncrono
+        return await ProfessorLattes.objects.select_related('professor').aget(professor_id=professor_id)
+    except ProfessorLattes.DoesNotExist:
+        if not await Professor.objects.filter(pk=professor_id).aexists():
+            raise Professor.DoesNotExist('Professor não encontrado.')
+        raise
+
+async def aget_historico_by_aluno_id_cached(aluno_id):
+    """ Versão assíncrona de ``get_historico_by_aluno_id_cached``. """
+    return await query_cache.aget_or_load('historico', get_historico_by_aluno_id(aluno_id), HistAluno)
+
+async def aget_lattes_keywords_by_dept_id_cached(departamento_id):
+    """ Versão assíncrona de ``get_lattes_keywords_by_dept_id_cached``. """
+    return await query_cache.aget_or_load(
+        'keywords_departamento', get_lattes_keywords_by_dept_id(departamento_id), ProfessorLattes, Professor
+    )
+
+async def aget_all_lattes_keywords_cached():
+    """ Versão assíncrona de ``get_all_lattes_keywords_cached``. """
+    return await query_cache.aget_or_load('keywords', get_all_lattes_keywords(), ProfessorLattes, Professor)
@@ -0,0 +1,223 @@
+# core/roster.py
+"""
+Importação em massa de alunos e professores (roster) a partir de CSV ou JSONL.
+
+O arquivo é lido em streaming, linha a linha, e gravado em lotes (padrão
+``CORE_ROSTER_BATCH_SIZE``, 1000 linhas): cada lote é um único
+``bulk_create(update_conflicts=True)`` - insere os IDs novos e atualiza os
+existentes - em uma transação própria. A memória usada não depende do
+tamanho do arquivo.
+
+Cada linha passa pelas regras dos campos graváveis do serializer da API
+(``AlunoSerializer`` / ``ProfessorRosterSerializer``): obrigatoriedade,
+tamanho e formato do e-mail, com as mesmas mensagens de erro. O que esses
+serializers consultariam no banco a cada linha é feito em bloco:
+
+* relações (``curso_id``; ``departamento`` por ID ou nome) são resolvidas em
+  um mapa carregado uma única vez;
+* a unicidade do e-mail é verificada por lote, no próprio lote e no banco.
+
+Um ID repetido atualiza o cadastro de novo (vale a última linha). Linhas
+inválidas não interrompem a importação: vão para os rejeitos, em JSONL
+(``{"linha": n, "erros": {campo: [mensagens]}, "dados": {...}}``).
+
+Colunas:
+
+* alunos: ``id_aluno, nome, email, telefone, curso_id``
+* professores: ``id_professor, nome, email, link_citations, departamento``
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.relations import RelatedField
+from rest_framework.validators import UniqueValidator
+
+from .models import Aluno, Professor
+from .serializers import AlunoSerializer, ProfessorRosterSerializer
+
+FORMATOS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+DEFAULT_BATCH_SIZE = 1000
+# Limite dos IDs (BigIntegerField)
+MAX_ID = 2 ** 63 - 1
+
+
+def batch_size():
+    return getattr(settings, 'CORE_ROSTER_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+def formato_do_arquivo(nome, formato=None):
+    """ Formato pedido ou deduzido da extensão do arquivo. Lança ValidationError. """
+    if formato is None:
+        nome = (nome or '').lower()
+        formato = next((f for extensao, f in FORMATOS.items() if nome.endswith(extensao)), None)
+    if formato not in FORMATOS.values():
+        raise ValidationError("Formato do roster deve ser 'csv' ou 'jsonl'.")
+    return formato
+
+
+class RosterSpec:
+    """ Modelo, serializer e chave de um tipo de cadastro importável. """
+
+    def __init__(self, model, serializer_class, nomes=None):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.pk = model._meta.pk.name
+        # Campo de relação -> campo do modelo relacionado aceito também como nome
+        self.nomes = nomes or {}
+
+    def relacoes(self):
+        """ {campo do serializer: (modelo relacionado, campo de nome ou None)}. """
+        return {
+            nome: (self.model._meta.get_field(campo.source).related_model, self.nomes.get(nome))
+            for nome, campo in self.serializer_class().fields.items()
+            if isinstance(campo, RelatedField) and not campo.read_only
+        }
+
+    def update_fields(self):
+        """ Campos do modelo atualizados quando o ID já existe. """
+        return [
+            campo.source for campo in self.serializer_class().fields.values() if not campo.read_only
+        ]
+
+
+SPECS = {
+    'alunos': RosterSpec(Aluno, AlunoSerializer),
+    'professores': RosterSpec(Professor, ProfessorRosterSerializer, nomes={'departamento': 'nome_departamento'}),
+}
+
+
+def get_spec(tipo):
+    try:
+        return SPECS[tipo]
+    except KeyError:
+        raise ValidationError(f"Tipo de roster inválido: '{tipo}'. Use 'alunos' ou 'professores'.")
+
+
+def _mensagens(erro):
+    detalhe = erro.detail
+    if isinstance(detalhe, dict):
+        return [str(m) for mensagens in detalhe.values() for m in mensagens]
+    return [str(m) for m in detalhe]
+
+
+class RowValidator:
+    """
+    Valida linhas com os campos graváveis do serializer, já instanciados
+    uma vez. Validadores de unicidade (uma consulta por linha) são retirados;
+    a checagem equivalente é feita por lote (``unique_message``).
+    """
+
+    def __init__(self, spec, mapas):
+        self.spec = spec
+        self.mapas = mapas  # campo de relação -> {ID (texto) ou nome normalizado: pk}
+        self.pk_field = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+        self.campos = {}
+        self.unique_messages = {}
+        for nome, campo in spec.serializer_class().fields.items():
+            if campo.read_only:
+                continue
+            for validador in campo.validators:
+                if isinstance(validador, UniqueValidator):
+                    self.unique_messages[nome] = validador.message
+            campo.validators = [v for v in campo.validators if not isinstance(v, UniqueValidator)]
+            self.campos[nome] = campo
+
+    def unique_message(self, nome):
+        return str(self.unique_messages.get(nome, 'Este campo deve ser único.'))
+
+    def _resolver(self, nome, campo, valor):
+        if valor is empty or valor in ('', None):
+            if campo.allow_null:
+                return None
+            campo.fail('required' if valor is empty else 'null')
+        chave = str(valor).strip()
+        mapa = self.mapas[nome]
+        pk = mapa.get(chave, mapa.get(chave.casefold()))
+        if pk is None:
+            campo.fail('does_not_exist', pk_value=valor)
+        return pk
+
+    def validar(self, dados):
+        """ Retorna (valores por atributo do modelo, erros por coluna). """
+        valores, erros = {}, {}
+        try:
+            valores[self.spec.pk] = self.pk_field.run_validation(dados.get(self.spec.pk, empty))
+        except serializers.ValidationError as e:
+            erros[self.spec.pk] = _mensagens(e)
+        for nome, campo in self.campos.items():
+            valor = dados.get(nome, empty)
+            try:
+                if isinstance(campo, RelatedField):
+                    atributo = self.spec.model._meta.get_field(campo.source).attname
+                    valores[atributo] = self._resolver(nome, campo, valor)
+                else:
+                    valores[campo.source] = campo.run_validation(valor)
+            except SkipField:
+                # Coluna opcional ausente: a linha é o cadastro completo
+                valores[campo.source] = None if campo.allow_null else ''
+            except serializers.ValidationError as e:
+                erros[nome] = _mensagens(e)
+        return valores, erros
+
+
+# --- Leitura em streaming ---
+
+def ler_linhas(arquivo, formato):
+    """
+    Gera (número da linha, dados, erro) de um arquivo binário aberto
+    (upload ou ``open(..., 'rb')``), decodificado em UTF-8 (com ou sem BOM).
+    """
+    texto = codecs.iterdecode(arquivo, 'utf-8-sig')
+    if formato == 'csv':
+        leitor = csv.DictReader(texto)
+        if leitor.fieldnames:
+            leitor.fieldnames = [nome.strip() for nome in leitor.fieldnames]
+        for dados in leitor:
+            dados.pop(None, None)  # colunas além do cabeçalho
+            yield leitor.line_num, dados, None
+        return
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except ValueError:
+            yield numero, {'conteudo': linha.rstrip('\r\n')}, 'JSON inválido.'
+            continue
+        if not isinstance(dados, dict):
+            yield numero, {'conteudo': dados}, 'Cada linha deve ser um objeto JSON.'
+            continue
+        yield numero, dados, None
+
+
+def lotes(linhas, tamanho):
+    linhas = iter(linhas)
+    while bloco := list(islice(linhas, tamanho)):
+        yield bloco
+
+
+class Rejeitos:
+    """
+    Destino das linhas rejeitadas: um arquivo texto (JSONL) e/ou as
+    primeiras ``guardar`` linhas em memória (resposta da API).
+    """
+
+    def __init__(self, arquivo=None, guardar=0):
+        self.arquivo = arquivo
+        self.guardar = guardar
+        self.linhas = []
+        self.total = 0
+
+    def add(self, numero, erros, dados):
+        self.total += 1
+        registro = {'linha': numero, 'erros': erros, 'dados': dados}
+        if self.arquivo is not None:
+            self.arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        if len(self.linhas) < self.guardar:
+            self.linhas.append(registro)
@@ -0,0 +1,246 @@
+# core/search.py
+"""
+Busca textual de projetos (tema, palavra_chave e resumo).
+
+Os textos são normalizados em Python antes de indexar e antes de consultar:
+sem acentos, em minúsculas, sem stopwords e com um radicalizador leve para
+português (plural, sufixos nominais comuns e vogal temática). Assim
+"Informações", "informação" e "informacao" viram o mesmo termo em qualquer
+banco.
+
+O índice invertido fica na tabela ``projetos_busca`` (criada na migração
+0005), com um documento por projeto em que o tema pesa mais que as
+palavras-chave, e estas mais que o resumo:
+
+* PostgreSQL/CockroachDB: tabela comum com índice GIN sobre
+  ``to_tsvector('simple', documento)``, ranqueada com ``ts_rank``;
+* SQLite: tabela virtual FTS5, ranqueada com ``bm25``.
+
+Em outros bancos a busca cai para ``icontains`` (sem ranking).
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q
+
+SEARCH_TABLE = 'projetos_busca'
+
+# Repetição de cada campo no documento (peso no ranking)
+FIELD_WEIGHTS = (('tema', 3), ('palavra_chave', 2), ('resumo', 1))
+
+STOPWORDS = frozenset((
+    'a', 'ao', 'aos', 'as', 'com', 'como', 'da', 'das', 'de', 'do', 'dos', 'e',
+    'em', 'entre', 'na', 'nas', 'no', 'nos', 'o', 'os', 'ou', 'para', 'pela',
+    'pelas', 'pelo', 'pelos', 'por', 'que', 'se', 'sem', 'sobre', 'um', 'uma',
+    'umas', 'uns',
+))
+
+# Plurais (já sem acento): 'informacoes' -> 'informacao', 'sociais' -> 'social'
+PLURAL_SUFFIXES = (
+    ('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'),
+    ('les', 'l'), ('res', 'r'), ('zes', 'z'), ('ns', 'm'), ('s', ''),
+)
+
+# Sufixos nominais, do mais longo para o mais curto
+NOMINAL_SUFFIXES = (
+    'amentos', 'imentos', 'amento', 'imento', 'adoras', 'adores', 'acoes',
+    'adora', 'ancia', 'encia', 'idade', 'mente', 'ismos', 'istas', 'ador',
+    'acao', 'icao', 'ucao', 'avel', 'ivel', 'ismo', 'ista', 'ante', 'ente',
+    'osa', 'oso', 'ica', 'ico', 'iva', 'ivo', 'cao',
+)
+
+MIN_STEM = 3
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def fold(texto):
+    """ Remove acentos e passa para minúsculas. """
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def stem(palavra):
+    """ Radical de uma palavra já sem acentos (versão leve do RSLP). """
+    if len(palavra) <= MIN_STEM or palavra.isdigit():
+        return palavra
+
+    for sufixo, troca in PLURAL_SUFFIXES:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= MIN_STEM:
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+
+    for sufixo in NOMINAL_SUFFIXES:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= MIN_STEM:
+            palavra = palavra[:-len(sufixo)]
+            break
+
+    if palavra[-1] in 'aeo' and len(palavra) > MIN_STEM:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def normalize(texto):
+    """ Lista de termos indexáveis de um texto. """
+    return [stem(token) for token in _TOKEN_RE.findall(fold(texto)) if token not in STOPWORDS]
+
+
+def split_keywords(texto):
+    """
+    Palavras-chave de um texto separado por vírgulas (ou ponto e vírgula),
+    como {termo normalizado: grafia original}, na ordem em que aparecem.
+    """
+    termos = {}
+    for parte in re.split(r'[,;]', texto or ''):
+        rotulo = ' '.join(parte.split())
+        termo = fold(rotulo)
+        if termo and termo not in termos:
+            termos[termo] = rotulo[:255]
+    return {termo[:255]: rotulo for termo, rotulo in termos.items()}
+
+
+def build_document(projeto):
+    """ Documento indexado de um projeto (os campos com maior peso se repetem). """
+    partes = []
+    for campo, peso in FIELD_WEIGHTS:
+        termos = ' '.join(normalize(getattr(projeto, campo, None)))
+        if termos:
+            partes.extend([termos] * peso)
+    return ' '.join(partes)
+
+
+def _backend(conn=None):
+    vendor = (conn or connection).vendor
+    return vendor if vendor in ('postgresql', 'sqlite') else None
+
+
+# --- DDL (usado pela migração) ---
+
+def create_index(schema_editor):
+    vendor = _backend(schema_editor.connection)
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            ' id_proj integer PRIMARY KEY REFERENCES projetos (id_proj) ON DELETE CASCADE,'
+            " documento text NOT NULL DEFAULT '')"
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_gin ON {SEARCH_TABLE}'
+            " USING GIN (to_tsvector('simple', documento))"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}'
+            " USING fts5(documento, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(schema_editor):
+    if _backend(schema_editor.connection):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+# --- Manutenção incremental ---
+
+def index_projects(projetos, conn=None, novos=False):
+    """
+    Insere ou atualiza o documento de cada projeto no índice. Com
+    ``novos=True`` (projetos recém-criados) o documento só é inserido.
+    """
+    conn = conn or connection
+    vendor = _backend(conn)
+    linhas = [(projeto.pk, build_document(projeto)) for projeto in projetos if projeto.pk is not None]
+    if not vendor or not linhas:
+        return
+    with conn.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (id_proj, documento) VALUES (%s, %s)'
+                ' ON CONFLICT (id_proj) DO UPDATE SET documento = EXCLUDED.documento',
+                linhas,
+            )
+        else:
+            # Tabelas FTS5 não têm UPSERT: remove e insere de novo
+            if not novos:
+                cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk, _ in linhas])
+            cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, documento) VALUES (%s, %s)', linhas)
+
+
+def remove_projects(project_ids, conn=None):
+    conn = conn or connection
+    vendor = _backend(conn)
+    if not vendor or not project_ids:
+        return
+    coluna = 'id_proj' if vendor == 'postgresql' else 'rowid'
+    with conn.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE {coluna} = %s', [(pk,) for pk in project_ids])
+
+
+# --- Consulta ---
+
+class Relevancia(Func):
+    """
+    Subconsulta de relevância correlacionada pela chave do projeto. A coluna
+    externa é uma expressão (``F('pk')``), então o Django usa o alias certo
+    da tabela mesmo quando o queryset vira subconsulta ou é reapelidado.
+    """
+    output_field = FloatField()
+
+    def __init__(self, sql, params):
+        super().__init__(F('pk'))
+        self.sql, self.params = sql, params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        coluna, coluna_params = compiler.compile(self.source_expressions[0])
+        return self.sql.format(coluna=coluna), [*self.params, *coluna_params]
+
+
+def match_sql(texto):
+    """
+    Partes da busca para o queryset de projetos: ``(filtro, params,
+    relevancia)``. O filtro é SQL que seleciona os IDs dos projetos que
+    contêm todos os termos (cada termo também casa como prefixo); a
+    relevância é uma expressão ``Relevancia`` em que valores menores são
+    mais relevantes. Nada é limitado aqui: ordenação e paginação por cursor
+    rodam no banco sobre todos os resultados.
+
+    Retorna None se o banco não tem índice textual (use ``fallback_filter``)
+    e ``()`` se a busca não tem termos indexáveis (só stopwords, por
+    exemplo), caso em que não há o que filtrar.
+    """
+    vendor = _backend()
+    if vendor is None:
+        return None
+    termos = list(dict.fromkeys(normalize(texto)))
+    if not termos:
+        return ()
+
+    if vendor == 'postgresql':
+        consulta = ' & '.join(f'{termo}:*' for termo in termos)
+        filtro = (
+            f"SELECT id_proj FROM {SEARCH_TABLE}"
+            f" WHERE to_tsvector('simple', documento) @@ to_tsquery('simple', %s)"
+        )
+        relevancia = (
+            f"(SELECT -ts_rank(to_tsvector('simple', b.documento), to_tsquery('simple', %s))"
+            f" FROM {SEARCH_TABLE} b WHERE b.id_proj = {{coluna}})"
+        )
+    else:
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        filtro = f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+        # bm25 já é menor para os documentos mais relevantes
+        relevancia = (
+            f'(SELECT bm25({SEARCH_TABLE}) FROM {SEARCH_TABLE}'
+            f' WHERE {SEARCH_TABLE} MATCH %s AND {SEARCH_TABLE}.rowid = {{coluna}})'
+        )
+    return filtro, [consulta], Relevancia(relevancia, [consulta])
+
+
+def fallback_filter(texto):
+    """ Filtro icontains equivalente, para bancos sem índice textual. """
+    filtro = Q()
+    for palavra in texto.split():
+        if fold(palavra) in STOPWORDS:
+            continue
+        filtro &= Q(tema__icontains=palavra) | Q(palavra_chave__icontains=palavra) | Q(resumo__icontains=palavra)
+    return filtro
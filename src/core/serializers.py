@@ -1,11 +1,24 @@
 # core/serializers.py
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import (
     Professor, Aluno, Projeto, Departamento, Curso, ProfessorLattes, HistAluno,
     AlunoProj, Orientador, Assessor
 )
 
+class SparseFieldsMixin:
+    """
+    Permite restringir os campos serializados pelo kwarg 'fields'
+    (coleção de nomes). Sem 'fields', todos os campos são mantidos.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
 class ProfessorSerializer(serializers.ModelSerializer):
     # --- CORREÇÃO ---
     # Força o ID grande a ser enviado como String (texto)
@@ -38,6 +51,12 @@ class ProfessorCreateSerializer(serializers.ModelSerializer):
         model = Professor
         fields = ['nome', 'email', 'departamento']
 
+class ProfessorRosterSerializer(serializers.ModelSerializer):
+    """ Campos graváveis de um professor na importação em massa (roster.py). """
+    class Meta:
+        model = Professor
+        fields = ['nome', 'email', 'link_citations', 'departamento']
+
 # --- ProfessorLattesSerializer ---
 class ProfessorLattesSerializer(serializers.ModelSerializer):
     # --- CORREÇÃO ---
@@ -76,7 +95,18 @@ class AssessorStatusSerializer(serializers.ModelSerializer):
         model = Assessor
         fields = ['id_professor', 'nome_professor', 'ativo']
 
-class ProjetoSerializer(serializers.ModelSerializer):
+class ParticipantesEmMemoria(serializers.Field):
+    """ Lista aninhada a partir de associações já em memória, sem consultar o banco. """
+
+    def __init__(self, serializer_class, objetos):
+        self.lista = serializer_class(many=True)
+        self.objetos = objetos
+        super().__init__(source='*', read_only=True)
+
+    def to_representation(self, projeto):
+        return self.lista.to_representation(self.objetos)
+
+class ProjetoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # --- CORREÇÃO 1 ---
     # Força o ID grande a ser enviado como String (texto)
     id_proj = serializers.CharField(read_only=True)
@@ -100,6 +130,25 @@ class ProjetoSerializer(serializers.ModelSerializer):
         # Remove 'id_proj' desta lista, pois já foi definido acima
         read_only_fields = ['pendencia_display', 'orientadores_status', 'assessores_status', 'alunos_status', 'melhor_corretor']
 
+    def __init__(self, *args, participantes=None, **kwargs):
+        """
+        ``participantes``: associações já conhecidas por relação (ex.:
+        ``{'orientador_set': [...]}``, logo após criar o projeto); as listas
+        aninhadas dessas relações são montadas a partir delas.
+        """
+        super().__init__(*args, **kwargs)
+        for nome, campo in list(self.fields.items()):
+            if participantes and campo.source in participantes:
+                self.fields[nome] = ParticipantesEmMemoria(type(campo.child), participantes[campo.source])
+
+    def update(self, instance, validated_data):
+        # Mudar o tipo para IC com mais de um participante ativo viola a regra
+        # de IC (Projeto.save): resposta 400, não erro do servidor
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'tipo': e.messages})
+
 class HistAlunoSerializer(serializers.ModelSerializer):
     class Meta:
         model = HistAluno
@@ -2,6 +2,8 @@
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 # from . import repositories as repo # <-- REMOVIDO DO TOPO
+# Transações repetidas automaticamente em conflitos de concorrência (40001)
+from .transactions import retry_transaction, is_retryable
 
 # --- REVERTIDO --- (Não importamos mais o ProjetoSerializer)
 # 
@@ -15,31 +17,113 @@ def get_professor_project_counts(professor_id):
     """
     from . import repositories as repo # <-- IMPORT AQUI
     try:
-        professor = repo.get_professor_by_id(professor_id)
-        contagem_orientador = repo.get_active_orientador_count(professor)
-        contagem_assessor = repo.get_active_assessor_count(professor)
-        
+        # Lê os contadores persistidos (CargaProfessor) em vez de contar associações
+        professor = repo.get_professor_with_workload(professor_id)
+
         return {
             'id_professor': professor.id_professor,
             'nome_professor': professor.nome,
-            'orientacoes_ativas': contagem_orientador,
-            'assessorias_ativas': contagem_assessor
+            'orientacoes_ativas': professor.orientacoes_ativas,
+            'assessorias_ativas': professor.assessorias_ativas
         }
     except ObjectDoesNotExist:
         raise ObjectDoesNotExist(f"Professor com ID {professor_id} não encontrado.")
 
+WORKLOAD_ORDERINGS = ('id_professor', 'nome', 'orientacoes_ativas', 'assessorias_ativas')
+
+def _optional_int(valor, nome):
+    if valor in (None, ''):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValidationError(f'"{nome}" deve ser um número inteiro.')
+
+def get_professors_workload(departamento=None, ordenar=None, orientacoes_acima=None, assessorias_acima=None):
+    """
+    Regra de negócio: Contagens de orientações e assessorias ativas de
+    vários professores (opcionalmente de um departamento) de uma só vez.
+    ``ordenar`` aceita um dos WORKLOAD_ORDERINGS, com '-' para decrescente;
+    os limites filtram quem tem mais que N orientações/assessorias ativas.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    departamento = _optional_int(departamento, 'departamento')
+    orientacoes_acima = _optional_int(orientacoes_acima, 'orientacoes_acima')
+    assessorias_acima = _optional_int(assessorias_acima, 'assessorias_acima')
+
+    ordenar = ordenar or 'nome'
+    if ordenar.lstrip('-') not in WORKLOAD_ORDERINGS:
+        raise ValidationError(f'"ordenar" deve ser um de: {", ".join(WORKLOAD_ORDERINGS)}.')
+
+    professores = repo.get_professors_workload(departamento)
+    if orientacoes_acima is not None:
+        professores = professores.filter(orientacoes_ativas__gt=orientacoes_acima)
+    if assessorias_acima is not None:
+        professores = professores.filter(assessorias_ativas__gt=assessorias_acima)
+    # id_professor desempata para uma ordem estável
+    professores = professores.order_by(ordenar, 'id_professor')
+
+    return [
+        {
+            'id_professor': str(id_professor),
+            'nome_professor': nome,
+            'orientacoes_ativas': orientacoes,
+            'assessorias_ativas': assessorias,
+        }
+        for id_professor, nome, orientacoes, assessorias in professores.values_list(
+            'id_professor', 'nome', 'orientacoes_ativas', 'assessorias_ativas'
+        )
+    ]
+
+def get_professor_profile(professor_id):
+    """
+    Regra de negócio: Montar o perfil do professor (departamento, Lattes,
+    keywords e contagens de projetos ativos) a partir de uma única consulta.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    try:
+        professor = repo.get_professor_profile(professor_id)
+    except ObjectDoesNotExist:
+        raise ObjectDoesNotExist(f"Professor com ID {professor_id} não encontrado.")
+
+    departamento = professor.departamento
+    try:
+        lattes = professor.professorlattes
+    except ObjectDoesNotExist:
+        lattes = None
+
+    return {
+        'id_professor': str(professor.id_professor),
+        'nome': professor.nome,
+        'email': professor.email,
+        'departamento': {
+            'id_departamento': str(departamento.id_departamento),
+            'nome_departamento': departamento.nome_departamento,
+        } if departamento else None,
+        'lattes_link': lattes.link if lattes else None,
+        'subarea': lattes.subarea if lattes else None,
+        'palavras_chave': [
+            termo.strip() for termo in lattes.palavras_chave.split(',') if termo.strip()
+        ] if lattes else [],
+        'orientacoes_ativas': professor.orientacoes_ativas,
+        'assessorias_ativas': professor.assessorias_ativas,
+    }
+
 # --- Serviço de Projeto ---
 
 # @transaction.atomic
+@retry_transaction
 def create_project_with_associations(data):
     """ 
     Regra de negócio complexa: Criar um projeto...
+
+    Tudo roda em uma única transação (um único commit; nada de projeto
+    órfão se uma associação falhar), repetida em conflitos de concorrência.
+    Orientador e aluno existentes vêm em uma única consulta. O projeto
+    retornado traz as associações criadas em ``participantes_em_memoria``,
+    então serializá-lo não consulta o banco.
     """
     from . import repositories as repo # <-- IMPORT AQUI
-    
-    # --- REVERTIDO ---
-    # ...
-    # -----------------
 
     orientador_id_input = data.get('id_professor')
     orientador_novo_dados = data.get('orientador_novo')
@@ -54,10 +138,13 @@ def create_project_with_associations(data):
             prof_serializer = ProfessorCreateSerializer(data=orientador_novo_dados)
             prof_serializer.is_valid(raise_exception=True)
             orientador_obj = repo.create_professor(prof_serializer.validated_data)
+        elif orientador_id_input and aluno_id_input:
+            # Orientador e aluno buscados juntos, em uma consulta
+            orientador_obj, aluno_obj = repo.get_professor_and_aluno(orientador_id_input, aluno_id_input)
         elif orientador_id_input:
             orientador_obj = repo.get_professor_by_id(orientador_id_input)
 
-        if aluno_id_input:
+        if aluno_id_input and aluno_obj is None:
             aluno_obj = repo.get_aluno_by_id(aluno_id_input)
 
         # --- CORREÇÃO DO "SUSPEITO 1" AQUI ---
@@ -77,12 +164,14 @@ def create_project_with_associations(data):
         projeto = repo.create_project(projeto_data)
         # --- FIM DA CORREÇÃO ---
 
-        if orientador_obj:
-            repo.create_orientador_assoc(orientador_obj, projeto)
-        if aluno_obj:
-            repo.create_alunoproj_assoc(aluno_obj, projeto)
+        orientadores = [repo.create_orientador_assoc(orientador_obj, projeto)] if orientador_obj else []
+        alunos = [repo.create_alunoproj_assoc(aluno_obj, projeto)] if aluno_obj else []
 
-        projeto.refresh_from_db()
+        # Estado já conhecido: dispensa o refresh_from_db() e o prefetch das
+        # associações (ProjetoSerializer(..., participantes=...))
+        projeto.participantes_em_memoria = {
+            'orientador_set': orientadores, 'alunoproj_set': alunos, 'assessor_set': [],
+        }
         return projeto
 
     except ObjectDoesNotExist as e:
@@ -94,6 +183,179 @@ def create_project_with_associations(data):
     except (IntegrityError, ValidationError) as e:
         raise e
 
+BULK_MAX_ITEMS = 1000
+
+def _parse_id(valor):
+    """ Converte um ID recebido na requisição para int (None se ausente). """
+    if valor in (None, ''):
+        return None
+    return int(valor)
+
+def create_projects_bulk(itens, dry_run=False):
+    """
+    Regra de negócio: Criar vários projetos de uma vez.
+
+    Todos os itens são validados antes de qualquer escrita; professores e
+    alunos referenciados são buscados com uma consulta IN cada. Se algum
+    item for inválido, nada é gravado. Caso contrário, projetos e
+    associações são inseridos com bulk_create em uma única transação
+    (a menos que ``dry_run`` seja verdadeiro).
+
+    Retorna (sucesso, resultados), com um resultado por item.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    from .serializers import ProjetoSerializer
+
+    if not isinstance(itens, list) or not itens:
+        raise ValidationError('Envie uma lista não vazia de projetos.')
+    if len(itens) > BULK_MAX_ITEMS:
+        raise ValidationError(f'No máximo {BULK_MAX_ITEMS} projetos por requisição.')
+
+    resultados = []
+    validos = []
+    for indice, item in enumerate(itens):
+        erros = {}
+        projeto_data = None
+        orientador_id = aluno_id = None
+        if not isinstance(item, dict):
+            erros['non_field_errors'] = ['Item deve ser um objeto.']
+        else:
+            serializer = ProjetoSerializer(data=item)
+            if serializer.is_valid():
+                projeto_data = serializer.validated_data
+            else:
+                erros.update(serializer.errors)
+            if item.get('orientador_novo'):
+                erros['orientador_novo'] = ['Criação de orientador não é suportada em lote; use "id_professor".']
+            try:
+                orientador_id = _parse_id(item.get('id_professor'))
+            except (TypeError, ValueError):
+                erros['id_professor'] = ['ID inválido.']
+            try:
+                aluno_id = _parse_id(item.get('id_aluno'))
+            except (TypeError, ValueError):
+                erros['id_aluno'] = ['ID inválido.']
+        resultados.append({'indice': indice, 'status': 'erro' if erros else 'valido', 'erros': erros})
+        validos.append((projeto_data, orientador_id, aluno_id))
+
+    professores = repo.get_professors_by_ids({o for _, o, _ in validos if o is not None})
+    alunos = repo.get_alunos_by_ids({a for _, _, a in validos if a is not None})
+    for resultado, (_, orientador_id, aluno_id) in zip(resultados, validos):
+        if orientador_id is not None and orientador_id not in professores:
+            resultado['erros']['id_professor'] = [f'Professor orientador com ID {orientador_id} não encontrado.']
+        if aluno_id is not None and aluno_id not in alunos:
+            resultado['erros']['id_aluno'] = [f'Aluno com ID {aluno_id} não encontrado.']
+        if resultado['erros']:
+            resultado['status'] = 'erro'
+
+    if any(r['status'] == 'erro' for r in resultados):
+        return False, resultados
+    if dry_run:
+        return True, resultados
+
+    with transaction.atomic():
+        projetos = repo.bulk_create_projects([data for data, _, _ in validos])
+        repo.bulk_create_orientador_assocs([
+            (professores[o], projeto) for projeto, (_, o, _) in zip(projetos, validos) if o is not None
+        ])
+        repo.bulk_create_alunoproj_assocs([
+            (alunos[a], projeto) for projeto, (_, _, a) in zip(projetos, validos) if a is not None
+        ])
+
+    for resultado, projeto in zip(resultados, projetos):
+        resultado['status'] = 'criado'
+        resultado['id_proj'] = str(projeto.id_proj)
+    return True, resultados
+
+BULK_MAX_PARES = 5000
+
+@retry_transaction
+def associate_participants_bulk(role, pares):
+    """
+    Regra de negócio: Associar vários pares (projeto, pessoa) em um role.
+
+    As mesmas regras das associações individuais são aplicadas com
+    consultas por conjunto: orientador não pode ser assessor do mesmo
+    projeto e projetos de Iniciação Científica só podem ter um participante
+    ativo por role (regra garantida pelo índice parcial no banco). Os pares
+    aceitos são inseridos com um único bulk_create que ignora conflitos.
+    Leituras e escritas rodam em uma transação (repetida em conflitos 40001).
+    Retorna um resultado por par.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    from .models import Projeto
+    if role not in repo.PARTICIPANT_MODELS:
+        raise ValidationError('Role inválido. Deve ser "aluno", "orientador" ou "assessor".')
+    if not isinstance(pares, list) or not pares:
+        raise ValidationError('Envie uma lista não vazia de pares.')
+    if len(pares) > BULK_MAX_PARES:
+        raise ValidationError(f'No máximo {BULK_MAX_PARES} pares por requisição.')
+
+    person_key = 'id_aluno' if role == 'aluno' else 'id_professor'
+    resultados = []
+    parsed = []
+    for par in pares:
+        resultado = {'id_proj': None, person_key: None}
+        try:
+            projeto_id = _parse_id(par.get('id_proj'))
+            person_id = _parse_id(par.get(person_key))
+            if projeto_id is None or person_id is None:
+                raise ValueError
+            resultado.update({'id_proj': str(projeto_id), person_key: str(person_id)})
+        except (AttributeError, TypeError, ValueError):
+            resultado.update({'status': 'erro', 'mensagem': f'Par deve conter "id_proj" e "{person_key}" válidos.'})
+            projeto_id = person_id = None
+        resultados.append(resultado)
+        parsed.append((projeto_id, person_id))
+
+    project_ids = {p for p, _ in parsed if p is not None}
+    person_ids = {a for _, a in parsed if a is not None}
+    projetos = repo.get_projects_by_ids(project_ids)
+    pessoas = repo.get_alunos_by_ids(person_ids) if role == 'aluno' else repo.get_professors_by_ids(person_ids)
+    existentes = repo.get_existing_participant_pairs(role, project_ids, person_ids)
+    orientadores = repo.get_existing_participant_pairs('orientador', project_ids, person_ids) if role == 'assessor' else set()
+    ic_ids = {pid for pid, p in projetos.items() if p.tipo == Projeto.TipoPesquisa.INICIACAO_CIENTIFICA}
+    ic_ocupados = repo.get_projects_with_active_participant(role, ic_ids) if ic_ids else set()
+
+    aceitos = []
+    for resultado, par in zip(resultados, parsed):
+        if 'status' in resultado:
+            continue
+        projeto_id, person_id = par
+        if projeto_id not in projetos:
+            resultado.update({'status': 'erro', 'mensagem': f'Projeto (ID {projeto_id}) não encontrado.'})
+        elif person_id not in pessoas:
+            pessoa = 'Aluno' if role == 'aluno' else 'Professor'
+            resultado.update({'status': 'erro', 'mensagem': f'{pessoa} (ID {person_id}) não encontrado.'})
+        elif par in existentes:
+            resultado.update({'status': 'ja_associado'})
+        elif par in orientadores:
+            resultado.update({'status': 'erro', 'mensagem': 'Orientador não pode ser assessor.'})
+        elif projeto_id in ic_ocupados:
+            resultado.update({
+                'status': 'erro',
+                'mensagem': f'Projetos de Iniciação Científica só podem ter um {role} ativo por vez.'
+            })
+        else:
+            resultado['status'] = 'associado'
+            aceitos.append(par)
+            existentes.add(par)  # pares repetidos no mesmo lote
+            if projeto_id in ic_ids:
+                ic_ocupados.add(projeto_id)
+
+    if aceitos:
+        tipos = {projeto_id: projetos[projeto_id].tipo for projeto_id, _ in aceitos}
+        recusados = repo.bulk_create_participant_assocs(role, aceitos, tipos)
+        # O índice parcial de IC é a garantia final sob concorrência
+        for resultado, par in zip(resultados, parsed):
+            if resultado.get('status') == 'associado' and par in recusados:
+                resultado.update({
+                    'status': 'erro',
+                    'mensagem': f'Projetos de Iniciação Científica só podem ter um {role} ativo por vez.'
+                })
+    return resultados
+
+@retry_transaction
 def associate_aluno_to_project(project_id, aluno_id):
     """ Associa um aluno a um projeto. """
     from . import repositories as repo # <-- IMPORT AQUI
@@ -104,8 +366,11 @@ def associate_aluno_to_project(project_id, aluno_id):
     except ObjectDoesNotExist as e:
         raise ObjectDoesNotExist(f"Projeto (ID {project_id}) ou Aluno (ID {aluno_id}) não encontrado.")
     except Exception as e:
+        if is_retryable(e):
+            raise
         raise ValidationError(f"Erro ao associar aluno: {e}")
 
+@retry_transaction
 def associate_assessor_to_project(project_id, assessor_id):
     """ 
     Regra de negócio: Associa um assessor, 
@@ -128,8 +393,11 @@ def associate_assessor_to_project(project_id, assessor_id):
              raise ObjectDoesNotExist(f"Professor assessor com ID {assessor_id} não encontrado.")
         raise ObjectDoesNotExist(f"Projeto (ID {project_id}) não encontrado.")
     except Exception as e:
+        if is_retryable(e):
+            raise
         raise ValidationError(f"Erro ao associar assessor: {e}")
 
+@retry_transaction
 def associate_orientador_to_project(project_id, orientador_id):
     """ Associa um orientador a um projeto. """
     from . import repositories as repo # <-- IMPORT AQUI
@@ -142,6 +410,8 @@ def associate_orientador_to_project(project_id, orientador_id):
             raise ObjectDoesNotExist(f"Professor (ID {orientador_id}) não encontrado.")
         raise ObjectDoesNotExist(f"Projeto (ID {project_id}) não encontrado.")
     except Exception as e:
+        if is_retryable(e):
+            raise
         raise ValidationError(f"Erro ao associar orientador: {e}")
 
 def link_mongo_to_project(project_id, mongo_id_str):
@@ -170,6 +440,50 @@ def save_corretor_text(project_id, texto_corretor):
     except ObjectDoesNotExist:
         raise ObjectDoesNotExist(f"Projeto (ID {project_id}) não encontrado.")
 
+def recommend_assessores(project_id, k=None):
+    """
+    Ranqueia os professores por similaridade entre o Lattes (palavras-chave
+    e subárea) e o texto do projeto. Orientadores do projeto são excluídos,
+    pois não podem ser assessores.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    from . import recomendacao
+
+    k = recomendacao.DEFAULT_K if k in (None, '') else k
+    try:
+        k = int(k)
+    except (TypeError, ValueError):
+        raise ValidationError('"k" deve ser um número inteiro.')
+    if not 1 <= k <= recomendacao.MAX_K:
+        raise ValidationError(f'"k" deve estar entre 1 e {recomendacao.MAX_K}.')
+
+    try:
+        projeto = repo.get_project_by_id(project_id)
+    except ObjectDoesNotExist:
+        raise ObjectDoesNotExist(f"Projeto (ID {project_id}) não encontrado.")
+
+    modelo = recomendacao.get_modelo()
+    return modelo.ranquear(recomendacao.texto_projeto(projeto), k, excluir=repo.get_orientador_ids(projeto))
+
+def get_academic_performance(top=None, min_tentativas=None):
+    """
+    Regra de negócio: Taxas de aprovação por disciplina, departamento e
+    curso e os pontos críticos de reprovação, sobre todo o histórico.
+    """
+    from . import desempenho
+
+    top = _optional_int(top, 'top')
+    top = desempenho.DEFAULT_TOP if top is None else top
+    if not 1 <= top <= desempenho.MAX_TOP:
+        raise ValidationError(f'"top" deve estar entre 1 e {desempenho.MAX_TOP}.')
+    min_tentativas = _optional_int(min_tentativas, 'min_tentativas')
+    min_tentativas = desempenho.DEFAULT_MIN_TENTATIVAS if min_tentativas is None else min_tentativas
+    if min_tentativas < 1:
+        raise ValidationError('"min_tentativas" deve ser positivo.')
+
+    return desempenho.get_agregado().relatorio(top, min_tentativas)
+
+@retry_transaction
 def deactivate_project_participant(project_id, role):
     """ 
     Regra de negócio complexa: Desativa um participante...
@@ -196,4 +510,98 @@ def deactivate_project_participant(project_id, role):
     except ObjectDoesNotExist as e:
         if 'Projeto' in str(e):
              raise ObjectDoesNotExist(f"Projeto (ID {project_id}) não encontrado.")
-        raise e
\ No newline at end of file
+        raise e
+# --- Serviço de Importação (roster) ---
+
+@retry_transaction
+def _upsert_roster_batch(spec, linhas):
+    """ Grava um lote já validado; retorna (criados, atualizados). """
+    from . import repositories as repo # <-- IMPORT AQUI
+    pks = {valores[spec.pk] for _, valores, _ in linhas}
+    existentes, _ = repo.get_roster_conflicts(spec.model, pks, ())
+    novos = sorted(pks - existentes)
+    repo.upsert_roster(spec.model, [valores for _, valores, _ in linhas], spec.update_fields(), novos)
+    return len(novos), len(existentes)
+
+def _write_roster_batch(spec, validador, linhas, rejeitos):
+    """
+    Checa a unicidade dos e-mails do lote (no lote e no banco) e grava o
+    restante. Retorna (criados, atualizados).
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    # Mesmo ID repetido no lote: vale a última linha
+    por_pk = {}
+    for linha in linhas:
+        por_pk.pop(linha[1][spec.pk], None)
+        por_pk[linha[1][spec.pk]] = linha
+
+    _, donos = repo.get_roster_conflicts(
+        spec.model, set(por_pk), {valores['email'] for _, valores, _ in por_pk.values()}
+    )
+    aceitas = []
+    for numero, valores, dados in por_pk.values():
+        pk, email = valores[spec.pk], valores['email']
+        if donos.setdefault(email, pk) != pk:
+            rejeitos.add(numero, {'email': [validador.unique_message('email')]}, dados)
+        else:
+            aceitas.append((numero, valores, dados))
+    if not aceitas:
+        return 0, 0
+
+    try:
+        return _upsert_roster_batch(spec, aceitas)
+    except IntegrityError:
+        # Conflito que a checagem não previu (ex.: cadastros trocando de
+        # e-mail entre si, ou escrita concorrente): grava linha a linha
+        criados = atualizados = 0
+        for linha in aceitas:
+            try:
+                c, a = _upsert_roster_batch(spec, [linha])
+            except IntegrityError as e:
+                rejeitos.add(linha[0], {'non_field_errors': [str(e)]}, linha[2])
+            else:
+                criados, atualizados = criados + c, atualizados + a
+        return criados, atualizados
+
+def import_roster(tipo, arquivo, formato, rejeitos, lote=None):
+    """
+    Regra de negócio: Importar um roster (CSV/JSONL) de alunos ou professores.
+
+    O arquivo é lido em streaming e gravado em lotes de ``lote`` linhas,
+    cada lote em uma transação (ver roster.py). Linhas inválidas vão para
+    ``rejeitos`` (roster.Rejeitos) sem interromper a importação; lotes já
+    gravados não são desfeitos se um lote posterior falhar.
+
+    Retorna as contagens {'lidas', 'criados', 'atualizados', 'rejeitadas'}.
+    """
+    from . import repositories as repo # <-- IMPORT AQUI
+    from . import roster
+
+    spec = roster.get_spec(tipo)
+    lote = lote or roster.batch_size()
+    if lote < 1:
+        raise ValidationError('O tamanho do lote deve ser positivo.')
+    mapas = {
+        nome: repo.get_roster_lookup(modelo, campo_nome)
+        for nome, (modelo, campo_nome) in spec.relacoes().items()
+    }
+    validador = roster.RowValidator(spec, mapas)
+
+    lidas = criados = atualizados = 0
+    for bloco in roster.lotes(roster.ler_linhas(arquivo, formato), lote):
+        validas = []
+        for numero, dados, erro in bloco:
+            lidas += 1
+            if erro:
+                rejeitos.add(numero, {'non_field_errors': [erro]}, dados)
+                continue
+            valores, erros = validador.validar(dados)
+            if erros:
+                rejeitos.add(numero, erros, dados)
+            else:
+                validas.append((numero, valores, dados))
+        if validas:
+            c, a = _write_roster_batch(spec, validador, validas, rejeitos)
+            criados, atualizados = criados + c, atualizados + a
+
+    return {'lidas': lidas, 'criados': criados, 'atualizados': atualizados, 'rejeitadas': rejeitos.total}
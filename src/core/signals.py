@@ -0,0 +1,165 @@
+# core/signals.py
+import sys
+
+from django.core.signals import got_request_exception, request_started, request_finished
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .models import (
+    Departamento, Curso, Professor, Aluno, Projeto, AlunoProj, Orientador,
+    Assessor, ProfessorLattes, HistAluno
+)
+
+# Modelos cuja versão de tabela é incrementada a cada escrita
+VERSIONED_MODELS = (
+    Departamento, Curso, Professor, Aluno, Projeto, AlunoProj, Orientador,
+    Assessor, ProfessorLattes, HistAluno
+)
+
+
+def bump_version_on_write(sender, **kwargs):
+    """ Incrementa a versão da tabela do modelo salvo ou removido. """
+    from . import repositories as repo
+    repo.bump_table_versions(sender)
+
+
+def bump_version_on_m2m_change(sender, action, **kwargs):
+    """ add()/remove()/clear() nas relações M2M escrevem direto na tabela 'through'. """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        from . import repositories as repo
+        repo.bump_table_versions(sender)
+
+
+# Campos que compõem o documento da busca textual
+SEARCH_FIELDS = frozenset(('tema', 'palavra_chave', 'resumo'))
+
+
+def update_search_index(sender, instance, created=False, update_fields=None, **kwargs):
+    """ Reindexa o projeto salvo, a menos que nenhum campo textual tenha mudado. """
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    from . import search
+    search.index_projects([instance], novos=created)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    from . import search
+    search.remove_projects([instance.pk])
+
+
+def sync_keywords(sender, instance, created=False, update_fields=None, **kwargs):
+    """ Mantém as tabelas de palavras-chave normalizadas em dia com o texto. """
+    campo = 'palavras_chave' if sender is ProfessorLattes else 'palavra_chave'
+    if update_fields is not None and campo not in update_fields:
+        return
+    from . import repositories as repo
+    if sender is ProfessorLattes:
+        repo.sync_professor_keywords([instance], novos=created)
+    else:
+        repo.sync_project_keywords([instance], novos=created)
+
+
+def update_workload_on_save(sender, instance, created=False, **kwargs):
+    """
+    Ajusta CargaProfessor conforme a associação salva: entrada/saída do
+    estado ativo e troca de professor. Se o estado anterior é desconhecido,
+    recalcula o professor do zero.
+    """
+    from . import repositories as repo
+    campo = repo.WORKLOAD_FIELDS[sender]
+    anterior = None if created else getattr(instance, '_carga_original', None)
+    if not created and anterior is None:
+        repo.recompute_workload([instance.professor_id])
+    else:
+        deltas = {}
+        if anterior is not None and anterior[1]:
+            deltas[anterior[0]] = deltas.get(anterior[0], 0) - 1
+        if instance.ativo:
+            deltas[instance.professor_id] = deltas.get(instance.professor_id, 0) + 1
+        repo.adjust_workload(campo, deltas)
+    instance._carga_original = (instance.professor_id, instance.ativo)
+
+
+def create_workload_row(sender, instance, created=False, raw=False, **kwargs):
+    """ Todo professor novo nasce com CargaProfessor zerada. """
+    if created and not raw:
+        from . import repositories as repo
+        repo.create_workload_rows([instance.pk])
+
+
+def update_workload_on_delete(sender, instance, **kwargs):
+    from . import repositories as repo
+    professor_id, ativo = getattr(instance, '_carga_original', None) or (instance.professor_id, instance.ativo)
+    if ativo:
+        repo.adjust_workload(repo.WORKLOAD_FIELDS[sender], {professor_id: -1})
+
+
+def begin_request_identity_map(sender, **kwargs):
+    from . import repositories as repo
+    repo.begin_identity_map()
+
+
+def end_request_identity_map(sender, **kwargs):
+    from . import repositories as repo
+    repo.clear_identity_map()
+
+
+def evict_from_identity_map(sender, instance, **kwargs):
+    """ Qualquer escrita (mesmo fora de save_instance) invalida a instância guardada. """
+    from . import repositories as repo
+    repo.evict_identity(instance)
+
+
+def checkout_connections(sender, **kwargs):
+    """ Prepara a contagem de checkouts da requisição, sem abrir conexão (ver pool.py). """
+    from .pool import tracker
+    tracker.begin_request()
+
+
+def release_connections(sender, **kwargs):
+    from .pool import tracker
+    tracker.release()
+
+
+def count_new_connection(sender, connection, **kwargs):
+    from .pool import tracker
+    tracker.connection_created(connection)
+
+
+def count_checkout_failure(sender, **kwargs):
+    """ Enviado pelo Django dentro do ``except``: a exceção é a que está sendo tratada. """
+    from .pool import tracker
+    tracker.request_failed(sys.exc_info()[1])
+
+
+def install_fault_injection(sender, connection, **kwargs):
+    """ Conflitos 40001 simulados em conexões novas, se CORE_TX_FAULT_RATE estiver ligado. """
+    from .transactions import install_fault_injection
+    install_fault_injection(sender, connection, **kwargs)
+
+
+def connect_signals():
+    for model in VERSIONED_MODELS:
+        post_save.connect(bump_version_on_write, sender=model, dispatch_uid=f'versao_save_{model.__name__}')
+        post_delete.connect(bump_version_on_write, sender=model, dispatch_uid=f'versao_delete_{model.__name__}')
+    for through in (Projeto.alunos.through, Projeto.orientadores.through, Projeto.assessores.through):
+        m2m_changed.connect(bump_version_on_m2m_change, sender=through, dispatch_uid=f'versao_m2m_{through.__name__}')
+    post_save.connect(update_search_index, sender=Projeto, dispatch_uid='busca_save_projeto')
+    post_delete.connect(remove_from_search_index, sender=Projeto, dispatch_uid='busca_delete_projeto')
+    for model in (ProfessorLattes, Projeto):
+        post_save.connect(sync_keywords, sender=model, dispatch_uid=f'palavras_save_{model.__name__}')
+    for model in (Orientador, Assessor):
+        post_save.connect(update_workload_on_save, sender=model, dispatch_uid=f'carga_save_{model.__name__}')
+        post_delete.connect(update_workload_on_delete, sender=model, dispatch_uid=f'carga_delete_{model.__name__}')
+    post_save.connect(create_workload_row, sender=Professor, dispatch_uid='carga_novo_professor')
+    request_started.connect(begin_request_identity_map, dispatch_uid='identity_map_inicio')
+    request_finished.connect(end_request_identity_map, dispatch_uid='identity_map_fim')
+    # Depois do close_old_connections do Django, que já está conectado
+    request_started.connect(checkout_connections, dispatch_uid='pool_checkout')
+    request_finished.connect(release_connections, dispatch_uid='pool_release')
+    connection_created.connect(count_new_connection, dispatch_uid='pool_conexao_nova')
+    got_request_exception.connect(count_checkout_failure, dispatch_uid='pool_falha')
+    connection_created.connect(install_fault_injection, dispatch_uid='transacoes_injecao_falhas')
+    for model in (Projeto, Professor, Aluno):
+        post_save.connect(evict_from_identity_map, sender=model, dispatch_uid=f'identity_save_{model.__name__}')
+        post_delete.connect(evict_from_identity_map, sender=model, dispatch_uid=f'identity_delete_{model.__name__}')
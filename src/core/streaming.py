@@ -0,0 +1,122 @@
+# core/streaming.py
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from .db_routers import iterar_no_bloco
+
+
+STREAM_QUERY_PARAM = 'stream'
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _dumps(data):
+    """ Serializa um objeto com as mesmas opções do JSONRenderer do DRF. """
+    return json.dumps(
+        data,
+        cls=encoders.JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    )
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Renderer para JSON delimitado por linhas (um objeto por linha).
+    Listagens com ``Accept: application/x-ndjson`` (ou ``?format=ndjson``)
+    são transmitidas em streaming pelo StreamingListMixin; este renderer
+    cobre as demais respostas (detalhe, erros).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(_dumps(row) + '\n' for row in rows).encode(self.charset)
+
+
+def iter_json_array(rows, serializer):
+    """ Gera um array JSON em pedaços, serializando uma linha por vez. """
+    yield '['
+    first = True
+    for obj in rows:
+        if not first:
+            yield ','
+        first = False
+        yield _dumps(serializer.to_representation(obj))
+    yield ']'
+
+
+def iter_ndjson(rows, serializer):
+    """ Gera uma linha JSON por objeto. """
+    for obj in rows:
+        yield _dumps(serializer.to_representation(obj)) + '\n'
+
+
+async def aiter_json_array(rows, serializer):
+    """ Versão assíncrona de ``iter_json_array`` (``rows`` vem de ``aiterator()``). """
+    yield '['
+    first = True
+    async for obj in rows:
+        if not first:
+            yield ','
+        first = False
+        yield _dumps(serializer.to_representation(obj))
+    yield ']'
+
+
+async def aiter_ndjson(rows, serializer):
+    """ Versão assíncrona de ``iter_ndjson``. """
+    async for obj in rows:
+        yield _dumps(serializer.to_representation(obj)) + '\n'
+
+
+class StreamingListMixin:
+    """
+    Mixin de listagem com modo streaming opcional.
+
+    Com ``?stream=1`` a lista é enviada como um array JSON; com
+    ``Accept: application/x-ndjson`` (ou ``?format=ndjson``), como NDJSON.
+    Em ambos os casos as linhas são lidas com ``QuerySet.iterator()`` (os
+    ``prefetch_related`` são resolvidos por lote de ``stream_chunk_size``)
+    e serializadas uma a uma, sem paginação e sem montar a lista inteira
+    em memória. A leitura acontece sob o mesmo roteamento (réplica ou
+    primário) da requisição, embora a resposta seja consumida depois da view.
+    """
+    stream_chunk_size = DEFAULT_CHUNK_SIZE
+
+    def get_renderers(self):
+        return super().get_renderers() + [NDJSONRenderer()]
+
+    def get_stream_format(self, request):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format == NDJSONRenderer.format:
+            return 'ndjson'
+        if request.query_params.get(STREAM_QUERY_PARAM, '').lower() in ('1', 'true', 'sim'):
+            return 'json'
+        return None
+
+    def list(self, request, *args, **kwargs):
+        stream_format = self.get_stream_format(request)
+        if stream_format is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        # Uma única instância do serializer é reaproveitada para todas as linhas
+        serializer = self.get_serializer()
+
+        if stream_format == 'ndjson':
+            return StreamingHttpResponse(
+                iterar_no_bloco(iter_ndjson(rows, serializer)), content_type=NDJSONRenderer.media_type
+            )
+        return StreamingHttpResponse(
+            iterar_no_bloco(iter_json_array(rows, serializer)), content_type='application/json'
+        )
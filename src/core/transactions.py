@@ -0,0 +1,194 @@
+# core/transactions.py
+"""
+Repetição automática de transações abortadas por conflito (SQLSTATE 40001).
+
+Sob contenção o CockroachDB aborta transações com ``serialization_failure``
+("restart transaction") e espera que o cliente as repita. ``retry_transaction``
+envolve uma função de serviço em uma transação e, se ela falhar com um erro
+repetível, desfaz tudo e tenta de novo, com backoff exponencial e jitter
+completo (espera aleatória entre 0 e ``base * 2**n``, limitada a ``teto``).
+
+Com ``savepoint=True`` (ou ``CORE_TX_RETRY_SAVEPOINT``) a repetição é feita
+no cliente dentro da mesma transação: cada tentativa roda em um savepoint
+aberto logo no início dela e o conflito faz ``ROLLBACK TO SAVEPOINT``, como
+no protocolo ``cockroach_restart``.
+
+Chamadas já dentro de outra transação não repetem sozinhas (o conflito
+aborta a transação de fora): o erro sobe até o ``retry_transaction`` mais
+externo. Esgotadas as tentativas, levanta ``ConflitoTransacao``.
+
+Para testar sem cluster, ``injetar_conflitos`` faz as próximas N escritas de
+uma conexão falharem com 40001; ``CORE_TX_FAULT_RATE`` (ex.: 0.05) liga a
+mesma injeção, aleatória, em toda conexão nova do processo.
+"""
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+RETRYABLE_SQLSTATES = frozenset(('40001',))
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BASE = 0.05
+DEFAULT_TETO = 1.0
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class ConflitoTransacao(Exception):
+    """ A transação continuou em conflito depois de todas as tentativas. """
+
+    def __init__(self, nome, tentativas, erro):
+        super().__init__(
+            f'Conflito de concorrência ao executar {nome}; tente novamente. '
+            f'({tentativas} tentativas, último erro: {erro})'
+        )
+        self.tentativas = tentativas
+        self.erro = erro
+
+
+class ConflitoSimulado(OperationalError):
+    """ Erro 40001 gerado pela injeção de falhas. """
+    sqlstate = '40001'
+
+
+def sqlstate(erro):
+    """ SQLSTATE do erro ou da sua causa (psycopg 3: ``sqlstate``, psycopg2: ``pgcode``). """
+    while erro is not None:
+        codigo = getattr(erro, 'sqlstate', None) or getattr(erro, 'pgcode', None)
+        if codigo:
+            return codigo
+        erro = erro.__cause__
+    return None
+
+
+def is_retryable(erro):
+    return sqlstate(erro) in RETRYABLE_SQLSTATES
+
+
+# --- Contadores ---
+
+_lock = threading.Lock()
+_contadores = {'execucoes': 0, 'repeticoes': 0, 'sucessos_apos_repeticao': 0, 'esgotadas': 0}
+_por_funcao = {}
+
+
+def _contar(contador, nome=None):
+    with _lock:
+        _contadores[contador] += 1
+        if nome is not None:
+            _por_funcao[nome] = _por_funcao.get(nome, 0) + 1
+
+
+def retry_stats():
+    with _lock:
+        return dict(_contadores, repeticoes_por_funcao=dict(_por_funcao))
+
+
+def reset_retry_stats():
+    with _lock:
+        for contador in _contadores:
+            _contadores[contador] = 0
+        _por_funcao.clear()
+
+
+# --- Repetição ---
+
+def backoff(tentativa, base=None, teto=None):
+    """ Espera antes da tentativa seguinte (full jitter). """
+    base = getattr(settings, 'CORE_TX_RETRY_BASE', DEFAULT_BASE) if base is None else base
+    teto = getattr(settings, 'CORE_TX_RETRY_MAX', DEFAULT_TETO) if teto is None else teto
+    return random.uniform(0, min(teto, base * 2 ** (tentativa - 1)))
+
+
+def _apos_rollback():
+    # Instâncias guardadas na tentativa anterior podem refletir escritas desfeitas
+    from . import repositories as repo
+    repo.reset_identity_map()
+
+
+def retry_transaction(func=None, *, tentativas=None, savepoint=None, using=DEFAULT_DB_ALIAS):
+    """ Decorator: roda a função em uma transação e repete em conflitos 40001. """
+    if func is None:
+        return functools.partial(retry_transaction, tentativas=tentativas, savepoint=savepoint, using=using)
+
+    nome = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        maximo = tentativas or getattr(settings, 'CORE_TX_RETRY_ATTEMPTS', DEFAULT_ATTEMPTS)
+        usar_savepoint = getattr(settings, 'CORE_TX_RETRY_SAVEPOINT', False) if savepoint is None else savepoint
+        _contar('execucoes')
+
+        if connections[using].in_atomic_block and not usar_savepoint:
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+
+        @contextmanager
+        def transacao():
+            if usar_savepoint:
+                # Um único BEGIN; as tentativas usam savepoints dentro dele
+                with transaction.atomic(using=using):
+                    yield
+            else:
+                yield
+
+        with transacao():
+            for tentativa in range(1, maximo + 1):
+                try:
+                    with transaction.atomic(using=using):
+                        resultado = func(*args, **kwargs)
+                except Exception as erro:
+                    if not is_retryable(erro):
+                        raise
+                    _apos_rollback()
+                    if tentativa == maximo:
+                        _contar('esgotadas')
+                        raise ConflitoTransacao(nome, tentativa, erro) from erro
+                    _contar('repeticoes', nome)
+                    time.sleep(backoff(tentativa))
+                else:
+                    if tentativa > 1:
+                        _contar('sucessos_apos_repeticao')
+                    return resultado
+
+    return wrapper
+
+
+# --- Injeção de falhas (testes e ambiente local) ---
+
+class FaultInjector:
+    """
+    ``execute_wrapper`` que faz escritas falharem com 40001: as ``falhas``
+    primeiras (determinístico) ou cada uma com probabilidade ``taxa``.
+    """
+
+    def __init__(self, falhas=0, taxa=0.0):
+        self.restantes = falhas
+        self.taxa = taxa
+        self.injetadas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            if self.restantes > 0 or (self.taxa and random.random() < self.taxa):
+                self.restantes = max(self.restantes - 1, 0)
+                self.injetadas += 1
+                raise ConflitoSimulado('restart transaction: TransactionRetryWithProtoRefreshError (simulado)')
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def injetar_conflitos(falhas=1, taxa=0.0, using=DEFAULT_DB_ALIAS):
+    """ Dentro do bloco, as próximas ``falhas`` escritas da conexão falham com 40001. """
+    injetor = FaultInjector(falhas, taxa)
+    with connections[using].execute_wrapper(injetor):
+        yield injetor
+
+
+def install_fault_injection(sender, connection, **kwargs):
+    """ Receiver de ``connection_created``: liga a injeção aleatória se configurada. """
+    taxa = getattr(settings, 'CORE_TX_FAULT_RATE', 0)
+    if taxa:
+        connection.execute_wrappers.append(FaultInjector(taxa=taxa))
@@ -7,8 +7,26 @@ from .views import (
     ProjetoViewSet,
     DepartamentoViewSet,
     AllProfessorLattesKeywordsView,
-    ProfessorLattesViewSet
+    KeywordProfessoresView,
+    ProfessorLattesViewSet,
+    DesempenhoAcademicoView,
+    MetricasView
 )
+from . import async_views
+
+# Leituras assíncronas (ASGI), com o mesmo JSON das rotas síncronas
+async_urlpatterns = [
+    path('projetos/', async_views.projeto_list, name='async-projeto-list'),
+    path('projetos/<int:id_proj>/', async_views.projeto_detail, name='async-projeto-detail'),
+    path('alunos/<int:id_aluno>/historico/', async_views.aluno_historico, name='async-aluno-historico'),
+    path('professores/<int:id_professor>/lattes/', async_views.professor_lattes, name='async-professor-lattes'),
+    path(
+        'departamentos/<int:id_departamento>/professores-keywords/',
+        async_views.departamento_professores_keywords,
+        name='async-departamento-professores-keywords',
+    ),
+    path('lattes-keywords/', async_views.all_lattes_keywords, name='async-all-lattes-keywords'),
+]
 
 router = DefaultRouter()
 router.register(r'professores', ProfessorViewSet, basename='professor')
@@ -19,9 +37,13 @@ router.register(r'lattes', ProfessorLattesViewSet, basename='lattes')
 
 urlpatterns = [
     # Inclui /api/professores/, /api/alunos/, /api/projetos/, etc.
+    path('async/', include(async_urlpatterns)),
     path('', include(router.urls)), 
     
     # --- URL ALTERADA AQUI ---
     # Agora é um endpoint de nível superior
     path('lattes-keywords/', AllProfessorLattesKeywordsView.as_view(), name='all-lattes-keywords'),
+    path('keywords/<str:termo>/professores/', KeywordProfessoresView.as_view(), name='keyword-professores'),
+    path('desempenho/', DesempenhoAcademicoView.as_view(), name='desempenho'),
+    path('metricas/', MetricasView.as_view(), name='metricas'),
 ]
\ No newline at end of file
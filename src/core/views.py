@@ -1,9 +1,14 @@
 # src/core/views.py
 
+from django.conf import settings
 from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, filters, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 
 # Imports das Camadas de Serviço e Repositório
@@ -11,7 +16,32 @@ from . import services as core_services
 from . import repositories as core_repo
 
 # Imports dos Modelos (apenas para exceções)
-from .models import Professor, Aluno, Projeto, ProfessorLattes, HistAluno, Departamento
+from .models import (
+    Professor, Aluno, Projeto, ProfessorLattes, HistAluno, Departamento, Curso,
+    AlunoProj, Orientador, Assessor
+)
+
+# Paginação por cursor (keyset) das listagens
+from .pagination import AlunoPagination, ProfessorPagination, ProjetoPagination
+# Modo streaming (JSON/NDJSON) para listagens grandes
+from .streaming import StreamingListMixin
+# Requisições condicionais (ETag / Last-Modified)
+from .conditional import conditional_get
+# Filtros de projeto (EXISTS) e contagens por faceta
+from .filters import ProjetoFilterBackend, facet_counts
+# Caminho de leitura rápido (?fast=1) a partir de values_list()
+from .fast_read import FastReadListMixin, ALUNO_FAST_READ, PROFESSOR_FAST_READ, PROJETO_FAST_READ
+# Leituras GET em réplicas, com read-your-writes após escritas
+from .db_routers import ReplicaReadMixin, replica_stats
+# Métricas de conexões e do cache de consultas (por processo)
+from .pool import pool_stats
+from .query_cache import query_cache
+# Conflitos de concorrência que persistiram após as repetições
+from .transactions import ConflitoTransacao, retry_stats
+# Exportação de projetos em streaming (CSV/JSONL, gzip opcional)
+from .export import CONTENT_TYPES as EXPORT_CONTENT_TYPES, FORMATOS as EXPORT_FORMATOS, gzip_stream, iter_export
+# Importação em massa de alunos e professores (CSV/JSONL)
+from .roster import Rejeitos, formato_do_arquivo
 
 # Imports dos Serializers (Camada de Apresentação)
 from .serializers import (
@@ -24,13 +54,98 @@ from .serializers import (
     ProfessorLattesKeywordsSerializer
 )
 
-class ProfessorViewSet(viewsets.ModelViewSet):
+# Tabelas que compõem a representação de um projeto (ProjetoSerializer)
+PROJETO_TABLES = (Projeto, AlunoProj, Orientador, Assessor, Aluno, Professor)
+# Departamentos mudam raramente: o cliente pode reutilizar a resposta por 5 minutos
+REFERENCE_CACHE_CONTROL = {'public': True, 'max_age': 300}
+
+
+def conflict_response(e):
+    """ 503 com Retry-After: o conflito é transitório e o cliente pode repetir. """
+    return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+
+
+def _modelos_do_queryset(queryset):
+    """ Modelo do queryset e os trazidos por ``select_related`` (tabelas da resposta). """
+    modelos = [queryset.model]
+    relacoes = queryset.query.select_related
+    pendentes = [(queryset.model, relacoes)] if isinstance(relacoes, dict) else []
+    while pendentes:
+        modelo, campos = pendentes.pop()
+        for nome, filhos in campos.items():
+            relacionado = modelo._meta.get_field(nome).related_model
+            modelos.append(relacionado)
+            pendentes.append((relacionado, filhos))
+    return modelos
+
+
+class CachedListMixin:
+    """
+    Listagem a partir de uma lista já materializada pelo cache de consultas
+    (``get_cached_list``), mantendo a paginação da view.
+
+    Por padrão guarda o ``get_queryset()`` da view, versionado pelas tabelas
+    do modelo e das relações de ``select_related``; ``cached_models`` troca
+    essas tabelas quando a resposta depende de outras.
+    """
+    cached_models = None
+
+    def get_cached_list(self):
+        queryset = self.get_queryset()
+        modelos = self.cached_models or _modelos_do_queryset(queryset)
+        return query_cache.get_or_load(queryset.model._meta.model_name, queryset, *modelos)
+
+    def list(self, request, *args, **kwargs):
+        objetos = self.get_cached_list()
+        page = self.paginate_queryset(objetos)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(objetos, many=True).data)
+
+
+class RosterImportMixin:
+    """
+    Ação ``POST importar/`` (apenas admin): importa um roster CSV/JSONL
+    enviado no campo ``arquivo`` (multipart). O formato vem de ?formato= ou
+    da extensão do arquivo. A resposta traz as contagens e as primeiras
+    ``CORE_ROSTER_MAX_REJEITOS`` linhas rejeitadas.
+    """
+    roster_tipo = None
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return Response({'error': "Envie o roster no campo 'arquivo'."}, status=status.HTTP_400_BAD_REQUEST)
+        rejeitos = Rejeitos(guardar=getattr(settings, 'CORE_ROSTER_MAX_REJEITOS', 1000))
+        try:
+            formato = formato_do_arquivo(arquivo.name, request.query_params.get('formato'))
+            resumo = core_services.import_roster(self.roster_tipo, arquivo, formato, rejeitos)
+        except ValidationError as e:
+            return Response({'error': "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnicodeDecodeError:
+            return Response({'error': 'O roster deve estar em UTF-8.'}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
+        resumo['rejeitos'] = rejeitos.linhas
+        return Response(resumo)
+
+
+class ProfessorViewSet(RosterImportMixin, ReplicaReadMixin, FastReadListMixin, viewsets.ModelViewSet):
     """ ViewSet para Professores (público). """
+    # Só o Lattes do professor é lido da réplica
+    replica_reads = True
+    replica_actions = ('lattes',)
+    roster_tipo = 'professores'
     lookup_field = 'id_professor' # Define o nome do argumento da URL
+    fast_read_spec = PROFESSOR_FAST_READ
     queryset = core_repo.get_all_professors_with_dept()
     serializer_class = ProfessorSerializer
-    filter_backends = [filters.SearchFilter]
+    pagination_class = ProfessorPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['nome', 'email']
+    # Apenas colunas indexadas podem ser usadas em ?ordering=
+    ordering_fields = ['id_professor', 'nome', 'email']
 
     @action(detail=True, methods=['get'])
     # --- CORREÇÃO --- (pk=None -> id_professor=None)
@@ -44,6 +159,31 @@ class ProfessorViewSet(viewsets.ModelViewSet):
         except ProfessorLattes.DoesNotExist:
             return Response({'error': 'Informações Lattes não encontradas.'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=['get'])
+    def perfil(self, request, id_professor=None):
+        """ Retorna o perfil do professor (departamento, Lattes, keywords e carga ativa). """
+        try:
+            return Response(core_services.get_professor_profile(id_professor))
+        except ObjectDoesNotExist as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=False, methods=['get'])
+    def carga(self, request):
+        """
+        Carga (orientações e assessorias ativas) de vários professores.
+        Aceita ?departamento=, ?ordenar= e ?orientacoes_acima= / ?assessorias_acima=.
+        """
+        params = request.query_params
+        try:
+            return Response(core_services.get_professors_workload(
+                departamento=params.get('departamento'),
+                ordenar=params.get('ordenar'),
+                orientacoes_acima=params.get('orientacoes_acima'),
+                assessorias_acima=params.get('assessorias_acima'),
+            ))
+        except ValidationError as e:
+            return Response({'error': "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=['get'], url_path='contagem-projetos')
     # --- CORREÇÃO --- (pk=None -> id_professor=None)
     def contagem_projetos(self, request, id_professor=None):
@@ -58,67 +198,170 @@ class ProfessorViewSet(viewsets.ModelViewSet):
             return Response({'error': f'Ocorreu um erro: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class AlunoViewSet(viewsets.ModelViewSet):
+class AlunoViewSet(RosterImportMixin, ReplicaReadMixin, FastReadListMixin, viewsets.ModelViewSet):
     """ ViewSet para Alunos (público). """
+    replica_reads = True
+    roster_tipo = 'alunos'
     lookup_field = 'id_aluno' # Define o nome do argumento da URL
+    fast_read_spec = ALUNO_FAST_READ
     queryset = core_repo.get_all_alunos_with_curso()
     serializer_class = AlunoSerializer
-    filter_backends = [filters.SearchFilter]
+    pagination_class = AlunoPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['nome', 'email']
+    # Apenas colunas indexadas podem ser usadas em ?ordering=
+    ordering_fields = ['id_aluno', 'nome', 'email']
 
     @action(detail=True, methods=['get'])
     # --- CORREÇÃO --- (pk=None -> id_aluno=None)
     def historico(self, request, id_aluno=None):
         """ Retorna o histórico acadêmico para um aluno específico. """
         # --- CORREÇÃO --- (Usa o argumento id_aluno)
-        historico_list = core_repo.get_historico_by_aluno_id(id_aluno)
+        historico_list = core_repo.get_historico_by_aluno_id_cached(id_aluno)
         serializer = HistAlunoSerializer(historico_list, many=True)
         return Response(serializer.data)
 
 
-class ProjetoViewSet(viewsets.ModelViewSet):
+class ProjetoViewSet(ReplicaReadMixin, FastReadListMixin, StreamingListMixin, viewsets.ModelViewSet):
     """ ViewSet completo para Projetos (público). """
+    replica_reads = True
     lookup_field = 'id_proj' # Define o nome do argumento da URL
+    fast_read_spec = PROJETO_FAST_READ
     queryset = core_repo.get_all_projects_prefetched()
     serializer_class = ProjetoSerializer
+    pagination_class = ProjetoPagination
+    filter_backends = [ProjetoFilterBackend, filters.OrderingFilter]
+    # Apenas colunas indexadas podem ser usadas em ?ordering=
+    ordering_fields = ['id_proj', 'tema']
+
+    def get_requested_fields(self):
+        """
+        Campos pedidos via ?fields= / ?include= / ?exclude= (listas separadas
+        por vírgula). 'fields' define o conjunto base (padrão: todos),
+        'include' acrescenta campos a ele e 'exclude' remove. Nomes
+        desconhecidos são ignorados. Retorna None quando nada foi pedido.
+        """
+        params = self.request.query_params
+        if not any(params.get(p) for p in ('fields', 'include', 'exclude')):
+            return None
+
+        def parse(param):
+            return {nome.strip() for nome in params.get(param, '').split(',') if nome.strip()}
+
+        todos = set(ProjetoSerializer.Meta.fields)
+        campos = (parse('fields') & todos) if params.get('fields') else set(todos)
+        campos |= parse('include') & todos
+        campos -= parse('exclude')
+        return campos
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None and self.request.method == 'GET':
+            campos = self.get_requested_fields()
+            if campos is not None:
+                kwargs.setdefault('fields', campos)
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
-        # ... (O get_queryset não muda) ...
         queryset = super().get_queryset()
-        orientador_id = self.request.query_params.get('orientador_id')
-        if orientador_id:
-            try:
-                queryset = queryset.filter(orientadores__id_professor=int(orientador_id))
-            except ValueError: pass
-        assessor_id = self.request.query_params.get('assessor_id')
-        if assessor_id:
-            try:
-                queryset = queryset.filter(assessores__id_professor=int(assessor_id))
-            except ValueError: pass
-        pendencia_texto = self.request.query_params.get('pendencia')
-        if pendencia_texto:
-            try:
-                 status_valor = None
-                 for choice_val, choice_name in Projeto.StatusProjeto.choices:
-                     if pendencia_texto.lower() in choice_name.lower():
-                         status_valor = choice_val; break
-                 if status_valor is not None: queryset = queryset.filter(pendencia=status_valor)
-            except: pass
-        return queryset.distinct()
+        if self.request.method == 'GET':
+            campos = self.get_requested_fields()
+            if campos is not None:
+                queryset = core_repo.get_projects_projection(campos)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        facetas = request.query_params.get('facetas')
+        # Facetas só cabem nas respostas paginadas (objeto JSON), não no streaming
+        if facetas and isinstance(getattr(response, 'data', None), dict):
+            dimensoes = None if facetas.lower() in ('1', 'true', 'sim') else facetas.split(',')
+            queryset = self.filter_queryset(self.get_queryset())
+            response.data['facetas'] = facet_counts(queryset, dimensoes)
+        return response
+
+    @conditional_get(*PROJETO_TABLES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportação desnormalizada dos projetos em streaming (ver export.py).
+        Aceita ?formato=csv|jsonl, ?gzip=1 e os mesmos filtros da listagem.
+        """
+        params = request.query_params
+        formato = params.get('formato', 'csv')
+        if formato not in EXPORT_FORMATOS:
+            return Response({'error': "Formato deve ser 'csv' ou 'jsonl'."}, status=status.HTTP_400_BAD_REQUEST)
+        chunks = iter_export(params, formato)
+        nome, content_type = f'projetos.{formato}', EXPORT_CONTENT_TYPES[formato]
+        if params.get('gzip', '').lower() in ('1', 'true', 'sim'):
+            chunks, nome, content_type = gzip_stream(chunks), nome + '.gz', 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return response
 
     def create(self, request, *args, **kwargs):
         # ... (O create não muda) ...
         try:
             projeto = core_services.create_project_with_associations(request.data)
-            serializer = self.get_serializer(projeto)
+            serializer = self.get_serializer(projeto, participantes=projeto.participantes_em_memoria)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except (ObjectDoesNotExist, ValidationError, IntegrityError) as e:
              msg = getattr(e, 'message', str(e))
              if hasattr(e, 'messages'): msg = "; ".join(e.messages)
              return Response({'error': f'Erro: {msg}'}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
         except Exception as e:
             return Response({'error': f'Ocorreu um erro inesperado: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """ Cria vários projetos de uma vez (aceita ?dry_run=true para apenas validar). """
+        itens = request.data
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'sim')
+        if isinstance(itens, dict):
+            dry_run = dry_run or bool(itens.get('dry_run'))
+            itens = itens.get('projetos')
+        try:
+            sucesso, resultados = core_services.create_projects_bulk(itens, dry_run=dry_run)
+        except (ValidationError, IntegrityError) as e:
+            msg = "; ".join(e.messages) if hasattr(e, 'messages') else str(e)
+            return Response({'error': f'Erro: {msg}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not sucesso:
+            return Response({'criados': 0, 'resultados': resultados}, status=status.HTTP_400_BAD_REQUEST)
+        if dry_run:
+            return Response({'criados': 0, 'dry_run': True, 'resultados': resultados})
+        return Response({'criados': len(resultados), 'resultados': resultados}, status=status.HTTP_201_CREATED)
+
+    def _associar_em_lote(self, request, role):
+        pares = request.data.get('pares') if isinstance(request.data, dict) else request.data
+        try:
+            resultados = core_services.associate_participants_bulk(role, pares)
+        except ValidationError as e:
+            return Response({'error': "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
+        associados = sum(1 for r in resultados if r['status'] == 'associado')
+        return Response({'associados': associados, 'resultados': resultados})
+
+    @action(detail=False, methods=['post'], url_path='associar-alunos')
+    def associar_alunos(self, request):
+        """ Associa vários pares (id_proj, id_aluno) de uma vez. """
+        return self._associar_em_lote(request, 'aluno')
+
+    @action(detail=False, methods=['post'], url_path='associar-orientadores')
+    def associar_orientadores(self, request):
+        """ Associa vários pares (id_proj, id_professor) como orientadores. """
+        return self._associar_em_lote(request, 'orientador')
+
+    @action(detail=False, methods=['post'], url_path='associar-assessores')
+    def associar_assessores(self, request):
+        """ Associa vários pares (id_proj, id_professor) como assessores. """
+        return self._associar_em_lote(request, 'assessor')
+
     @action(detail=True, methods=['post'], url_path='associar-aluno')
     # --- CORREÇÃO --- (pk=None -> id_proj=None)
     def associar_aluno(self, request, id_proj=None):
@@ -132,6 +375,8 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             return Response({'status': 'Aluno associado.'})
         except (ValidationError, ObjectDoesNotExist) as e: 
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
 
     @action(detail=True, methods=['post'], url_path='associar-assessor')
     # --- CORREÇÃO --- (pk=None -> id_proj=None)
@@ -146,6 +391,8 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             return Response({'status': 'Assessor associado.'})
         except (ValidationError, ObjectDoesNotExist) as e: 
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
 
     @action(detail=True, methods=['post'], url_path='link-mongo')
     # --- CORREÇÃO --- (pk=None -> id_proj=None)
@@ -173,6 +420,17 @@ class ProjetoViewSet(viewsets.ModelViewSet):
         except Exception as e: 
             return Response({'error': f'Erro: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=True, methods=['get'], url_path='recomendar-assessores')
+    def recomendar_assessores(self, request, id_proj=None):
+        """ Sugere os ?k= (padrão 5) professores mais indicados para assessorar o projeto. """
+        try:
+            recomendados = core_services.recommend_assessores(id_proj, request.query_params.get('k'))
+            return Response({'id_proj': str(id_proj), 'recomendados': recomendados})
+        except ValidationError as e:
+            return Response({'error': "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        except ObjectDoesNotExist as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
     @action(detail=True, methods=['post'], url_path='associar-orientador')
     # --- CORREÇÃO --- (pk=None -> id_proj=None)
     def associar_orientador(self, request, id_proj=None):
@@ -187,6 +445,8 @@ class ProjetoViewSet(viewsets.ModelViewSet):
         except (ValidationError, ObjectDoesNotExist) as e:
             status_code = status.HTTP_404_NOT_FOUND if isinstance(e, ObjectDoesNotExist) else status.HTTP_400_BAD_REQUEST
             return Response({'error': str(e)}, status=status_code)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
 
     @action(detail=True, methods=['post'], url_path='desativar-participante')
     # --- CORREÇÃO --- (pk=None -> id_proj=None)
@@ -200,6 +460,8 @@ class ProjetoViewSet(viewsets.ModelViewSet):
         except (ValidationError, ObjectDoesNotExist) as e:
             status_code = status.HTTP_404_NOT_FOUND if isinstance(e, ObjectDoesNotExist) else status.HTTP_400_BAD_REQUEST
             return Response({'error': str(e)}, status=status_code)
+        except ConflitoTransacao as e:
+            return conflict_response(e)
         except Exception as e: 
             return Response({'error': f'Erro: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -220,28 +482,88 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             return Response({'error': f'Ocorreu um erro ao salvar: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class DepartamentoViewSet(viewsets.ReadOnlyModelViewSet):
+class DepartamentoViewSet(ReplicaReadMixin, CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """ ViewSet apenas para leitura de Departamentos. """
+    replica_reads = True
+    replica_actions = ('professores_keywords',)
     lookup_field = 'id_departamento' # Define o nome do argumento da URL
     queryset = core_repo.get_all_departments()
     serializer_class = DepartamentoSerializer
 
+    @conditional_get(Departamento, **REFERENCE_CACHE_CONTROL)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(Departamento, **REFERENCE_CACHE_CONTROL)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'], url_path='professores-keywords')
+    @conditional_get(ProfessorLattes, Professor)
     # --- CORREÇÃO --- (pk=None -> id_departamento=None)
     def professores_keywords(self, request, id_departamento=None):
         """ Retorna ID e keywords Lattes dos professores deste departamento. """
         # --- CORREÇÃO --- (Usa o argumento id_departamento)
-        lattes = core_repo.get_lattes_keywords_by_dept_id(id_departamento)
+        lattes = core_repo.get_lattes_keywords_by_dept_id_cached(id_departamento)
         serializer = ProfessorLattesKeywordsSerializer(lattes, many=True)
         return Response(serializer.data)
 
-class AllProfessorLattesKeywordsView(generics.ListAPIView):
+class AllProfessorLattesKeywordsView(ReplicaReadMixin, StreamingListMixin, CachedListMixin, generics.ListAPIView):
     """ Retorna uma lista contendo ID e keywords Lattes de TODOS os professores. """
+    replica_reads = True
     queryset = core_repo.get_all_lattes_keywords()
     serializer_class = ProfessorLattesKeywordsSerializer
+    # Lista do cache só sem streaming: o modo streaming continua lendo do banco com iterator()
+
+    @conditional_get(ProfessorLattes, Professor)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+class KeywordProfessoresView(generics.ListAPIView):
+    """ Professores que têm a palavra-chave no Lattes (sem diferenciar acentos/maiúsculas). """
+    serializer_class = ProfessorSerializer
+    pagination_class = ProfessorPagination
+
+    def get_queryset(self):
+        return core_repo.get_professors_by_keyword(self.kwargs['termo'])
+
+    @conditional_get(ProfessorLattes, Professor)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-class ProfessorLattesViewSet(viewsets.ModelViewSet):
+class ProfessorLattesViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ ViewSet para gerenciar as informações do Lattes dos professores. """
+    replica_reads = True
     queryset = core_repo.get_all_lattes()
     serializer_class = ProfessorLattesSerializer
-    lookup_field = 'professor' # Este já estava correto
\ No newline at end of file
+    lookup_field = 'professor' # Este já estava correto
+
+
+class DesempenhoAcademicoView(APIView):
+    """
+    Taxas de aprovação por disciplina, departamento e curso e os pontos
+    críticos de reprovação (ver desempenho.py). Aceita ?top= e ?min_tentativas=.
+    """
+
+    @conditional_get(HistAluno, Aluno, Curso, Departamento)
+    def get(self, request):
+        try:
+            return Response(core_services.get_academic_performance(
+                top=request.query_params.get('top'),
+                min_tentativas=request.query_params.get('min_tentativas'),
+            ))
+        except ValidationError as e:
+            return Response({'error': "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MetricasView(APIView):
+    """ Métricas deste processo: conexões, cache, réplicas e repetições de transação (apenas admin). """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'conexoes': pool_stats(),
+            'cache_consultas': query_cache.stats(),
+            'replicas': replica_stats(),
+            'transacoes': retry_stats(),
+        })
@@ -0,0 +1,1171 @@
+# tests/integration/test_integration_api.py
+
+import pytest
+
+# --- MODELOS E CLIENTES NÃO SÃO IMPORTADOS AQUI NO TOPO ---
+# (Mesmo motivo da suíte de serviços: evita RuntimeError durante a coleta)
+
+pytestmark = pytest.mark.django_db
+
+
+# --- Fixtures ---
+
+@pytest.fixture
+def api_client():
+    """ Cliente HTTP do DRF para chamar os endpoints da API. """
+    from rest_framework.test import APIClient
+    return APIClient()
+
+
+@pytest.fixture
+def setup_api_data():
+    """
+    Cria um departamento, um curso, um professor, um aluno e três projetos
+    para os testes de API.
+    """
+    from src.core.models import Professor, Aluno, Projeto, Departamento, Curso
+
+    dept = Departamento.objects.create(id_departamento=1, nome_departamento="Eng. de Computação")
+    curso = Curso.objects.create(id_curso=1, nome="Ciência da Computação", departamento=dept)
+    prof = Professor.objects.create(
+        id_professor=3937,
+        nome="Prof. API",
+        email="prof.api@teste.com",
+        departamento=dept
+    )
+    aluno = Aluno.objects.create(
+        id_aluno=221240849,
+        nome="Aluno API",
+        email="aluno.api@teste.com",
+        curso=curso,
+        telefone="123456789"
+    )
+    projetos = [
+        Projeto.objects.create(tema=f"Projeto {letra}", tipo=Projeto.TipoPesquisa.TCC, resumo="...", duracao=12)
+        for letra in ("C", "A", "B")
+    ]
+    return {"dept": dept, "curso": curso, "prof": prof, "aluno": aluno, "projetos": projetos}
+
+
+# --- Paginação por cursor ---
+
+def test_api_projetos_keyset_pagination(api_client, setup_api_data):
+    """
+    Teste de API 1: A listagem de projetos é paginada por cursor sobre id_proj
+    e o cursor 'next' continua exatamente de onde a página anterior parou.
+    """
+    # 1. ARRANGE
+    ids_esperados = sorted(str(p.id_proj) for p in setup_api_data['projetos'])
+
+    # 2. ACT
+    pagina1 = api_client.get('/api/projetos/', {'page_size': 2}).json()
+    pagina2 = api_client.get(pagina1['next']).json()
+
+    # 3. ASSERT
+    assert [p['id_proj'] for p in pagina1['results']] == ids_esperados[:2]
+    assert [p['id_proj'] for p in pagina2['results']] == ids_esperados[2:]
+    assert pagina2['next'] is None
+    assert 'total_estimado' not in pagina1
+
+
+def test_api_projetos_ordering_and_estimated_total(api_client, setup_api_data):
+    """
+    Teste de API 2: ?ordering= em coluna indexada e ?total=estimado.
+    """
+    # 2. ACT
+    resposta = api_client.get('/api/projetos/', {'ordering': 'tema', 'total': 'estimado'}).json()
+
+    # 3. ASSERT
+    assert [p['tema'] for p in resposta['results']] == ["Projeto A", "Projeto B", "Projeto C"]
+    assert resposta['total_estimado'] == 3
+
+
+def test_api_alunos_ordering_rejects_unindexed_column(api_client, setup_api_data):
+    """
+    Teste de API 3: Colunas fora de 'ordering_fields' são ignoradas e a
+    ordenação volta para a chave estável (id_aluno).
+    """
+    from src.core.models import Aluno
+
+    # 1. ARRANGE
+    Aluno.objects.create(
+        id_aluno=1, nome="Aluno Primeiro", email="primeiro@teste.com",
+        curso=setup_api_data['curso'], telefone="000"
+    )
+
+    # 2. ACT
+    resposta = api_client.get('/api/alunos/', {'ordering': 'telefone'}).json()
+
+    # 3. ASSERT
+    assert [a['id_aluno'] for a in resposta['results']] == ["1", "221240849"]
+
+
+# --- Listagem em streaming ---
+
+def test_api_projetos_stream_json_matches_serializer(api_client, setup_api_data):
+    """
+    Teste de API 4: ?stream=1 devolve um StreamingHttpResponse com todos os
+    projetos, sem paginação, no mesmo formato do ProjetoSerializer.
+    """
+    import json
+    from src.core.models import Projeto
+    from src.core.serializers import ProjetoSerializer
+
+    # 1. ARRANGE
+    esperado = ProjetoSerializer(Projeto.objects.order_by('id_proj'), many=True).data
+
+    # 2. ACT
+    resposta = api_client.get('/api/projetos/', {'stream': '1', 'ordering': 'id_proj'})
+    corpo = b''.join(resposta.streaming_content)
+
+    # 3. ASSERT
+    assert resposta.streaming
+    assert resposta['Content-Type'] == 'application/json'
+    assert json.loads(corpo) == json.loads(json.dumps(esperado))
+
+
+def test_api_lattes_keywords_stream_ndjson(api_client, setup_api_data):
+    """
+    Teste de API 5: 'Accept: application/x-ndjson' transmite uma linha JSON
+    por professor no endpoint de keywords Lattes.
+    """
+    import json
+    from src.core.models import ProfessorLattes
+
+    # 1. ARRANGE
+    ProfessorLattes.objects.create(
+        professor=setup_api_data['prof'], cod_lattes="123",
+        link="http://lattes.cnpq.br/123", palavras_chave="testes, software"
+    )
+
+    # 2. ACT
+    resposta = api_client.get('/api/lattes-keywords/', HTTP_ACCEPT='application/x-ndjson')
+    linhas = b''.join(resposta.streaming_content).decode().splitlines()
+
+    # 3. ASSERT
+    assert resposta['Content-Type'] == 'application/x-ndjson'
+    assert [json.loads(linha) for linha in linhas] == [
+        {'id_professor': '3937', 'palavras_chave': 'testes, software'}
+    ]
+
+
+# --- Requisições condicionais (ETag / Last-Modified) ---
+
+def test_api_projeto_detail_etag_returns_304(api_client, setup_api_data):
+    """
+    Teste de API 6: Com o ETag atual em If-None-Match, o detalhe do projeto
+    responde 304 sem corpo.
+    """
+    # 1. ARRANGE
+    projeto = setup_api_data['projetos'][0]
+    url = f'/api/projetos/{projeto.id_proj}/'
+    primeira = api_client.get(url)
+
+    # 2. ACT
+    segunda = api_client.get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+
+    # 3. ASSERT
+    assert primeira.status_code == 200
+    assert primeira['ETag'].startswith('"')
+    assert segunda.status_code == 304
+    assert segunda.content == b''
+    assert segunda['ETag'] == primeira['ETag']
+
+
+def test_api_projeto_detail_etag_changes_after_write(api_client, setup_api_data, django_capture_on_commit_callbacks):
+    """
+    Teste de API 7: Uma escrita em tabela envolvida (associação de aluno)
+    incrementa a versão e invalida o ETag anterior.
+    """
+    from src.core.models import AlunoProj
+
+    # 1. ARRANGE
+    projeto = setup_api_data['projetos'][0]
+    url = f'/api/projetos/{projeto.id_proj}/'
+    etag_antigo = api_client.get(url)['ETag']
+
+    # 2. ACT
+    with django_capture_on_commit_callbacks(execute=True):
+        AlunoProj.objects.create(aluno=setup_api_data['aluno'], projeto=projeto)
+    resposta = api_client.get(url, HTTP_IF_NONE_MATCH=etag_antigo)
+
+    # 3. ASSERT
+    assert resposta.status_code == 200
+    assert resposta['ETag'] != etag_antigo
+    assert resposta.json()['alunos_status'][0]['id_aluno'] == '221240849'
+    assert 'Last-Modified' in resposta
+
+
+def test_api_departamentos_cache_control_and_if_modified_since(api_client, setup_api_data, django_capture_on_commit_callbacks):
+    """
+    Teste de API 8: Departamentos (dados de referência) enviam Cache-Control
+    público e respeitam If-Modified-Since.
+    """
+    from src.core.models import Departamento
+
+    # 1. ARRANGE
+    with django_capture_on_commit_callbacks(execute=True):
+        Departamento.objects.create(id_departamento=2, nome_departamento="Matemática")
+    primeira = api_client.get('/api/departamentos/')
+
+    # 2. ACT
+    segunda = api_client.get('/api/departamentos/', HTTP_IF_MODIFIED_SINCE=primeira['Last-Modified'])
+
+    # 3. ASSERT
+    assert 'max-age=300' in primeira['Cache-Control']
+    assert 'public' in primeira['Cache-Control']
+    assert segunda.status_code == 304
+
+
+# --- Criação em lote ---
+
+def test_api_projetos_bulk_dry_run(api_client, setup_api_data):
+    """
+    Teste de API 9: POST /api/projetos/bulk/?dry_run=true valida o lote sem
+    gravar nada.
+    """
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    itens = [
+        {'tema': 'Lote 1', 'tipo': 2, 'resumo': '...', 'duracao': 12, 'id_professor': '3937'},
+        {'tema': 'Lote 2', 'tipo': 9, 'resumo': '...', 'duracao': 12},
+    ]
+
+    # 2. ACT
+    invalido = api_client.post('/api/projetos/bulk/?dry_run=true', itens, format='json')
+    valido = api_client.post('/api/projetos/bulk/?dry_run=true', itens[:1], format='json')
+
+    # 3. ASSERT
+    assert invalido.status_code == 400
+    assert 'tipo' in invalido.json()['resultados'][1]['erros']
+    assert valido.status_code == 200
+    assert valido.json()['resultados'][0]['status'] == 'valido'
+    assert Projeto.objects.count() == 3
+
+
+# --- Sparse fieldsets ---
+
+def test_api_projetos_sparse_fields_skips_prefetch(api_client, setup_api_data, django_assert_num_queries):
+    """
+    Teste de API 10: ?fields=id_proj,tema,pendencia devolve só esses campos
+    e a listagem é feita em uma única consulta (sem os prefetches).
+    """
+    # 2. ACT
+    with django_assert_num_queries(1):
+        resposta = api_client.get('/api/projetos/', {'fields': 'id_proj,tema,pendencia,inexistente'})
+
+    # 3. ASSERT
+    resultados = resposta.json()['results']
+    assert len(resultados) == 3
+    assert all(set(p) == {'id_proj', 'tema', 'pendencia'} for p in resultados)
+
+
+def test_api_projeto_detail_exclude_and_include(api_client, setup_api_data):
+    """
+    Teste de API 11: ?exclude= remove campos do conjunto completo e
+    ?include= acrescenta campos ao conjunto de ?fields=.
+    """
+    # 1. ARRANGE
+    url = f"/api/projetos/{setup_api_data['projetos'][0].id_proj}/"
+
+    # 2. ACT
+    sem_textos = api_client.get(url, {'exclude': 'resumo,melhor_corretor'}).json()
+    com_relacao = api_client.get(url, {'fields': 'id_proj', 'include': 'alunos_status'}).json()
+
+    # 3. ASSERT
+    assert 'resumo' not in sem_textos and 'melhor_corretor' not in sem_textos
+    assert 'orientadores_status' in sem_textos
+    assert com_relacao == {'id_proj': str(setup_api_data['projetos'][0].id_proj), 'alunos_status': []}
+
+
+# --- Caminho de leitura rápido (values_list) ---
+
+@pytest.mark.parametrize('url', [
+    '/api/professores/',
+    '/api/alunos/',
+    '/api/projetos/',
+    '/api/projetos/?fields=id_proj,tema,pendencia_display,alunos_status',
+])
+def test_api_fast_read_is_byte_identical(api_client, setup_api_data, url):
+    """
+    Teste de API 12: ?fast=1 produz exatamente os mesmos bytes que os
+    serializers (incluindo IDs como string, pendencia_display, listas
+    aninhadas e a omissão de 'departamento' quando o professor não tem um).
+    """
+    from src.core.models import (
+        Professor, ProfessorLattes, AlunoProj, Orientador, Assessor, Projeto
+    )
+
+    # 1. ARRANGE
+    prof = setup_api_data['prof']
+    sem_depto = Professor.objects.create(
+        id_professor=9007199254740993, nome="Prof. Sem Depto", email="sem@teste.com",
+        link_citations="http://citations"
+    )
+    ProfessorLattes.objects.create(professor=prof, cod_lattes="1", link="http://lattes.cnpq.br/1")
+    projeto = setup_api_data['projetos'][0]
+    projeto.bolsa = 'CNPQ'
+    projeto.mongo_id = "60d5ecf31234abcd1234efab"
+    projeto.pendencia = Projeto.StatusProjeto.APROVADO
+    projeto.melhor_corretor = "Prof. Çedilha"
+    projeto.save()
+    Orientador.objects.create(professor=prof, projeto=projeto)
+    Assessor.objects.create(professor=sem_depto, projeto=projeto, ativo=False)
+    AlunoProj.objects.create(aluno=setup_api_data['aluno'], projeto=projeto)
+
+    # 2. ACT
+    separador = '&' if '?' in url else '?'
+    normal = api_client.get(url)
+    rapido = api_client.get(f'{url}{separador}fast=1')
+
+    # 3. ASSERT
+    assert normal.status_code == rapido.status_code == 200
+    assert rapido.content == normal.content
+
+
+# --- Perfil e listagem de professores ---
+
+def test_api_professores_list_has_no_lattes_n_plus_one(api_client, setup_api_data, django_assert_num_queries):
+    """
+    Teste de API 13: A listagem de professores traz o Lattes na mesma
+    consulta (sem uma consulta extra por professor).
+    """
+    from src.core.models import Professor, ProfessorLattes
+
+    # 1. ARRANGE
+    for i in range(5):
+        professor = Professor.objects.create(id_professor=i + 1, nome=f"Prof {i}", email=f"p{i}@teste.com")
+        ProfessorLattes.objects.create(professor=professor, cod_lattes=str(i), link=f"http://lattes.cnpq.br/{i}")
+
+    # 2. ACT
+    with django_assert_num_queries(1):
+        resposta = api_client.get('/api/professores/')
+
+    # 3. ASSERT
+    links = [p['lattes_link'] for p in resposta.json()['results']]
+    assert links == [f"http://lattes.cnpq.br/{i}" for i in range(5)] + [None]
+
+
+def test_api_professor_perfil_not_found(api_client, setup_api_data):
+    """ Teste de API 14: Perfil de professor inexistente responde 404. """
+    # 2. ACT
+    resposta = api_client.get('/api/professores/999/perfil/')
+
+    # 3. ASSERT
+    assert resposta.status_code == 404
+    assert "999 não encontrado" in resposta.json()['error']
+
+
+# --- Filtros e facetas ---
+
+def test_api_projetos_filters_use_exists_without_duplicates(api_client, setup_api_data):
+    """
+    Teste de API 15: Filtros por participante, departamento, tipo e data
+    de início combinam corretamente e não duplicam projetos.
+    """
+    import datetime
+    from src.core.models import Orientador, Professor, Projeto
+
+    # 1. ARRANGE
+    prof = setup_api_data['prof']
+    outro = Professor.objects.create(id_professor=4000, nome="Prof. Outro", email="o@teste.com", departamento=prof.departamento)
+    p_c, p_a, p_b = setup_api_data['projetos']
+    Orientador.objects.create(professor=prof, projeto=p_a, datainicio=datetime.date(2024, 3, 1))
+    Orientador.objects.create(professor=outro, projeto=p_a, datainicio=datetime.date(2024, 3, 1))
+    Orientador.objects.create(professor=prof, projeto=p_b, datainicio=datetime.date(2023, 1, 10))
+    p_b.tipo = Projeto.TipoPesquisa.MESTRADO
+    p_b.save()
+
+    def ids(params):
+        return [p['id_proj'] for p in api_client.get('/api/projetos/', params).json()['results']]
+
+    # 2. ACT & 3. ASSERT
+    assert ids({'departamento_id': '1'}) == [str(p_a.id_proj), str(p_b.id_proj)]
+    assert ids({'orientador_id': '3937,4000'}) == [str(p_a.id_proj), str(p_b.id_proj)]
+    assert ids({'tipo': '3,4'}) == [str(p_b.id_proj)]
+    assert ids({'datainicio_de': '2024-01-01'}) == [str(p_a.id_proj)]
+    assert ids({'pendencia': 'coordenação', 'orientador_id': 'abc'}) == sorted(
+        str(p.id_proj) for p in setup_api_data['projetos']
+    )
+
+
+def test_api_projetos_facet_counts(api_client, setup_api_data):
+    """
+    Teste de API 16: ?facetas= devolve as contagens por dimensão do
+    resultado filtrado.
+    """
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    p_c, p_a, p_b = setup_api_data['projetos']
+    Projeto.objects.filter(pk=p_a.pk).update(bolsa='FEI', pendencia=Projeto.StatusProjeto.APROVADO)
+
+    # 2. ACT
+    resposta = api_client.get('/api/projetos/', {'facetas': 'bolsa,pendencia', 'tipo': '2'}).json()
+
+    # 3. ASSERT
+    assert set(resposta['facetas']) == {'bolsa', 'pendencia'}
+    assert resposta['facetas']['pendencia'] == [
+        {'valor': 1, 'rotulo': 'Esperando aprovação da Coordenação', 'total': 2},
+        {'valor': 4, 'rotulo': 'Aprovado', 'total': 1},
+    ]
+    assert {'valor': 'FEI', 'rotulo': 'FEI', 'total': 1} in resposta['facetas']['bolsa']
+
+
+# --- Busca textual ---
+
+def test_api_projetos_busca_textual_ignora_acentos_e_ordena_por_relevancia(api_client, setup_api_data):
+    """
+    Teste de API 17: ?q= casa variações de acento e de flexão (plural,
+    sufixos) e devolve primeiro o projeto em que o termo aparece no tema.
+    """
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    no_resumo = Projeto.objects.create(
+        tema="Sistemas distribuídos", tipo=Projeto.TipoPesquisa.TCC,
+        resumo="Armazenamento de informações em nuvem", duracao=12
+    )
+    no_tema = Projeto.objects.create(
+        tema="Recuperação de Informação", tipo=Projeto.TipoPesquisa.TCC,
+        resumo="Índices invertidos", palavra_chave="busca", duracao=12
+    )
+
+    # 2. ACT
+    resposta = api_client.get('/api/projetos/', {'q': 'informacao'}).json()
+    rapida = api_client.get('/api/projetos/', {'q': 'INFORMAÇÕES', 'fast': '1'}).json()
+    vazia = api_client.get('/api/projetos/', {'q': 'inexistente'}).json()
+
+    # 3. ASSERT
+    esperado = [str(no_tema.id_proj), str(no_resumo.id_proj)]
+    assert [p['id_proj'] for p in resposta['results']] == esperado
+    assert [p['id_proj'] for p in rapida['results']] == esperado
+    assert vazia['results'] == []
+
+
+def test_api_projetos_busca_textual_acompanha_escritas(api_client, setup_api_data):
+    """
+    Teste de API 18: O índice é atualizado quando o projeto é salvo,
+    editado ou removido.
+    """
+    # 1. ARRANGE
+    projeto = setup_api_data['projetos'][0]
+
+    def buscar(texto):
+        return [p['id_proj'] for p in api_client.get('/api/projetos/', {'q': texto}).json()['results']]
+
+    # 2. ACT / 3. ASSERT
+    assert buscar('robotica') == []
+
+    projeto.tema = "Robótica móvel"
+    projeto.save()
+    assert buscar('robotica movel') == [str(projeto.id_proj)]
+
+    projeto.delete()
+    assert buscar('robotica') == []
+
+
+# --- Recomendação de assessores ---
+
+def test_api_projeto_recomendar_assessores(api_client, setup_api_data, django_capture_on_commit_callbacks):
+    """
+    Teste de API 19: Os professores são ranqueados pela similaridade do
+    Lattes com o texto do projeto, sem incluir os orientadores do projeto.
+    """
+    from src.core.models import Professor, ProfessorLattes, Orientador
+
+    # 1. ARRANGE
+    dept = setup_api_data['dept']
+    projeto = setup_api_data['projetos'][0]
+    projeto.tema = "Aprendizado de máquina para visão computacional"
+    projeto.palavra_chave = "redes neurais, imagens"
+    projeto.save()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        perfis = {
+            1001: ("Prof. Visão", "Visão computacional, processamento de imagens", "Computação Gráfica"),
+            1002: ("Prof. Redes Neurais", "redes neurais, aprendizado de máquina", "Inteligência Artificial"),
+            1003: ("Prof. Banco", "bancos de dados, transações", "Sistemas de Informação"),
+            1004: ("Prof. Orientador", "visão computacional, redes neurais", "Inteligência Artificial"),
+        }
+        for id_professor, (nome, palavras, subarea) in perfis.items():
+            professor = Professor.objects.create(
+                id_professor=id_professor, nome=nome, email=f"{id_professor}@teste.com", departamento=dept
+            )
+            ProfessorLattes.objects.create(
+                professor=professor, cod_lattes=str(id_professor), palavras_chave=palavras, subarea=subarea
+            )
+        Orientador.objects.create(professor_id=1004, projeto=projeto)
+
+    url = f'/api/projetos/{projeto.id_proj}/recomendar-assessores/'
+
+    # 2. ACT
+    resposta = api_client.get(url, {'k': 2})
+    invalida = api_client.get(url, {'k': 'muitos'})
+    inexistente = api_client.get('/api/projetos/999999/recomendar-assessores/')
+
+    # 3. ASSERT
+    assert resposta.status_code == 200
+    recomendados = resposta.json()['recomendados']
+    assert [r['id_professor'] for r in recomendados] == ['1002', '1001']
+    assert recomendados[0]['score'] >= recomendados[1]['score'] > 0
+    assert invalida.status_code == 400
+    assert inexistente.status_code == 404
+
+
+# --- Palavras-chave normalizadas ---
+
+def test_api_keyword_professores_lookup(api_client, setup_api_data, django_assert_max_num_queries):
+    """
+    Teste de API 20: /api/keywords/{termo}/professores/ encontra os
+    professores pela palavra-chave normalizada, acompanhando edições do
+    Lattes, e o formato de /api/lattes-keywords/ não muda.
+    """
+    from src.core.models import ProfessorLattes, PalavraChave
+
+    # 1. ARRANGE
+    lattes = ProfessorLattes.objects.create(
+        professor=setup_api_data['prof'], cod_lattes='L1',
+        palavras_chave="Inteligência Artificial, Robótica,  robotica "
+    )
+
+    # 2. ACT
+    with django_assert_max_num_queries(3):
+        encontrados = api_client.get('/api/keywords/ROBÓTICA/professores/').json()['results']
+    lattes.palavras_chave = "Robótica"
+    lattes.save()
+    depois = api_client.get('/api/keywords/inteligencia artificial/professores/').json()['results']
+    formato = api_client.get('/api/lattes-keywords/').json()
+
+    # 3. ASSERT
+    assert [p['id_professor'] for p in encontrados] == ['3937']
+    assert depois == []
+    assert PalavraChave.objects.get(termo='robotica').rotulo == 'Robótica'
+    assert formato == [{'id_professor': '3937', 'palavras_chave': 'Robótica'}]
+
+
+# --- Carga dos professores ---
+
+def test_api_professores_carga_single_query(api_client, setup_api_data, django_assert_num_queries):
+    """
+    Teste de API 21: /api/professores/carga/ devolve as contagens ativas de
+    todos os professores do departamento em uma única consulta, com
+    ordenação e limite mínimo de orientações.
+    """
+    from src.core.models import Professor, Orientador, Assessor
+
+    # 1. ARRANGE
+    dept = setup_api_data['dept']
+    prof, (p_c, p_a, p_b) = setup_api_data['prof'], setup_api_data['projetos']
+    outro = Professor.objects.create(id_professor=4000, nome="Prof. Outro", email="outro@teste.com", departamento=dept)
+    Orientador.objects.create(professor=prof, projeto=p_c)
+    Orientador.objects.create(professor=prof, projeto=p_a)
+    Orientador.objects.create(professor=prof, projeto=p_b, ativo=False)
+    Assessor.objects.create(professor=prof, projeto=p_b)
+    Orientador.objects.create(professor=outro, projeto=p_b)
+
+    # 2. ACT
+    with django_assert_num_queries(1):
+        todos = api_client.get('/api/professores/carga/', {'departamento': 1, 'ordenar': '-orientacoes_ativas'}).json()
+    acima = api_client.get('/api/professores/carga/', {'orientacoes_acima': 1}).json()
+    invalido = api_client.get('/api/professores/carga/', {'ordenar': 'email'})
+
+    # 3. ASSERT
+    assert todos == [
+        {'id_professor': '3937', 'nome_professor': 'Prof. API', 'orientacoes_ativas': 2, 'assessorias_ativas': 1},
+        {'id_professor': '4000', 'nome_professor': 'Prof. Outro', 'orientacoes_ativas': 1, 'assessorias_ativas': 0},
+    ]
+    assert [p['id_professor'] for p in acima] == ['3937']
+    assert invalido.status_code == 400
+
+
+# --- Criação de projeto ---
+
+def test_api_create_projeto_returns_participants_and_is_atomic(api_client, setup_api_data, mocker):
+    """
+    Teste de API 22: POST /api/projetos/ devolve o projeto com orientador e
+    aluno (montados em memória, sem recarregar), e uma falha no meio da
+    criação não deixa projeto órfão.
+    """
+    from django.db import IntegrityError
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    payload = {
+        'tema': 'Projeto Atômico', 'tipo': 2, 'resumo': '...', 'duracao': 12,
+        'id_professor': 3937, 'id_aluno': 221240849,
+    }
+    total_antes = Projeto.objects.count()
+
+    # 2. ACT
+    criado = api_client.post('/api/projetos/', payload, format='json')
+    mocker.patch('src.core.repositories.create_alunoproj_assoc', side_effect=IntegrityError('falha simulada'))
+    falhou = api_client.post('/api/projetos/', dict(payload, tema='Projeto Órfão'), format='json')
+
+    # 3. ASSERT
+    assert criado.status_code == 201
+    corpo = criado.json()
+    assert corpo['orientadores_status'] == [{'id_professor': '3937', 'nome_professor': 'Prof. API', 'ativo': True}]
+    assert corpo['alunos_status'] == [{'id_aluno': '221240849', 'nome_aluno': 'Aluno API', 'ativo': True}]
+    assert corpo['assessores_status'] == []
+    assert corpo == api_client.get(f"/api/projetos/{corpo['id_proj']}/").json()
+    assert falhou.status_code == 400
+    assert Projeto.objects.count() == total_antes + 1
+    assert not Projeto.objects.filter(tema='Projeto Órfão').exists()
+
+
+def test_api_identity_map_is_request_scoped(api_client, setup_api_data, mocker):
+    """
+    Teste de API 23: O identity map é aberto no início da requisição e
+    descartado ao final dela.
+    """
+    from src.core import repositories as repo
+
+    # 1. ARRANGE
+    inicio = mocker.spy(repo, 'begin_identity_map')
+    fim = mocker.spy(repo, 'clear_identity_map')
+
+    # 2. ACT
+    resposta = api_client.get('/api/professores/3937/contagem-projetos/')
+
+    # 3. ASSERT
+    assert resposta.status_code == 200
+    assert inicio.call_count == 1 and fim.call_count == 1
+    assert repo._identity_map.get() is None
+
+
+# --- Leituras assíncronas (ASGI) ---
+
+def test_api_async_reads_match_sync_json(api_client, setup_api_data):
+    """
+    Teste de API 24: As rotas /api/async/ devolvem o mesmo JSON das rotas
+    síncronas equivalentes (detalhe de projeto, lattes, histórico e keywords).
+    """
+    from src.core.models import Orientador, ProfessorLattes, HistAluno
+
+    # 1. ARRANGE
+    prof, aluno = setup_api_data['prof'], setup_api_data['aluno']
+    projeto = setup_api_data['projetos'][0]
+    Orientador.objects.create(professor=prof, projeto=projeto)
+    ProfessorLattes.objects.create(professor=prof, cod_lattes="123", palavras_chave="Redes, Grafos")
+    HistAluno.objects.create(aluno=aluno, departamento=setup_api_data['dept'], cod_disciplina="CC8550", aprovado=True)
+
+    pares = [
+        (f'/api/projetos/{projeto.id_proj}/', f'/api/async/projetos/{projeto.id_proj}/'),
+        ('/api/professores/3937/lattes/', '/api/async/professores/3937/lattes/'),
+        (f'/api/alunos/{aluno.id_aluno}/historico/', f'/api/async/alunos/{aluno.id_aluno}/historico/'),
+        ('/api/departamentos/1/professores-keywords/', '/api/async/departamentos/1/professores-keywords/'),
+        ('/api/lattes-keywords/', '/api/async/lattes-keywords/'),
+    ]
+
+    for sincrona, assincrona in pares:
+        # 2. ACT
+        esperado = api_client.get(sincrona)
+        resposta = api_client.get(assincrona)
+
+        # 3. ASSERT
+        assert resposta.status_code == 200, assincrona
+        assert resposta.json() == esperado.json(), assincrona
+
+    assert api_client.get('/api/async/projetos/999999/').status_code == 404
+    assert api_client.get('/api/async/professores/1/lattes/').json() == {'error': 'Professor não encontrado.'}
+    assert api_client.post('/api/async/lattes-keywords/').status_code == 405
+
+
+def test_api_async_projetos_stream(api_client, setup_api_data):
+    """
+    Teste de API 25: /api/async/projetos/ transmite todos os projetos
+    filtrados, em array JSON ou NDJSON, na ordem de id_proj.
+    """
+    import json
+    from asgiref.sync import async_to_sync
+
+    async def ler(resposta):
+        return b''.join([parte async for parte in resposta.streaming_content]).decode()
+
+    # 1. ARRANGE
+    ids_esperados = sorted(p.id_proj for p in setup_api_data['projetos'])
+
+    # 2. ACT
+    resposta = api_client.get('/api/async/projetos/')
+    corpo = async_to_sync(ler)(resposta)
+    filtrada = api_client.get('/api/async/projetos/', {'q': 'projeto', 'format': 'ndjson'})
+    linhas = [json.loads(linha) for linha in async_to_sync(ler)(filtrada).splitlines()]
+
+    # 3. ASSERT
+    assert resposta.streaming
+    assert [int(p['id_proj']) for p in json.loads(corpo)] == ids_esperados
+    assert filtrada['Content-Type'] == 'application/x-ndjson'
+    assert sorted(int(p['id_proj']) for p in linhas) == ids_esperados
+
+
+# --- Conexões e métricas ---
+
+def test_api_metricas_connection_tracker(api_client, setup_api_data, mocker):
+    """
+    Teste de API 26: O checkout da conexão é registrado só quando a
+    requisição usa o banco (conexão nova ou primeira consulta) e liberado
+    no fim; /api/metricas/ (apenas admin) mostra checkouts, conexões em uso
+    e ociosas, espera e falhas ao obter a conexão.
+    """
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, connections
+    from src.core.pool import _PrimeiraConsulta, tracker
+
+    # 1. ARRANGE
+    tracker.reset()
+    admin = User.objects.create_superuser('admin', 'admin@teste.com', 'senha')
+    connection = connections['default']
+
+    # 2. ACT
+    # Requisição que não consulta o banco: nenhum checkout
+    negado = api_client.get('/api/metricas/')
+    sem_banco = tracker.stats()['default']['checkouts']
+    api_client.get('/api/departamentos/')
+    wrapper_apos_uso = _PrimeiraConsulta.de(connection)
+    # Falha ao conectar: a requisição termina com erro de banco antes de qualquer consulta
+    mocker.patch.object(connection, 'ensure_connection', side_effect=OperationalError('sem conexão'))
+    try:
+        api_client.get('/api/departamentos/')
+    except OperationalError:
+        pass
+    mocker.stopall()
+    api_client.force_authenticate(admin)
+    metricas = api_client.get('/api/metricas/').json()
+
+    # 3. ASSERT
+    assert negado.status_code in (401, 403)
+    assert sem_banco == 0
+    assert wrapper_apos_uso is None
+    conexoes = metricas['conexoes']['default']
+    # Só a primeira listagem usou o banco; as requisições de métricas não contam
+    assert conexoes['checkouts'] == 1
+    assert conexoes['em_uso'] == 0
+    assert conexoes['ociosas'] == 1
+    assert conexoes['falhas'] == 1
+    assert conexoes['espera_media_ms'] == 0.0
+    assert 'taxa_acerto' in metricas['cache_consultas']
+
+
+# --- Réplicas de leitura ---
+
+@pytest.fixture(scope='session')
+def replica_alias(django_db_setup, django_db_blocker, tmp_path_factory):
+    """
+    Segundo banco SQLite, migrado, para o ReplicaRouter. Fica registrado até
+    o fim da sessão (o alias precisa existir antes da fixture de banco do teste).
+    """
+    from django.core.management import call_command
+    from django.db import connections
+
+    alias = 'replica'
+    connections.settings[alias] = connections.configure_settings({
+        'default': connections.settings['default'],
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path_factory.mktemp('replica') / 'db.sqlite3')},
+    })[alias]
+    with django_db_blocker.unblock():
+        call_command('migrate', database=alias, verbosity=0)
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+@pytest.fixture
+def replica_db(replica_alias, settings):
+    settings.DATABASE_ROUTERS = ['src.core.db_routers.ReplicaRouter']
+    settings.CORE_DB_REPLICAS = [replica_alias]
+    return replica_alias
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_api_replica_reads_and_read_your_writes(api_client, setup_api_data, replica_db):
+    """
+    Teste de API 27: GETs de projetos e alunos leem da réplica; uma escrita
+    fixa o cliente no primário (cookie) e a leitura seguinte vê o que ele
+    escreveu. Views sem réplica (professores) continuam no primário.
+    """
+    from src.core.models import Projeto
+    from src.core.db_routers import PIN_COOKIE
+
+    # 1. ARRANGE
+    # Só a réplica tem este projeto; bulk_create não dispara os signals (que escrevem no primário)
+    Projeto.objects.using(replica_db).bulk_create([Projeto(tema="Só na réplica", tipo=Projeto.TipoPesquisa.TCC)])
+
+    # 2. ACT
+    da_replica = api_client.get('/api/projetos/').json()
+    professores = api_client.get('/api/professores/').json()
+    criado = api_client.post('/api/projetos/', {
+        'tema': 'Projeto Novo', 'tipo': 2, 'resumo': '...', 'duracao': 12,
+        'id_professor': 3937, 'id_aluno': 221240849,
+    }, format='json')
+    fixado = api_client.get('/api/projetos/').json()
+
+    # 3. ASSERT
+    assert [p['tema'] for p in da_replica['results']] == ["Só na réplica"]
+    assert [p['nome'] for p in professores['results']] == ["Prof. API"]
+    assert criado.status_code == 201
+    assert criado.cookies[PIN_COOKIE]['max-age'] == 5
+    assert sorted(p['tema'] for p in fixado['results']) == ["Projeto A", "Projeto B", "Projeto C", "Projeto Novo"]
+
+
+# --- Repetição de transações em conflito (40001) ---
+
+@pytest.mark.django_db(transaction=True)
+def test_api_retries_serialization_conflicts(api_client, setup_api_data, mocker):
+    """
+    Teste de API 28: Conflitos 40001 (injetados) são repetidos com backoff
+    e o POST termina com sucesso; se persistirem, a resposta é 503 com
+    Retry-After e nada é gravado.
+    """
+    from src.core.models import Projeto, AlunoProj
+    from src.core import transactions
+
+    # 1. ARRANGE
+    transactions.reset_retry_stats()
+    espera = mocker.patch('src.core.transactions.time.sleep')
+    payload = {
+        'tema': 'Projeto Concorrido', 'tipo': 2, 'resumo': '...', 'duracao': 12,
+        'id_professor': 3937, 'id_aluno': 221240849,
+    }
+
+    # 2. ACT
+    with transactions.injetar_conflitos(falhas=2) as injetor:
+        criado = api_client.post('/api/projetos/', payload, format='json')
+    with transactions.injetar_conflitos(falhas=100):
+        desativar = api_client.post(
+            f"/api/projetos/{criado.json()['id_proj']}/desativar-participante/", {'role': 'aluno'}, format='json'
+        )
+
+    # 3. ASSERT
+    assert criado.status_code == 201
+    assert injetor.injetadas == 2
+    assert Projeto.objects.filter(tema='Projeto Concorrido').count() == 1
+    assert desativar.status_code == 503
+    assert desativar['Retry-After'] == '1'
+    assert AlunoProj.objects.get(projeto_id=criado.json()['id_proj']).ativo is True
+    stats = transactions.retry_stats()
+    assert stats['sucessos_apos_repeticao'] == 1
+    assert stats['esgotadas'] == 1
+    assert stats['repeticoes'] == 2 + (transactions.DEFAULT_ATTEMPTS - 1)
+    assert espera.call_count == stats['repeticoes']
+
+
+# --- Importação em massa ---
+
+def test_api_import_roster_alunos(api_client, setup_api_data):
+    """
+    Teste de API 29: POST /api/alunos/importar/ (apenas admin) recebe um
+    roster CSV em multipart, grava as linhas válidas e devolve as contagens
+    com as linhas rejeitadas e o motivo.
+    """
+    from django.contrib.auth.models import User
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from src.core.models import Aluno
+
+    # 1. ARRANGE
+    conteudo = (
+        'id_aluno,nome,email,telefone,curso_id\n'
+        '221240849,Aluno Atualizado,aluno.api@teste.com,999,1\n'
+        '300,Aluno Novo,novo@teste.com,111,1\n'
+        '301,Aluno Sem Curso,sem.curso@teste.com,222,42\n'
+    ).encode()
+    admin = User.objects.create_superuser('admin', 'admin@teste.com', 'senha')
+
+    def enviar():
+        arquivo = SimpleUploadedFile('alunos.csv', conteudo, content_type='text/csv')
+        return api_client.post('/api/alunos/importar/', {'arquivo': arquivo}, format='multipart')
+
+    # 2. ACT
+    negado = enviar()
+    api_client.force_authenticate(admin)
+    response = enviar()
+    sem_arquivo = api_client.post('/api/alunos/importar/', {}, format='multipart')
+
+    # 3. ASSERT
+    assert negado.status_code in (401, 403)
+    assert response.status_code == 200
+    dados = response.json()
+    assert (dados['lidas'], dados['criados'], dados['atualizados'], dados['rejeitadas']) == (3, 1, 1, 1)
+    assert dados['rejeitos'][0]['linha'] == 4
+    assert list(dados['rejeitos'][0]['erros']) == ['curso_id']
+    assert Aluno.objects.get(pk=221240849).nome == 'Aluno Atualizado'
+    assert Aluno.objects.get(pk=300).curso_id == 1
+    assert sem_arquivo.status_code == 400
+
+
+# --- Exportação ---
+
+def test_api_exportar_projetos_csv_gzip(api_client, setup_api_data):
+    """
+    Teste de API 30: GET /api/projetos/exportar/ devolve um CSV
+    desnormalizado em streaming (um projeto por linha, com rótulos e
+    participantes), aceita os filtros da listagem e comprime com ?gzip=1.
+    """
+    import csv
+    import gzip
+    import io
+    from src.core.models import Orientador, Projeto
+
+    # 1. ARRANGE
+    projeto = setup_api_data['projetos'][0]
+    Orientador.objects.create(professor=setup_api_data['prof'], projeto=projeto)
+    Projeto.objects.filter(pk=projeto.pk).update(pendencia=Projeto.StatusProjeto.APROVADO)
+
+    # 2. ACT
+    response = api_client.get('/api/projetos/exportar/')
+    filtrado = api_client.get('/api/projetos/exportar/', {'pendencia': 'aprovado', 'formato': 'jsonl', 'gzip': 1})
+    invalido = api_client.get('/api/projetos/exportar/', {'formato': 'xml'})
+
+    # 3. ASSERT
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Disposition'] == 'attachment; filename="projetos.csv"'
+    linhas = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert len(linhas) == 3
+    por_id = {linha['id_proj']: linha for linha in linhas}
+    assert por_id[str(projeto.pk)]['orientadores'] == f"{setup_api_data['prof'].nome} (3937)"
+    assert por_id[str(projeto.pk)]['pendencia_display'] == 'Aprovado'
+
+    assert filtrado['Content-Type'] == 'application/gzip'
+    conteudo = gzip.decompress(b''.join(filtrado.streaming_content)).decode().splitlines()
+    assert len(conteudo) == 1
+    assert invalido.status_code == 400
+
+
+# --- Desempenho acadêmico ---
+
+def test_api_desempenho_academico(api_client, setup_api_data):
+    """
+    Teste de API 31: GET /api/desempenho/ devolve as taxas de aprovação
+    agregadas com ETag (304 na revalidação) e valida os parâmetros.
+    """
+    from src.core.models import HistAluno
+
+    # 1. ARRANGE
+    aluno = setup_api_data['aluno']
+    for aprovado in (True, True, False):
+        HistAluno.objects.create(aluno=aluno, departamento=setup_api_data['dept'], cod_disciplina='CC101', aprovado=aprovado)
+
+    # 2. ACT
+    response = api_client.get('/api/desempenho/')
+    revalidado = api_client.get('/api/desempenho/', HTTP_IF_NONE_MATCH=response['ETag'])
+    invalido = api_client.get('/api/desempenho/', {'top': 'muitos'})
+
+    # 3. ASSERT
+    assert response.status_code == 200
+    dados = response.json()
+    assert dados['por_disciplina'] == [
+        {'cod_disciplina': 'CC101', 'tentativas': 3, 'aprovados': 2, 'taxa_aprovacao': 0.6667}
+    ]
+    assert dados['por_curso'][0]['id_curso'] == str(setup_api_data['curso'].pk)
+    assert revalidado.status_code == 304
+    assert invalido.status_code == 400
+
+
+def test_api_projetos_busca_textual_pagina_todos_os_resultados(api_client, setup_api_data):
+    """
+    Teste de API 32: A busca não tem limite de resultados: a paginação por
+    cursor percorre todos os projetos que casam (inclusive com relevância
+    empatada) e as facetas contam todos eles.
+    """
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    for i in range(7):
+        Projeto.objects.create(
+            tema=f"Robótica {i}" if i % 2 else "Robótica", tipo=Projeto.TipoPesquisa.TCC, resumo="...", duracao=12
+        )
+
+    # 2. ACT
+    vistos = []
+    resposta = api_client.get('/api/projetos/', {'q': 'robotica', 'page_size': 3, 'facetas': 'tipo'}).json()
+    facetas = resposta['facetas']
+    while True:
+        vistos += [p['id_proj'] for p in resposta['results']]
+        if not resposta['next']:
+            break
+        resposta = api_client.get(resposta['next']).json()
+
+    # 3. ASSERT
+    assert len(vistos) == len(set(vistos)) == 7
+    assert facetas['tipo'] == [{'valor': 2, 'rotulo': 'Trabalho de Conclusão de Curso', 'total': 7}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_api_lattes_keywords_lista_do_cache(api_client, setup_api_data):
+    """
+    Teste de API 33: A listagem de keywords vem do cache de consultas,
+    versionado pelas tabelas do modelo e do select_related (ProfessorLattes
+    e Professor); uma escrita em qualquer delas invalida a lista.
+    """
+    from src.core.models import ProfessorLattes
+    from src.core.query_cache import query_cache
+
+    # 1. ARRANGE
+    query_cache.clear()
+    prof = setup_api_data['prof']
+    ProfessorLattes.objects.create(professor=prof, cod_lattes="1", link="http://lattes.cnpq.br/1", palavras_chave="redes")
+
+    try:
+        # 2. ACT
+        primeira = api_client.get('/api/lattes-keywords/').json()
+        segunda = api_client.get('/api/lattes-keywords/').json()
+        acertos = query_cache.stats()['acertos_locais']
+        prof.nome = "Outro Nome"
+        prof.save()
+        api_client.get('/api/lattes-keywords/')
+
+        # 3. ASSERT
+        assert segunda == primeira
+        assert [k['id_professor'] for k in primeira] == [str(prof.id_professor)]
+        assert acertos == 1
+        assert query_cache.stats()['faltas'] == 2
+    finally:
+        query_cache.clear()
+
+
+def test_api_projeto_patch_tipo_viola_regra_ic(api_client, setup_api_data):
+    """
+    Teste de API 34: Mudar o tipo para IC em um projeto com dois
+    orientadores ativos responde 400 com a mensagem da regra de IC (e não
+    500), sem alterar o projeto.
+    """
+    from src.core.models import Orientador, Professor, Projeto
+
+    # 1. ARRANGE
+    projeto = setup_api_data['projetos'][0]
+    outro = Professor.objects.create(id_professor=3938, nome="Prof. Dois", email="prof.dois@teste.com")
+    Orientador.objects.create(professor=setup_api_data['prof'], projeto=projeto)
+    Orientador.objects.create(professor=outro, projeto=projeto)
+
+    # 2. ACT
+    resposta = api_client.patch(f'/api/projetos/{projeto.id_proj}/', {'tipo': 1}, format='json')
+
+    # 3. ASSERT
+    assert resposta.status_code == 400
+    assert resposta.json() == {'tipo': [Orientador.IC_MENSAGEM]}
+    assert Projeto.objects.get(pk=projeto.pk).tipo == Projeto.TipoPesquisa.TCC
+
+
+def test_api_projetos_bulk_campos_omitidos_usam_default(api_client, setup_api_data):
+    """
+    Teste de API 35: Campos opcionais omitidos no lote (tipo, duracao,
+    resumo) ficam com o default do modelo, em vez de NULL recusado pelo banco.
+    """
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    itens = [{'tema': 'Só o tema'}, {'tema': 'Com tipo', 'tipo': 2, 'bolsa': 'FEI'}]
+
+    # 2. ACT
+    resposta = api_client.post('/api/projetos/bulk/', itens, format='json')
+
+    # 3. ASSERT
+    assert resposta.status_code == 201
+    criados = [Projeto.objects.get(pk=r['id_proj']) for r in resposta.json()['resultados']]
+    assert (criados[0].tipo, criados[0].duracao, criados[0].resumo) == (1, 12, '')
+    assert (criados[1].tipo, criados[1].bolsa) == (2, 'FEI')
+
+
+def test_api_create_projeto_busca_participantes_juntos(api_client, setup_api_data):
+    """
+    Teste de API 36: Criar um projeto busca orientador e aluno em uma única
+    consulta e a resposta sai das associações em memória (nenhum SELECT em
+    orientador/aluno_proj/assessores).
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # 1. ARRANGE
+    payload = {
+        'tema': 'Projeto Enxuto', 'tipo': 2, 'resumo': '...', 'duracao': 12,
+        'id_professor': 3937, 'id_aluno': 221240849,
+    }
+
+    # 2. ACT
+    with CaptureQueriesContext(connection) as consultas:
+        resposta = api_client.post('/api/projetos/', payload, format='json')
+
+    # 3. ASSERT
+    assert resposta.status_code == 201
+    selects = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('SELECT')]
+    pessoas = [sql for sql in selects if '"professores"' in sql or '"alunos"' in sql]
+    assert len(pessoas) == 1 and 'UNION' in pessoas[0]
+    assert not [sql for sql in selects if any(f'FROM "{t}"' in sql for t in ('orientador', 'aluno_proj', 'assessores'))]
+    assert resposta.json()['orientadores_status'] == [{'id_professor': '3937', 'nome_professor': 'Prof. API', 'ativo': True}]
+
+
+def test_api_projetos_busca_so_stopwords_nao_filtra(api_client, setup_api_data):
+    """
+    Teste de API 37: Uma busca que a normalização reduz a nada (só
+    stopwords) não filtra a listagem, no índice e no fallback icontains.
+    """
+    from django.db.models import Q
+    from src.core import search
+
+    # 1. ARRANGE
+    ids_esperados = sorted(str(p.id_proj) for p in setup_api_data['projetos'])
+
+    # 2. ACT
+    resposta = api_client.get('/api/projetos/', {'q': 'de'}).json()
+
+    # 3. ASSERT
+    assert sorted(p['id_proj'] for p in resposta['results']) == ids_esperados
+    assert search.fallback_filter('de da') == Q()
+
+
+def test_api_alunos_ordering_nome_repetido_entre_paginas(api_client, setup_api_data):
+    """
+    Teste de API 38: Com ?ordering= em coluna não única, a chave primária
+    desempata a ordem e o cursor percorre todos os registros uma única vez.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from src.core.models import Aluno
+
+    # 1. ARRANGE
+    for i in range(5):
+        Aluno.objects.create(
+            id_aluno=9500 + i, nome="Homônimo", email=f"h{i}@teste.com",
+            curso=setup_api_data['curso'], telefone="000"
+        )
+    esperados = sorted(Aluno.objects.values_list('id_aluno', flat=True))
+
+    # 2. ACT
+    vistos = []
+    url, params = '/api/alunos/', {'ordering': '-nome', 'page_size': 2}
+    with CaptureQueriesContext(connection) as consultas:
+        while url:
+            pagina = api_client.get(url, params).json()
+            vistos += [int(a['id_aluno']) for a in pagina['results']]
+            url, params = pagina['next'], None
+
+    # 3. ASSERT
+    assert sorted(vistos) == esperados
+    assert len(vistos) == len(set(vistos))
+    selects = [q['sql'] for q in consultas.captured_queries if 'FROM "alunos"' in q['sql']]
+    assert all('ORDER BY "alunos"."nome" DESC, "alunos"."id_aluno" ASC' in sql for sql in selects)
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_api_replica_reads_streaming(api_client, setup_api_data, replica_db):
+    """
+    Teste de API 39: As listagens em streaming (?stream=1 e NDJSON), lidas
+    depois da view, continuam roteadas para a réplica da requisição.
+    """
+    import json
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    Projeto.objects.using(replica_db).bulk_create([Projeto(tema="Só na réplica", tipo=Projeto.TipoPesquisa.TCC)])
+
+    # 2. ACT
+    array = api_client.get('/api/projetos/', {'stream': '1'})
+    ndjson = api_client.get('/api/projetos/', {'format': 'ndjson'})
+
+    # 3. ASSERT
+    assert [p['tema'] for p in json.loads(b''.join(array.streaming_content))] == ["Só na réplica"]
+    linhas = b''.join(ndjson.streaming_content).decode().splitlines()
+    assert [json.loads(linha)['tema'] for linha in linhas] == ["Só na réplica"]
@@ -485,4 +485,743 @@ def test_integration_fail_associate_second_aluno_to_ic(setup_database_data):
     
     # Garante que o segundo aluno não foi associado
     projeto_ic.refresh_from_db()
-    assert projeto_ic.alunos.count() == 1
\ No newline at end of file
+    assert projeto_ic.alunos.count() == 1
+def test_integration_create_projects_bulk(setup_database_data, django_assert_max_num_queries):
+    """
+    Teste de Integração 11: Cria vários projetos em lote com um número
+    constante de consultas (IN para professores/alunos + bulk_create +
+    indexação da busca textual).
+    """
+    # --- Imports ---
+    from src.core.services import create_projects_bulk
+    from src.core.models import Projeto, Orientador, AlunoProj
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    aluno = setup_database_data['aluno']
+    itens = [
+        {'tema': f'Projeto em Lote {i}', 'tipo': 2, 'resumo': '...', 'duracao': 12,
+         'id_professor': prof.id_professor, 'id_aluno': str(aluno.id_aluno) if i == 0 else None}
+        for i in range(20)
+    ]
+
+    # 2. ACT
+    with django_assert_max_num_queries(9):
+        sucesso, resultados = create_projects_bulk(itens)
+
+    # 3. ASSERT
+    assert sucesso is True
+    assert [r['status'] for r in resultados] == ['criado'] * 20
+    assert Projeto.objects.count() == 20
+    assert Orientador.objects.filter(professor=prof).count() == 20
+    assert AlunoProj.objects.get(aluno=aluno).projeto_id == int(resultados[0]['id_proj'])
+
+def test_integration_create_projects_bulk_rejects_whole_batch(setup_database_data):
+    """
+    Teste de Integração 12: Se um item referencia um professor inexistente,
+    nenhum projeto do lote é gravado e o erro aparece no item certo.
+    """
+    # --- Imports ---
+    from src.core.services import create_projects_bulk
+    from src.core.models import Projeto
+
+    # 1. ARRANGE
+    itens = [
+        {'tema': 'Válido', 'tipo': 2, 'resumo': '...', 'duracao': 12, 'id_professor': 3937},
+        {'tema': 'Inválido', 'tipo': 2, 'resumo': '...', 'duracao': 12, 'id_professor': 999},
+    ]
+
+    # 2. ACT
+    sucesso, resultados = create_projects_bulk(itens)
+
+    # 3. ASSERT
+    assert sucesso is False
+    assert resultados[0]['status'] == 'valido'
+    assert resultados[1]['status'] == 'erro'
+    assert "999 não encontrado" in resultados[1]['erros']['id_professor'][0]
+    assert Projeto.objects.count() == 0
+
+def test_integration_associate_participants_bulk(setup_database_data):
+    """
+    Teste de Integração 13: Associação em lote de assessores aplica as
+    regras por conjunto e informa o resultado de cada par.
+    """
+    # --- Imports ---
+    from src.core.services import associate_participants_bulk
+    from src.core.models import Projeto, Professor, Assessor
+
+    # 1. ARRANGE
+    orientador = setup_database_data['prof']
+    assessor = Professor.objects.create(
+        id_professor=3940, nome="Prof. Lote", email="prof.lote@teste.com",
+        departamento=orientador.departamento
+    )
+    outro = Professor.objects.create(
+        id_professor=3941, nome="Prof. Outro", email="prof.outro@teste.com",
+        departamento=orientador.departamento
+    )
+    ic = Projeto.objects.create(tema="IC", tipo=Projeto.TipoPesquisa.INICIACAO_CIENTIFICA, resumo="...", duracao=12)
+    tcc = Projeto.objects.create(tema="TCC", tipo=Projeto.TipoPesquisa.TCC, resumo="...", duracao=12)
+    tcc.orientadores.add(orientador)
+
+    pares = [
+        {'id_proj': tcc.id_proj, 'id_professor': assessor.id_professor},    # associado
+        {'id_proj': tcc.id_proj, 'id_professor': assessor.id_professor},    # repetido no lote
+        {'id_proj': tcc.id_proj, 'id_professor': orientador.id_professor},  # orientador != assessor
+        {'id_proj': ic.id_proj, 'id_professor': assessor.id_professor},     # associado (1º da IC)
+        {'id_proj': ic.id_proj, 'id_professor': outro.id_professor},        # IC já tem assessor ativo
+        {'id_proj': 999, 'id_professor': assessor.id_professor},            # projeto inexistente
+        {'id_proj': 'abc'},                                                  # par inválido
+    ]
+
+    # 2. ACT
+    resultados = associate_participants_bulk('assessor', pares)
+
+    # 3. ASSERT
+    assert [r['status'] for r in resultados] == [
+        'associado', 'ja_associado', 'erro', 'associado', 'erro', 'erro', 'erro'
+    ]
+    assert resultados[2]['mensagem'] == 'Orientador não pode ser assessor.'
+    assert "só podem ter um assessor ativo" in resultados[4]['mensagem']
+    assert "Projeto (ID 999) não encontrado" in resultados[5]['mensagem']
+    assert Assessor.objects.count() == 2
+
+def test_integration_get_professor_profile_single_query(setup_database_data, django_assert_num_queries):
+    """
+    Teste de Integração 14: O perfil do professor (departamento, Lattes,
+    keywords e contagens ativas) sai de uma única consulta.
+    """
+    # --- Imports ---
+    from src.core.services import get_professor_profile
+    from src.core.models import ProfessorLattes, Projeto, Orientador, Assessor
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    ProfessorLattes.objects.create(
+        professor=prof, cod_lattes="42", subarea="Engenharia de Software",
+        link="http://lattes.cnpq.br/42", palavras_chave="testes, qualidade ,, mutação"
+    )
+    for i in range(3):
+        projeto = Projeto.objects.create(tema=f"P{i}", tipo=Projeto.TipoPesquisa.TCC, resumo="...", duracao=12)
+        Orientador.objects.create(professor=prof, projeto=projeto, ativo=(i != 2))
+    Assessor.objects.create(professor=prof, projeto=projeto)
+
+    # 2. ACT
+    with django_assert_num_queries(1):
+        perfil = get_professor_profile(prof.id_professor)
+
+    # 3. ASSERT
+    assert perfil['departamento'] == {'id_departamento': '1', 'nome_departamento': 'Eng. de Computação'}
+    assert perfil['lattes_link'] == "http://lattes.cnpq.br/42"
+    assert perfil['palavras_chave'] == ['testes', 'qualidade', 'mutação']
+    assert perfil['orientacoes_ativas'] == 2
+    assert perfil['assessorias_ativas'] == 1
+
+
+def test_integration_sync_project_keywords(setup_database_data):
+    """
+    Teste de Integração 15: A palavra_chave do projeto vira ligações com o
+    vocabulário normalizado, reaproveitando termos e removendo os antigos.
+    """
+    from src.core.models import Projeto, ProjetoPalavraChave, PalavraChave
+
+    # 1. ARRANGE / 2. ACT
+    projeto = Projeto.objects.create(tema="Projeto", palavra_chave="Visão, Áudio")
+    outro = Projeto.objects.create(tema="Outro", palavra_chave="visao")
+    projeto.palavra_chave = "Visão; Computação"
+    projeto.save()
+
+    # 3. ASSERT
+    termos = set(ProjetoPalavraChave.objects.filter(projeto=projeto).values_list('palavra__termo', flat=True))
+    assert termos == {'visao', 'computacao'}
+    assert ProjetoPalavraChave.objects.filter(projeto=outro).get().palavra.termo == 'visao'
+    assert PalavraChave.objects.filter(termo='visao').count() == 1
+
+
+def test_integration_workload_counters_follow_writes(setup_database_data):
+    """
+    Teste de Integração 16: Os contadores de CargaProfessor acompanham
+    criação, desativação e remoção de associações, e o comando
+    recompute_workload corrige divergências.
+    """
+    from io import StringIO
+    from django.core.management import call_command
+    from src.core.models import Projeto, Orientador, Assessor, CargaProfessor
+    from src.core.services import deactivate_project_participant, get_professor_project_counts
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    projeto = Projeto.objects.create(tema="Carga", tipo=Projeto.TipoPesquisa.TCC)
+    outro = Projeto.objects.create(tema="Carga 2", tipo=Projeto.TipoPesquisa.TCC)
+
+    def carga():
+        counts = get_professor_project_counts(prof.id_professor)
+        return counts['orientacoes_ativas'], counts['assessorias_ativas']
+
+    # 2. ACT / 3. ASSERT
+    Orientador.objects.create(professor=prof, projeto=projeto)
+    assessoria = Assessor.objects.create(professor=prof, projeto=outro)
+    assert carga() == (1, 1)
+
+    deactivate_project_participant(projeto.id_proj, 'orientador')
+    assert carga() == (0, 1)
+
+    assessoria.delete()
+    assert carga() == (0, 0)
+
+    CargaProfessor.objects.filter(pk=prof.pk).update(orientacoes_ativas=7)
+    saida = StringIO()
+    call_command('recompute_workload', stdout=saida)
+    assert carga() == (0, 0)
+    assert '1 contadores corrigidos' in saida.getvalue()
+
+
+def test_integration_ic_rule_enforced_by_database(setup_database_data, django_assert_max_num_queries):
+    """
+    Teste de Integração 17: A regra "IC tem no máximo um participante ativo
+    por papel" é garantida pelo índice parcial: o save não consulta o
+    projeto, o INSERT em lote concorrente é recusado e mudar o tipo do
+    projeto para IC também respeita a regra.
+    """
+    import pytest
+    from django.core.exceptions import ValidationError
+    from src.core import repositories as repo
+    from src.core.models import Projeto, Aluno, AlunoProj
+
+    # 1. ARRANGE
+    aluno1 = setup_database_data['aluno']
+    aluno2 = Aluno.objects.create(
+        id_aluno=221240852, nome="Aluno IC", email="aluno.ic@teste.com", curso=aluno1.curso, telefone="1"
+    )
+    projeto_ic = Projeto.objects.create(tema="IC", tipo=Projeto.TipoPesquisa.INICIACAO_CIENTIFICA)
+    projeto_tcc = Projeto.objects.create(tema="TCC", tipo=Projeto.TipoPesquisa.TCC)
+
+    # 2. ACT / 3. ASSERT
+    # Projeto já carregado: nenhuma consulta de verificação (só o INSERT e o savepoint)
+    with django_assert_max_num_queries(3):
+        AlunoProj.objects.create(aluno=aluno1, projeto=projeto_ic)
+    with pytest.raises(ValidationError, match="só podem ter um aluno ativo"):
+        AlunoProj.objects.create(aluno=aluno2, projeto=projeto_ic)
+
+    # Caminho em lote sem a checagem prévia do serviço (requisição concorrente)
+    recusados = repo.bulk_create_participant_assocs(
+        'aluno', [(projeto_ic.id_proj, aluno2.id_aluno)], {projeto_ic.id_proj: projeto_ic.tipo}
+    )
+    assert recusados == {(projeto_ic.id_proj, aluno2.id_aluno)}
+
+    AlunoProj.objects.create(aluno=aluno1, projeto=projeto_tcc)
+    AlunoProj.objects.create(aluno=aluno2, projeto=projeto_tcc)
+    projeto_tcc.tipo = Projeto.TipoPesquisa.INICIACAO_CIENTIFICA
+    with pytest.raises(ValidationError, match="só podem ter um aluno ativo"):
+        projeto_tcc.save()
+    assert Projeto.objects.get(pk=projeto_tcc.pk).tipo == Projeto.TipoPesquisa.TCC
+    assert AlunoProj.objects.filter(projeto=projeto_ic, ativo=True).count() == 1
+
+
+def test_integration_identity_map_unit_of_work(setup_database_data, django_assert_num_queries):
+    """
+    Teste de Integração 18: Dentro de unit_of_work(), buscas repetidas por
+    chave primária devolvem a mesma instância sem nova consulta;
+    save_instance invalida a entrada e fora do bloco nada é guardado.
+    """
+    from src.core import repositories as repo
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+
+    # 2. ACT / 3. ASSERT
+    with repo.unit_of_work():
+        with django_assert_num_queries(1):
+            primeiro = repo.get_professor_by_id(prof.id_professor)
+            segundo = repo.get_professor_by_id(str(prof.id_professor))
+        assert primeiro is segundo
+
+        primeiro.nome = "Prof. Renomeado"
+        repo.save_instance(primeiro)
+        with django_assert_num_queries(1):
+            recarregado = repo.get_professor_by_id(prof.id_professor)
+        assert recarregado is not primeiro
+        assert recarregado.nome == "Prof. Renomeado"
+
+    with django_assert_num_queries(2):
+        repo.get_professor_by_id(prof.id_professor)
+        repo.get_professor_by_id(prof.id_professor)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_integration_query_cache_table_versions(setup_database_data, django_assert_num_queries):
+    """
+    Teste de Integração 19: As leituras em cache não vão ao banco enquanto
+    a tabela não muda; um INSERT confirmado incrementa a versão da tabela
+    e a próxima leitura já traz o registro novo.
+    """
+    from src.core import repositories as repo
+    from src.core.models import Departamento
+    from src.core.query_cache import query_cache
+
+    # 1. ARRANGE
+    query_cache.clear()
+    aluno = setup_database_data['aluno']
+
+    try:
+        # 2. ACT / 3. ASSERT
+        primeira = repo.get_all_departments_cached()
+        with django_assert_num_queries(0):
+            segunda = repo.get_all_departments_cached()
+            repo.get_all_departments_cached()
+        assert [d.nome_departamento for d in segunda] == [d.nome_departamento for d in primeira]
+
+        Departamento.objects.create(id_departamento=2, nome_departamento="Matemática")
+        atualizada = repo.get_all_departments_cached()
+        assert {d.id_departamento for d in atualizada} == {1, 2}
+
+        # Consultas diferentes (parâmetros diferentes) têm entradas próprias
+        assert repo.get_historico_by_aluno_id_cached(aluno.id_aluno) == []
+        assert repo.get_historico_by_aluno_id_cached(aluno.id_aluno + 1) == []
+
+        stats = query_cache.stats()
+        assert stats['faltas'] == 4
+        assert stats['acertos_locais'] == 2
+        assert stats['entradas'] == 4
+    finally:
+        query_cache.clear()
+
+
+def test_integration_query_cache_lru_and_pending_writes(setup_database_data, settings):
+    """
+    Teste de Integração 20: O LRU em memória respeita o tamanho máximo e,
+    dentro de uma transação que já escreveu (versão ainda não incrementada),
+    a leitura ignora o cache e vê as próprias escritas.
+    """
+    from src.core import repositories as repo
+    from src.core.models import Departamento
+    from src.core.query_cache import query_cache
+
+    # 1. ARRANGE
+    settings.CORE_QUERY_CACHE_MAX_ENTRIES = 2
+    query_cache.clear()
+
+    try:
+        # 2. ACT
+        # O teste roda dentro de uma transação e a fixture já escreveu
+        departamentos = repo.get_all_departments_cached()
+        Departamento.objects.create(id_departamento=3, nome_departamento="Física")
+        atualizados = repo.get_all_departments_cached()
+        for id_aluno in (1, 2, 3):
+            query_cache._guardar(f'teste:{id_aluno}', [])
+
+        # 3. ASSERT
+        assert len(atualizados) == len(departamentos) + 1
+        stats = query_cache.stats()
+        assert stats['ignoradas'] == 2
+        assert stats['faltas'] == 0
+        assert stats['entradas'] == 2
+        assert stats['remocoes'] == 1
+    finally:
+        query_cache.clear()
+
+
+def test_integration_configure_pooling_and_drain(mocker):
+    """
+    Teste de Integração 21: configure_pooling liga o pool do psycopg só
+    quando o backend suporta (senão usa conexões persistentes com health
+    check), o modo vem de CORE_DB_POOLING e drain() fecha as conexões abertas.
+    """
+    from types import SimpleNamespace
+    from django.db import connection
+    from src.core import pool
+
+    # 1. ARRANGE
+    databases = {
+        'default': {'ENGINE': 'django_cockroachdb', 'OPTIONS': {}},
+        'local': {'ENGINE': 'django.db.backends.sqlite3'},
+    }
+    mocker.patch.object(pool.importlib.util, 'find_spec', return_value=object())
+
+    # 2. ACT
+    pool.configure_pooling(databases, modo='pool', max_size=20)
+    desligado = pool.configure_pooling({'default': {'ENGINE': 'django.db.backends.sqlite3'}}, modo='desligado')
+    do_settings = {'ENGINE': 'django.db.backends.sqlite3'}
+    mocker.patch.object(pool, 'settings', SimpleNamespace(
+        DATABASES={'default': do_settings}, CORE_DB_POOL_OPTIONS={'max_age': 30}
+    ))
+    pool.configure_from_settings()
+    connection.ensure_connection()
+    fechar = mocker.patch.object(connection, 'close')
+    pool.drain()
+
+    # 3. ASSERT
+    assert databases['default']['CONN_MAX_AGE'] == 0
+    assert databases['default']['OPTIONS']['pool']['max_size'] == 20
+    assert databases['local']['CONN_MAX_AGE'] == pool.DEFAULT_MAX_AGE
+    assert 'OPTIONS' not in databases['local']
+    assert all(config['CONN_HEALTH_CHECKS'] for config in databases.values())
+    assert desligado['default'] == {
+        'ENGINE': 'django.db.backends.sqlite3', 'CONN_HEALTH_CHECKS': False, 'CONN_MAX_AGE': 0,
+    }
+    assert do_settings['CONN_MAX_AGE'] == 30 and do_settings['CONN_HEALTH_CHECKS']
+    fechar.assert_called_once()
+
+
+def test_integration_replica_router_decisions(settings):
+    """
+    Teste de Integração 22: O ReplicaRouter só usa a réplica dentro de
+    leitura_em_replica(), fixa no primário após uma escrita, e cada view
+    pode ser habilitada por ação ou por CORE_DB_REPLICA_VIEWS.
+    """
+    from types import SimpleNamespace
+    from src.core.db_routers import ReplicaRouter, leitura_em_replica
+    from src.core.models import Projeto
+    from src.core.views import DepartamentoViewSet, ProjetoViewSet
+
+    # 1. ARRANGE
+    settings.CORE_DB_REPLICAS = ['replica']
+    router = ReplicaRouter()
+    get, post = SimpleNamespace(method='GET'), SimpleNamespace(method='POST')
+
+    def view(classe, acao):
+        instancia = classe()
+        instancia.action = acao
+        return instancia
+
+    # 2. ACT / 3. ASSERT
+    assert router.db_for_read(Projeto) is None
+    with leitura_em_replica() as estado:
+        assert router.db_for_read(Projeto) == 'replica'
+        assert router.db_for_write(Projeto) == 'default'
+        assert router.db_for_read(Projeto) == 'default'
+        assert estado['escreveu'] and estado['fixado']
+    with leitura_em_replica(habilitada=False):
+        assert router.db_for_read(Projeto) == 'default'
+    assert router.allow_migrate('replica', 'core') is False
+
+    assert view(ProjetoViewSet, 'list').uses_replica(get)
+    assert not view(ProjetoViewSet, 'create').uses_replica(post)
+    assert view(DepartamentoViewSet, 'professores_keywords').uses_replica(get)
+    assert not view(DepartamentoViewSet, 'list').uses_replica(get)
+    settings.CORE_DB_REPLICA_VIEWS = {'ProjetoViewSet': False, 'DepartamentoViewSet.list': True}
+    assert not view(ProjetoViewSet, 'list').uses_replica(get)
+    assert view(DepartamentoViewSet, 'list').uses_replica(get)
+
+
+def test_integration_retry_transaction_savepoint_mode(setup_database_data, mocker):
+    """
+    Teste de Integração 23: No modo savepoint a repetição acontece dentro
+    da mesma transação (ROLLBACK TO SAVEPOINT); sem ele, uma chamada já
+    dentro de outra transação não repete e o erro 40001 sobe.
+    """
+    from django.db import transaction
+    from src.core import transactions
+    from src.core.services import associate_aluno_to_project
+    from src.core.models import AlunoProj, Projeto
+
+    # 1. ARRANGE
+    mocker.patch('src.core.transactions.time.sleep')
+    aluno = setup_database_data['aluno']
+    projeto = Projeto.objects.create(tema="Projeto Savepoint", tipo=Projeto.TipoPesquisa.TCC)
+
+    @transactions.retry_transaction(savepoint=False)
+    def interna():
+        AlunoProj.objects.create(aluno=aluno, projeto=projeto)
+
+    # 2. ACT / 3. ASSERT
+    transactions.reset_retry_stats()
+    with transactions.injetar_conflitos(falhas=1):
+        # Mesma função de serviço, com o decorator no modo savepoint
+        transactions.retry_transaction(savepoint=True)(associate_aluno_to_project.__wrapped__)(
+            projeto.id_proj, aluno.id_aluno
+        )
+    assert AlunoProj.objects.filter(projeto=projeto, aluno=aluno).count() == 1
+    assert transactions.retry_stats()['repeticoes_por_funcao'] == {'associate_aluno_to_project': 1}
+
+    with transaction.atomic(), transactions.injetar_conflitos(falhas=1):
+        with pytest.raises(transactions.ConflitoSimulado):
+            interna()
+    assert transactions.retry_stats()['repeticoes'] == 1
+
+    for tentativa in (1, 3, 10):
+        assert 0 <= transactions.backoff(tentativa, base=0.1, teto=0.5) <= min(0.5, 0.1 * 2 ** (tentativa - 1))
+
+
+def test_integration_import_roster_professores(setup_database_data, tmp_path):
+    """
+    Teste de Integração 24: A importação de professores insere e atualiza
+    em lote, resolve o departamento por ID ou nome, cria a CargaProfessor
+    dos novos e manda linhas inválidas (campos, e-mail já usado, JSON
+    quebrado) para os rejeitos, sem interromper o restante.
+    """
+    import io
+    import json
+    from src.core.services import import_roster
+    from src.core.roster import Rejeitos
+    from src.core.models import CargaProfessor, Professor
+
+    # 1. ARRANGE
+    linhas = [
+        {'id_professor': 3937, 'nome': 'Prof. Renomeado', 'email': 'prof.integracao@teste.com', 'departamento': 1},
+        {'id_professor': 5001, 'nome': 'Prof. Novo', 'email': 'novo@teste.com', 'departamento': 'eng. de computação'},
+        {'id_professor': 5002, 'nome': '', 'email': 'invalido', 'departamento': 99},
+        {'id_professor': 5003, 'nome': 'Prof. Repetido', 'email': 'novo@teste.com'},
+        {'id_professor': 5004, 'nome': 'Prof. Sem Depto', 'email': 'sem.depto@teste.com'},
+    ]
+    conteudo = '\n'.join(json.dumps(linha) for linha in linhas) + '\n{quebrado\n'
+    saida = io.StringIO()
+
+    # 2. ACT
+    resumo = import_roster('professores', io.BytesIO(conteudo.encode()), 'jsonl', Rejeitos(saida), lote=2)
+
+    # 3. ASSERT
+    assert resumo == {'lidas': 6, 'criados': 2, 'atualizados': 1, 'rejeitadas': 3}
+    assert Professor.objects.get(pk=3937).nome == 'Prof. Renomeado'
+    assert Professor.objects.get(pk=5001).departamento_id == 1
+    assert Professor.objects.get(pk=5004).departamento_id is None
+    assert set(CargaProfessor.objects.filter(professor_id__in=[5001, 5004]).values_list('professor_id', flat=True)) == {5001, 5004}
+
+    rejeitos = {r['linha']: r for r in map(json.loads, saida.getvalue().splitlines())}
+    assert set(rejeitos) == {3, 4, 6}
+    assert set(rejeitos[3]['erros']) == {'nome', 'email', 'departamento'}
+    assert list(rejeitos[4]['erros']) == ['email']
+    assert rejeitos[6]['erros'] == {'non_field_errors': ['JSON inválido.']}
+
+
+def test_integration_export_projects_chunks(setup_database_data, tmp_path, django_assert_num_queries):
+    """
+    Teste de Integração 25: A exportação lê os projetos em blocos, com uma
+    consulta por papel para os participantes de cada bloco (quantidade de
+    consultas independente do número de participantes), e o comando grava
+    o arquivo comprimido quando a saída termina em .gz.
+    """
+    import gzip
+    import io
+    import json
+    from django.core.management import call_command
+    from src.core import export
+    from src.core.models import AlunoProj, Orientador, Projeto
+
+    # 1. ARRANGE
+    prof, aluno = setup_database_data['prof'], setup_database_data['aluno']
+    projetos = [
+        Projeto.objects.create(tema=f"Export {i}", tipo=Projeto.TipoPesquisa.TCC, bolsa='FEI' if i else None)
+        for i in range(3)
+    ]
+    Orientador.objects.create(professor=prof, projeto=projetos[0])
+    AlunoProj.objects.create(aluno=aluno, projeto=projetos[0], ativo=False)
+    saida = tmp_path / 'projetos.jsonl.gz'
+
+    # 2. ACT
+    # 1 consulta dos projetos + 2 blocos x 3 papéis
+    with django_assert_num_queries(7):
+        linhas = list(export.iter_rows(export.filtered_projects({}), chunk_size=2))
+    call_command('export_projects', formato='jsonl', saida=str(saida), bolsa='fei', stdout=io.StringIO())
+
+    # 3. ASSERT
+    assert [linha['tema'] for linha in linhas] == ['Export 0', 'Export 1', 'Export 2']
+    assert linhas[0]['orientadores'] == [{'id': '3937', 'nome': 'Prof. Integração', 'ativo': True}]
+    assert linhas[0]['alunos'][0]['ativo'] is False
+    assert linhas[0]['tipo_display'] == 'Trabalho de Conclusão de Curso'
+    assert linhas[1]['assessores'] == []
+
+    exportadas = [json.loads(linha) for linha in gzip.decompress(saida.read_bytes()).decode().splitlines()]
+    assert [linha['tema'] for linha in exportadas] == ['Export 1', 'Export 2']
+
+
+def test_integration_academic_performance_vectorized(setup_database_data, django_capture_on_commit_callbacks):
+    """
+    Teste de Integração 26: As taxas calculadas com NumPy batem com uma
+    contagem simples em Python; o agregado é reaproveitado enquanto o
+    histórico não muda e recalculado depois de uma escrita em HistAluno.
+    """
+    from src.core import desempenho
+    from src.core.services import get_academic_performance
+    from src.core.models import Aluno, Curso, Departamento, HistAluno
+
+    # 1. ARRANGE
+    aluno = setup_database_data['aluno']
+    dept = Departamento.objects.get(pk=1)
+    outro_dept = Departamento.objects.create(id_departamento=2, nome_departamento="Matemática")
+    outro_curso = Curso.objects.create(id_curso=2, nome="Matemática", departamento=outro_dept)
+    colega = Aluno.objects.create(
+        id_aluno=5, nome="Colega", email="colega@teste.com", curso=outro_curso, telefone="1"
+    )
+    registros = [
+        (aluno, dept, 'CC101', True), (aluno, dept, 'CC101', False), (aluno, dept, 'CC102', False),
+        (colega, outro_dept, 'CC101', False), (colega, outro_dept, 'MA201', True), (colega, outro_dept, 'CC101', False),
+    ]
+    HistAluno.objects.bulk_create([
+        HistAluno(aluno=a, departamento=d, cod_disciplina=c, aprovado=ok) for a, d, c, ok in registros
+    ])
+    desempenho._cache.update(versao=None, agregado=None)
+
+    # 2. ACT
+    relatorio = get_academic_performance(top=5, min_tentativas=2)
+    agregado = desempenho.get_agregado()
+    with django_capture_on_commit_callbacks(execute=True):
+        HistAluno.objects.create(aluno=aluno, departamento=dept, cod_disciplina='CC102', aprovado=True)
+    atualizado = get_academic_performance(min_tentativas=1)
+
+    # 3. ASSERT
+    esperado = {}
+    for _, _, codigo, ok in registros:
+        tentativas, aprovados = esperado.get(codigo, (0, 0))
+        esperado[codigo] = (tentativas + 1, aprovados + ok)
+    assert {
+        d['cod_disciplina']: (d['tentativas'], d['aprovados']) for d in relatorio['por_disciplina']
+    } == esperado
+    assert relatorio['total'] == 6 and relatorio['taxa_aprovacao'] == round(2 / 6, 4)
+    assert [(d['nome_departamento'], d['tentativas']) for d in relatorio['por_departamento']] == [
+        ("Eng. de Computação", 3), ("Matemática", 3)
+    ]
+    assert relatorio['por_curso'][1] == {
+        'id_curso': '2', 'nome': "Matemática", 'tentativas': 3, 'aprovados': 1, 'taxa_aprovacao': 0.3333
+    }
+    # CC101/Matemática: 2 reprovações em 2; CC101/Computação: 1 em 2 (CC102 tem só 1 tentativa)
+    assert [(p['cod_disciplina'], p['id_curso'], p['reprovacoes']) for p in relatorio['pontos_criticos']] == [
+        ('CC101', '2', 2), ('CC101', '1', 1)
+    ]
+
+    assert desempenho.get_agregado() is not agregado
+    assert atualizado['total'] == 7
+    assert ('CC102', '1', 1) in [(p['cod_disciplina'], p['id_curso'], p['reprovacoes']) for p in atualizado['pontos_criticos']]
+
+
+def test_integration_duplicate_participant_not_reported_as_ic_rule(setup_database_data):
+    """
+    Teste de Integração 27: Repetir o mesmo par (pessoa, projeto) em um
+    projeto que não é de IC viola o unique_together e não deve ser
+    confundido com a regra de IC (no SQLite as duas mensagens citam id_proj).
+    """
+    import pytest
+    from django.db import IntegrityError
+    from src.core.models import Assessor, AlunoProj, Orientador, Projeto
+
+    # 1. ARRANGE
+    aluno, prof = setup_database_data['aluno'], setup_database_data['prof']
+    projeto = Projeto.objects.create(tema="TCC Duplicado", tipo=Projeto.TipoPesquisa.TCC)
+    AlunoProj.objects.create(aluno=aluno, projeto=projeto)
+    Orientador.objects.create(professor=prof, projeto=projeto)
+    Assessor.objects.create(professor=prof, projeto=projeto)
+
+    # 2. ACT / 3. ASSERT
+    with pytest.raises(IntegrityError):
+        AlunoProj.objects.create(aluno=aluno, projeto=projeto)
+    with pytest.raises(IntegrityError):
+        Orientador.objects.create(professor=prof, projeto=projeto)
+    with pytest.raises(IntegrityError):
+        Assessor.objects.create(professor=prof, projeto=projeto)
+
+
+def test_integration_bulk_participants_atomic_with_workload(setup_database_data, mocker):
+    """
+    Teste de Integração 28: Se a atualização dos contadores falha depois do
+    INSERT em lote, as associações também são desfeitas (CargaProfessor
+    não fica divergente).
+    """
+    import pytest
+    from django.db import OperationalError
+    from src.core import repositories as repo
+    from src.core.models import Orientador, Projeto
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    projeto = Projeto.objects.create(tema="Lote Atômico", tipo=Projeto.TipoPesquisa.TCC)
+    mocker.patch('src.core.repositories.adjust_workload', side_effect=OperationalError('falha no contador'))
+
+    # 2. ACT
+    with pytest.raises(OperationalError):
+        repo.bulk_create_participant_assocs(
+            'orientador', [(projeto.id_proj, prof.id_professor)], {projeto.id_proj: projeto.tipo}
+        )
+
+    # 3. ASSERT
+    assert not Orientador.objects.filter(projeto=projeto).exists()
+
+
+def test_integration_associate_participants_bulk_retried(setup_database_data, mocker):
+    """
+    Teste de Integração 29: A associação em lote roda em uma transação
+    repetida em conflitos 40001: depois do conflito o lote inteiro é
+    refeito e gravado uma única vez.
+    """
+    from src.core import transactions
+    from src.core.services import associate_participants_bulk
+    from src.core.models import Assessor, Projeto
+
+    # 1. ARRANGE
+    mocker.patch('src.core.transactions.time.sleep')
+    prof = setup_database_data['prof']
+    projetos = [Projeto.objects.create(tema=f"Lote {i}", tipo=Projeto.TipoPesquisa.TCC) for i in range(2)]
+    pares = [{'id_proj': p.id_proj, 'id_professor': prof.id_professor} for p in projetos]
+    transactions.reset_retry_stats()
+
+    # 2. ACT
+    with transactions.injetar_conflitos(falhas=1):
+        resultados = transactions.retry_transaction(savepoint=True)(associate_participants_bulk.__wrapped__)(
+            'assessor', pares
+        )
+
+    # 3. ASSERT
+    assert [r['status'] for r in resultados] == ['associado', 'associado']
+    assert Assessor.objects.filter(professor=prof).count() == 2
+    assert transactions.retry_stats()['repeticoes'] == 1
+
+
+def test_integration_tipo_projeto_sincronizado_no_banco(setup_database_data):
+    """
+    Teste de Integração 30: A cópia tipo_projeto é mantida pelo banco:
+    QuerySet.update() e bulk_update() do tipo e add() de M2M (que não
+    chamam save()) continuam sujeitos à regra de IC.
+    """
+    import pytest
+    from django.db import IntegrityError, transaction
+    from src.core.models import Orientador, Professor, Projeto
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    outro = Professor.objects.create(id_professor=3940, nome="Prof. Gatilho", email="gatilho@teste.com")
+    ic = Projeto.TipoPesquisa.INICIACAO_CIENTIFICA
+    dois_ativos = Projeto.objects.create(tema="Dois orientadores", tipo=Projeto.TipoPesquisa.TCC)
+    Orientador.objects.create(professor=prof, projeto=dois_ativos)
+    Orientador.objects.create(professor=outro, projeto=dois_ativos)
+    um_ativo = Projeto.objects.create(tema="Um orientador", tipo=Projeto.TipoPesquisa.TCC)
+    Orientador.objects.create(professor=prof, projeto=um_ativo)
+
+    # 2. ACT / 3. ASSERT
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Projeto.objects.filter(pk=dois_ativos.pk).update(tipo=ic)
+    dois_ativos.tipo = ic
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Projeto.objects.bulk_update([dois_ativos], ['tipo'])
+
+    Projeto.objects.filter(pk=um_ativo.pk).update(tipo=ic)
+    assert Orientador.objects.get(projeto=um_ativo).tipo_projeto == ic
+    with pytest.raises(IntegrityError), transaction.atomic():
+        um_ativo.orientadores.add(outro)
+    assert Orientador.objects.filter(projeto=dois_ativos, tipo_projeto=Projeto.TipoPesquisa.TCC).count() == 2
+
+
+def test_integration_search_relevance_follows_query_alias(setup_database_data):
+    """
+    Teste de Integração 31: A relevância da busca referencia a tabela pelo
+    alias da consulta, então a busca funciona dentro de uma subconsulta.
+    """
+    from django.db.models import OuterRef, Subquery
+    from src.core import repositories as repo
+    from src.core.models import Orientador, Projeto
+
+    # 1. ARRANGE
+    prof = setup_database_data['prof']
+    robotica = Projeto.objects.create(tema="Robótica educacional", tipo=Projeto.TipoPesquisa.TCC)
+    outro = Projeto.objects.create(tema="Compiladores", tipo=Projeto.TipoPesquisa.TCC)
+    Orientador.objects.create(professor=prof, projeto=robotica)
+    Orientador.objects.create(professor=prof, projeto=outro)
+
+    # 2. ACT
+    busca = repo.search_projects(Projeto.objects.filter(pk=OuterRef('projeto_id')), 'robotica')
+    orientacoes = Orientador.objects.filter(projeto__in=[robotica, outro]).annotate(
+        relevancia=Subquery(busca.values('relevancia')[:1])
+    )
+
+    # 3. ASSERT
+    relevancias = {o.projeto_id: o.relevancia for o in orientacoes}
+    assert relevancias[robotica.pk] is not None
+    assert relevancias[outro.pk] is None
@@ -16,21 +16,16 @@ def test_get_professor_project_counts_success(mocker):
     from src.core.services import get_professor_project_counts # <-- IMPORT AQUI
     
     # 1. ARRANGE
-    fake_professor = mocker.MagicMock(id_professor=3937, nome="Prof. Teste")
+    fake_professor = mocker.MagicMock(
+        id_professor=3937, nome="Prof. Teste", orientacoes_ativas=5, assessorias_ativas=2
+    )
     
     # --- CAMINHO DO PATCH CORRIGIDO ---
+    # As contagens vêm dos contadores persistidos, lidos junto com o professor
     mocker.patch(
-        'src.core.repositories.get_professor_by_id', # <-- MUDANÇA AQUI
+        'src.core.repositories.get_professor_with_workload', # <-- MUDANÇA AQUI
         return_value=fake_professor
     )
-    mocker.patch(
-        'src.core.repositories.get_active_orientador_count', # <-- MUDANÇA AQUI
-        return_value=5
-    )
-    mocker.patch(
-        'src.core.repositories.get_active_assessor_count', # <-- MUDANÇA AQUI
-        return_value=2
-    )
 
     # 2. ACT
     result = get_professor_project_counts(professor_id=3937)
@@ -50,7 +45,7 @@ def test_get_professor_project_counts_not_found(mocker):
     # 1. ARRANGE
     # --- CAMINHO DO PATCH CORRIGIDO ---
     mocker.patch(
-        'src.core.repositories.get_professor_by_id', # <-- MUDANÇA AQUI
+        'src.core.repositories.get_professor_with_workload', # <-- MUDANÇA AQUI
         side_effect=ObjectDoesNotExist("Professor não encontrado")
     )
 
@@ -63,6 +58,7 @@ def test_get_professor_project_counts_not_found(mocker):
 
 # --- Testes para create_project_with_associations ---
 
+@pytest.mark.django_db # transaction.atomic abre uma transação real
 def test_create_project_with_associations_existing_users(mocker):
     """
     Caso de Teste 3 (Caminho Feliz): 
@@ -82,8 +78,10 @@ def test_create_project_with_associations_existing_users(mocker):
     fake_project = mocker.MagicMock() 
     
     # --- CAMINHOS DO PATCH CORRIGIDOS ---
-    mock_get_prof = mocker.patch('src.core.repositories.get_professor_by_id', return_value=fake_professor) # <-- MUDANÇA AQUI
-    mock_get_aluno = mocker.patch('src.core.repositories.get_aluno_by_id', return_value=fake_aluno) # <-- MUDANÇA AQUI
+    # Orientador e aluno vêm juntos, em uma única consulta
+    mock_get_ambos = mocker.patch(
+        'src.core.repositories.get_professor_and_aluno', return_value=(fake_professor, fake_aluno)
+    )
     mock_create_proj = mocker.patch('src.core.repositories.create_project', return_value=fake_project) # <-- MUDANÇA AQUI
     mock_create_orient = mocker.patch('src.core.repositories.create_orientador_assoc') # <-- MUDANÇA AQUI
     mock_create_alunoproj = mocker.patch('src.core.repositories.create_alunoproj_assoc') # <-- MUDANÇA AQUI
@@ -92,15 +90,16 @@ def test_create_project_with_associations_existing_users(mocker):
     result = create_project_with_associations(fake_data)
 
     # 3. ASSERT
-    mock_get_prof.assert_called_once_with(101)
-    mock_get_aluno.assert_called_once_with(202)
+    mock_get_ambos.assert_called_once_with(101, 202)
     # A função create_project espera os dados filtrados (Correção 1)
     mock_create_proj.assert_called_once_with({'tema': 'Novo Projeto de Teste', 'tipo': 1, 'resumo': '...', 'duracao': 12})
     mock_create_orient.assert_called_once_with(fake_professor, fake_project)
     mock_create_alunoproj.assert_called_once_with(fake_aluno, fake_project)
-    fake_project.refresh_from_db.assert_called_once()
+    # O estado já conhecido é devolvido sem recarregar o projeto do banco
+    fake_project.refresh_from_db.assert_not_called()
     assert result == fake_project
 
+@pytest.mark.django_db # transaction.atomic abre uma transação real
 def test_create_project_with_new_orientador(mocker):
     """
     Caso de Teste 4 (Caminho Feliz Alternativo): 
@@ -144,6 +143,7 @@ def test_create_project_with_new_orientador(mocker):
     mock_create_prof.assert_called_once_with(mock_serializer_instance.validated_data)
     mock_create_orient.assert_called_once_with(fake_new_professor, fake_project)
 
+@pytest.mark.django_db # transaction.atomic abre uma transação real
 def test_create_project_professor_not_found(mocker):
     """
     Caso de Teste 5 (Erro): 
@@ -156,13 +156,9 @@ def test_create_project_professor_not_found(mocker):
     
     # --- CAMINHOS DO PATCH CORRIGIDOS ---
     mocker.patch(
-        'src.core.repositories.get_professor_by_id', # <-- MUDANÇA AQUI
+        'src.core.repositories.get_professor_and_aluno', # <-- MUDANÇA AQUI
         side_effect=ObjectDoesNotExist("Professor")
     )
-    mocker.patch(
-        'src.core.repositories.get_aluno_by_id', # <-- MUDANÇA AQUI
-        return_value=mocker.MagicMock(id_aluno=202)
-    )
 
     # 2. ACT & 3. ASSERT
     with pytest.raises(ObjectDoesNotExist) as e:
@@ -170,6 +166,7 @@ def test_create_project_professor_not_found(mocker):
     
     assert "Professor orientador com ID 999 não encontrado" in str(e.value)
 
+@pytest.mark.django_db # transaction.atomic abre uma transação real
 def test_create_project_aluno_not_found(mocker):
     """
     Caso de Teste 6 (Erro): 
@@ -180,15 +177,9 @@ def test_create_project_aluno_not_found(mocker):
     # 1. ARRANGE
     fake_data = {'id_professor': 101, 'id_aluno': 999} 
     
-    fake_professor = mocker.MagicMock(id_professor=101, nome="Prof. Teste")
-
     # --- CAMINHOS DO PATCH CORRIGIDOS ---
     mocker.patch(
-        'src.core.repositories.get_professor_by_id', # <-- MUDANÇA AQUI
-        return_value=fake_professor
-    )
-    mocker.patch(
-        'src.core.repositories.get_aluno_by_id', # <-- MUDANÇA AQUI
+        'src.core.repositories.get_professor_and_aluno', # <-- MUDANÇA AQUI
         side_effect=ObjectDoesNotExist("Aluno")
     )
     
@@ -200,6 +191,7 @@ def test_create_project_aluno_not_found(mocker):
 
 # --- Testes para associate_assessor_to_project ---
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_assessor_success(mocker):
     """
     Caso de Teste 7 (Caminho Feliz):
@@ -224,6 +216,7 @@ def test_associate_assessor_success(mocker):
     mock_create_assoc.assert_called_once_with(2, fake_project)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_assessor_fails_if_is_orientador(mocker):
     """
     Caso de Teste 8 (Erro - Regra de Negócio):
@@ -249,6 +242,7 @@ def test_associate_assessor_fails_if_is_orientador(mocker):
     mock_create_assoc.assert_not_called()
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_assessor_fails_if_professor_not_found(mocker):
     """
     Caso de Teste 9 (Erro):
@@ -270,6 +264,7 @@ def test_associate_assessor_fails_if_professor_not_found(mocker):
     assert "Professor assessor com ID 999 não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_assessor_fails_if_project_not_found(mocker):
     """
     Caso de Teste 10 (Erro):
@@ -293,6 +288,7 @@ def test_associate_assessor_fails_if_project_not_found(mocker):
 
 # --- Testes para deactivate_project_participant ---
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_deactivate_participant_success(mocker):
     """
     Caso de Teste 11 (Caminho Feliz):
@@ -323,6 +319,7 @@ def test_deactivate_participant_success(mocker):
     assert result == 'Status do aluno atualizado para inativo.'
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_deactivate_participant_fails_invalid_role(mocker):
     """
     Caso de Teste 12 (Erro - Validação):
@@ -337,6 +334,7 @@ def test_deactivate_participant_fails_invalid_role(mocker):
     assert "Role inválido" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_deactivate_participant_fails_project_not_found(mocker):
     """
     Caso de Teste 13 (Erro):
@@ -358,6 +356,7 @@ def test_deactivate_participant_fails_project_not_found(mocker):
     assert "Projeto (ID 999) não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_deactivate_participant_fails_no_active_participant(mocker):
     """
     Caso de Teste 14 (Erro - Regra de Negócio):
@@ -380,6 +379,7 @@ def test_deactivate_participant_fails_no_active_participant(mocker):
     assert "Nenhum assessor ativo encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_deactivate_participant_fails_multiple_active_participants(mocker):
     """
     Caso de Teste 15 (Erro - Regra de Negócio):
@@ -403,6 +403,7 @@ def test_deactivate_participant_fails_multiple_active_participants(mocker):
 
 # --- Testes para associate_aluno_to_project ---
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_aluno_success(mocker):
     """
     Caso de Teste 16 (Caminho Feliz):
@@ -430,6 +431,7 @@ def test_associate_aluno_success(mocker):
     assert result == mock_assoc
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_aluno_fails_project_not_found(mocker):
     """
     Caso de Teste 17 (Erro):
@@ -451,6 +453,7 @@ def test_associate_aluno_fails_project_not_found(mocker):
     assert "Projeto (ID 999) ou Aluno (ID 2) não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_aluno_fails_aluno_not_found(mocker):
     """
     Caso de Teste 18 (Erro):
@@ -473,6 +476,7 @@ def test_associate_aluno_fails_aluno_not_found(mocker):
     assert "Projeto (ID 1) ou Aluno (ID 999) não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_aluno_fails_on_creation(mocker):
     """
     Caso de Teste 19 (Erro - Validação):
@@ -501,6 +505,7 @@ def test_associate_aluno_fails_on_creation(mocker):
 
 # --- Testes para associate_orientador_to_project ---
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_orientador_success(mocker):
     """
     Caso de Teste 20 (Caminho Feliz):
@@ -528,6 +533,7 @@ def test_associate_orientador_success(mocker):
     assert result == mock_assoc
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_orientador_fails_project_not_found(mocker):
     """
     Caso de Teste 21 (Erro):
@@ -549,6 +555,7 @@ def test_associate_orientador_fails_project_not_found(mocker):
     assert "Projeto (ID 999) não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_orientador_fails_professor_not_found(mocker):
     """
     Caso de Teste 22 (Erro):
@@ -571,6 +578,7 @@ def test_associate_orientador_fails_professor_not_found(mocker):
     assert "Professor (ID 999) não encontrado" in str(e.value)
 
 
+@pytest.mark.django_db # retry_transaction abre uma transação real
 def test_associate_orientador_fails_on_creation(mocker):
     """
     Caso de Teste 23 (Erro - Validação):